@@ -1,6 +1,9 @@
 import logging
 
 from django.apps import AppConfig
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import class_prepared
 
 logger = logging.getLogger(__name__)
 
@@ -8,8 +11,43 @@ logger = logging.getLogger(__name__)
 class anonymiserConfig(AppConfig):
     name = "anonymiser"
     verbose_name = "Django Model Anonymiser"
+    default_auto_field = "django.db.models.BigAutoField"
 
     def ready(self) -> None:
         super().ready()
         logger.debug("Initialising anonymisation registry")
         from . import registry  # noqa F401
+        from .db.sqlite import register_functions
+        from .models import clear_plan_cache
+
+        connection_created.connect(register_functions, dispatch_uid="anonymiser_db")
+
+        # cached anonymisation plans are invalidated whenever the app
+        # registry changes (new model classes, or INSTALLED_APPS override).
+        class_prepared.connect(clear_plan_cache, dispatch_uid="anonymiser_plans")
+        setting_changed.connect(
+            _clear_plan_cache_on_installed_apps, dispatch_uid="anonymiser_plans"
+        )
+        # the field class -> redacter dispatch table (and the redaction
+        # values memoised in the plans) depend on the redacter settings.
+        setting_changed.connect(
+            _reload_auto_redact_field_funcs, dispatch_uid="anonymiser_redacters"
+        )
+
+
+def _clear_plan_cache_on_installed_apps(setting: str, **kwargs: object) -> None:
+    if setting == "INSTALLED_APPS":
+        from .models import clear_plan_cache
+
+        clear_plan_cache()
+
+
+def _reload_auto_redact_field_funcs(setting: str, **kwargs: object) -> None:
+    if setting == "ANONYMISER_AUTO_REDACT_FIELD_FUNCS":
+        from .models import clear_plan_cache
+        from .redacters import clear_field_redacter_cache
+        from .settings import load_auto_redact_field_funcs
+
+        load_auto_redact_field_funcs()
+        clear_field_redacter_cache()
+        clear_plan_cache()
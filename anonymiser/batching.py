@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Iterator
+
+from django.db import models
+from django.db.models import Max
+
+# Default number of rows fetched / written per batch.
+DEFAULT_BATCH_SIZE = 1000
+
+
+def iter_pk_batches(
+    queryset: models.QuerySet[models.Model],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_after: Any = None,
+) -> Iterator[list[models.Model]]:
+    """
+    Yield lists of objects from the queryset in primary key order.
+
+    This uses keyset pagination (WHERE pk > last_pk ORDER BY pk LIMIT n)
+    rather than OFFSET slicing, so every batch is a range scan on the pk
+    index and the cost of fetching a batch does not grow as the run
+    progresses through the table.
+
+    The `start_after` param can be used to skip all rows up to and
+    including the given pk value.
+
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    queryset = queryset.order_by("pk")
+    last_pk = start_after
+    while True:
+        qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(qs[:batch_size])
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
+
+
+def iter_pk_chunks(
+    queryset: models.QuerySet[models.Model],
+    chunk_size: int,
+) -> Iterator[models.QuerySet[models.Model]]:
+    """
+    Yield querysets that each cover a chunk of the queryset, in pk order.
+
+    Each chunk is a pk range (pk > previous_upper AND pk <= upper) that
+    contains at most `chunk_size` rows, where the upper bound is found
+    with a single query that selects only the pk. Unlike
+    `iter_pk_batches` the rows are not fetched, so the chunks can be used
+    for set-based updates.
+
+    The chunks are bounded by the maximum pk at the start, so rows
+    inserted during the run cannot make the last chunk any larger.
+
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    max_pk = queryset.aggregate(max_pk=Max("pk"))["max_pk"]
+    if max_pk is None:
+        return
+    queryset = queryset.filter(pk__lte=max_pk).order_by("pk")
+    last_pk = None
+    while last_pk != max_pk:
+        qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        upper = list(qs.values_list("pk", flat=True)[chunk_size - 1 : chunk_size])
+        if not upper:
+            # fewer than chunk_size rows remaining - this is the last chunk
+            yield qs
+            return
+        last_pk = upper[0]
+        yield qs.filter(pk__lte=last_pk)
+
+
+async def aiter_pk_batches(
+    queryset: models.QuerySet[models.Model],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_after: Any = None,
+) -> AsyncIterator[list[models.Model]]:
+    """Async version of `iter_pk_batches`."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    queryset = queryset.order_by("pk")
+    last_pk = start_after
+    while True:
+        qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = [obj async for obj in qs[:batch_size].aiterator(batch_size)]
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
+
+
+async def aiter_pk_chunks(
+    queryset: models.QuerySet[models.Model],
+    chunk_size: int,
+) -> AsyncIterator[models.QuerySet[models.Model]]:
+    """Async version of `iter_pk_chunks`."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    max_pk = (await queryset.aaggregate(max_pk=Max("pk")))["max_pk"]
+    if max_pk is None:
+        return
+    queryset = queryset.filter(pk__lte=max_pk).order_by("pk")
+    last_pk = None
+    while last_pk != max_pk:
+        qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        upper = [
+            pk
+            async for pk in qs.values_list("pk", flat=True)[chunk_size - 1 : chunk_size]
+        ]
+        if not upper:
+            yield qs
+            return
+        last_pk = upper[0]
+        yield qs.filter(pk__lte=last_pk)
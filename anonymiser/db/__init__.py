@@ -1,3 +1,27 @@
-from .functions import GenerateUuid4
+from .functions import (
+    Digest,
+    GenerateUuid4,
+    GenerateUuid7,
+    Hmac,
+    RandomChoice,
+    RandomDate,
+    RandomFirstName,
+    RandomLastName,
+    RandomPhoneNumber,
+    TemplatedEmail,
+)
+from .lookups import IsDistinctFrom
 
-__all__ = ["GenerateUuid4"]
+__all__ = [
+    "Digest",
+    "GenerateUuid4",
+    "GenerateUuid7",
+    "Hmac",
+    "IsDistinctFrom",
+    "RandomChoice",
+    "RandomDate",
+    "RandomFirstName",
+    "RandomLastName",
+    "RandomPhoneNumber",
+    "TemplatedEmail",
+]
@@ -1,17 +1,161 @@
-from typing import Any
+import datetime
+from typing import Any, Sequence
 
 from django.db import models
 from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models.functions import Cast, Concat
 from django.db.models.sql.compiler import SQLCompiler
 
+# default lookup lists for RandomFirstName / RandomLastName
+FIRST_NAMES = (
+    "Alex",
+    "Charlie",
+    "Emma",
+    "Harry",
+    "Isla",
+    "Jack",
+    "Lily",
+    "Mia",
+    "Noah",
+    "Olivia",
+    "Oscar",
+    "Poppy",
+    "Sam",
+    "Sophia",
+    "Thomas",
+    "Zara",
+)
+LAST_NAMES = (
+    "Brown",
+    "Davies",
+    "Evans",
+    "Green",
+    "Hall",
+    "Johnson",
+    "Jones",
+    "Patel",
+    "Roberts",
+    "Smith",
+    "Taylor",
+    "Thomas",
+    "Walker",
+    "White",
+    "Williams",
+    "Wilson",
+)
+
+
+def is_volatile_expression(value: Any) -> bool:
+    """
+    Return True if the value is (or contains) a volatile expression.
+
+    Volatile expressions (e.g. GenerateUuid4, RandomChoice) produce a
+    different value every time they are evaluated, so cannot be compared
+    with the current value of a field.
+
+    """
+    if getattr(value, "volatile", False) is True:
+        return True
+    if not hasattr(value, "get_source_expressions"):
+        return False
+    return any(
+        is_volatile_expression(source) for source in value.get_source_expressions()
+    )
+
+
+def _random_hex_sql(connection: BaseDatabaseWrapper, digits: int) -> str:
+    """Return SQL for a string of random lowercase hex digits."""
+    if connection.vendor == "sqlite":
+        return f"SUBSTR(LOWER(HEX(RANDOMBLOB({(digits + 1) // 2}))), 1, {digits})"
+    if connection.vendor == "postgresql":
+        return f"SUBSTR(MD5(GEN_RANDOM_UUID()::text), 1, {digits})"
+    if connection.vendor == "mysql":
+        return f"SUBSTR(LOWER(HEX(RANDOM_BYTES({(digits + 1) // 2}))), 1, {digits})"
+    if connection.vendor == "oracle":
+        return (
+            f"LOWER(TO_CHAR(TRUNC(DBMS_RANDOM.VALUE(0, {16**digits})), "
+            f"'FM0{'X' * (digits - 1)}'))"
+        )
+    raise NotImplementedError(
+        f"Random values are not implemented for {connection.vendor}"
+    )
+
+
+def _timestamp_hex_sql(connection: BaseDatabaseWrapper) -> str:
+    """Return SQL for the current Unix time in ms, as 12 lowercase hex digits."""
+    if connection.vendor == "sqlite":
+        # no integer to hex function - build it a nibble at a time
+        ms = "CAST((JULIANDAY('now') - 2440587.5) * 86400000 AS INTEGER)"
+        return " || ".join(
+            f"SUBSTR('0123456789abcdef', 1 + (({ms} >> {shift}) & 15), 1)"
+            for shift in range(44, -1, -4)
+        )
+    if connection.vendor == "postgresql":
+        return (
+            "LPAD(TO_HEX(FLOOR(EXTRACT(EPOCH FROM CLOCK_TIMESTAMP()) * 1000)"
+            "::bigint), 12, '0')"
+        )
+    if connection.vendor == "mysql":
+        # SYSDATE, unlike NOW, is not fixed for the duration of the statement
+        return "LPAD(LOWER(HEX(FLOOR(UNIX_TIMESTAMP(SYSDATE(3)) * 1000))), 12, '0')"
+    if connection.vendor == "oracle":
+        return (
+            "LOWER(TO_CHAR(ROUND((CAST(SYS_EXTRACT_UTC(SYSTIMESTAMP) AS DATE) "
+            "- DATE '1970-01-01') * 86400000) "
+            "+ TO_NUMBER(TO_CHAR(SYSTIMESTAMP, 'FF3')), 'FM0XXXXXXXXXXX'))"
+        )
+    raise NotImplementedError(f"Timestamps are not implemented for {connection.vendor}")
+
+
+def _variant_sql(connection: BaseDatabaseWrapper) -> str:
+    """Return SQL for a random hex digit with the top bits 10 (8, 9, a or b)."""
+    if connection.vendor == "postgresql":
+        # SUBSTR takes an integer, not a bigint
+        random_int = "FLOOR(RANDOM() * 4)::integer"
+    elif connection.vendor == "mysql":
+        random_int = "FLOOR(RAND() * 4)"
+    elif connection.vendor == "oracle":
+        random_int = "TRUNC(DBMS_RANDOM.VALUE(0, 4))"
+    else:
+        random_int = _random_int_sql(connection, 4)
+    return f"SUBSTR('89ab', 1 + {random_int}, 1)"
+
+
+def _uuid_hex_sql(connection: BaseDatabaseWrapper, version: int) -> str:
+    """
+    Return SQL for a random UUID of the given version, as 32 hex digits.
+
+    The version (4 or 7) is set in the 13th digit, and the RFC 9562
+    variant (10xx) in the 17th. A v7 UUID starts with the Unix time in
+    ms, so values generated later sort later.
+
+    """
+    parts = [
+        (
+            _timestamp_hex_sql(connection)
+            if version == 7
+            else _random_hex_sql(connection, 12)
+        ),
+        f"'{version}'",
+        _random_hex_sql(connection, 3),
+        _variant_sql(connection),
+        _random_hex_sql(connection, 15),
+    ]
+    if connection.vendor == "mysql":
+        return f"CONCAT({', '.join(parts)})"
+    return f"({' || '.join(parts)})"
+
 
 class GenerateUuid4(models.Func):
     """
     Generate a new UUID (v4) value.
 
     Most databases support some form of UUID generation, but the syntax
-    varies between them. This expression is only implemented for SQLite
-    and PostgreSQL.
+    varies between them, and not all of them generate v4 UUIDs. This
+    expression is implemented for SQLite, PostgreSQL, MySQL / MariaDB
+    and Oracle, and always generates a valid (random) v4 UUID - in the
+    format Django uses for a UUIDField on that database: a native uuid
+    on PostgreSQL, and 32 lowercase hex digits elsewhere.
 
     The expression can be used to generate a UUID value for a field
     where the value needs to be generated by the database, rather than
@@ -43,6 +187,10 @@ class GenerateUuid4(models.Func):
     """
 
     output_field = models.UUIDField()
+    # a different value is generated for each row - see is_volatile_expression
+    volatile = True
+    # UUID version generated
+    version = 4
 
     def as_sql(
         self,
@@ -50,33 +198,64 @@ class GenerateUuid4(models.Func):
         connection: BaseDatabaseWrapper,
         **extra_context: Any,
     ) -> tuple[str, list]:
-        """
-        Generate the SQL fragment for the expression.
+        if connection.vendor not in ("sqlite", "postgresql", "mysql", "oracle"):
+            raise NotImplementedError(
+                f"{self.__class__.__name__} is not implemented for {connection.vendor}"
+            )
+        if connection.vendor != "postgresql":
+            return _uuid_hex_sql(connection, self.version), []
+        if self.version == 4:
+            return "GEN_RANDOM_UUID()", []
+        return f"CAST({_uuid_hex_sql(connection, self.version)} AS uuid)", []
+
+
+class GenerateUuid7(GenerateUuid4):
+    """
+    Generate a new, time-ordered, UUID (v7) value.
+
+    As `GenerateUuid4`, but the UUIDs start with the current time (in
+    ms), followed by random bits. Values generated later sort after
+    earlier ones, so inserts into an index on the field are appended at
+    the end, rather than scattered across it.
 
-        Note that this is only called when `as_{{vendor}}` method does
-        not exist for the expression.
+    """
 
-        (From https://docs.djangoproject.com/en/4.2/ref/models/lookups/)
+    version = 7
 
-        "Returns a tuple (sql, params), where sql is the SQL string, and
-        params is the list or tuple of query parameters. The compiler is
-        an SQLCompiler object, which has a compile() method that can be
-        used to compile other expressions. The connection is the
-        connection used to execute the query.
 
-        Calling expression.as_sql() is usually incorrect - instead
-        compiler.compile(expression) should be used. The
-        compiler.compile() method will take care of calling
-        vendor-specific methods of the expression.
+# hash algorithms supported by both pgcrypto and hashlib
+HASH_ALGORITHMS = ("md5", "sha1", "sha224", "sha256", "sha384", "sha512")
 
-        Custom keyword arguments may be defined on this method if it's
-        likely that as_vendorname() methods or subclasses will need to
-        supply data to override the generation of the SQL string. See
-        Func.as_sql() for example usage."
 
-        """
+class _HashFunc(models.Func):
+    """Base class for hash expressions - output is a lowercase hex string."""
+
+    output_field = models.CharField()
+    # name of the function registered on SQLite connections
+    sqlite_function: str
+    # pgcrypto template for PostgreSQL
+    postgresql_template: str
+
+    def __init__(
+        self, expression: Any, *args: Any, algorithm: str, **extra: Any
+    ) -> None:
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+        # cast to text so that every vendor hashes the same string value
+        super().__init__(
+            Cast(expression, models.TextField()),
+            *[models.Value(arg) for arg in (*args, algorithm)],
+            **extra,
+        )
+
+    def as_sql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
         raise NotImplementedError(
-            f"GenerateUuid4 is not implemented for {connection.vendor}"
+            f"{self.__class__.__name__} is not implemented for {connection.vendor}"
         )
 
     def as_sqlite(
@@ -85,26 +264,248 @@ class GenerateUuid4(models.Func):
         connection: BaseDatabaseWrapper,
         **extra_context: Any,
     ) -> tuple[str, list]:
-        """
-        Generate the SQL fragment for the expression in SQLite format.
+        # see anonymiser.db.sqlite.register_functions
+        return super().as_sql(
+            compiler, connection, function=self.sqlite_function, **extra_context
+        )
 
-        (From https://docs.djangoproject.com/en/4.2/ref/models/lookups/)
+    def as_postgresql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        return super().as_sql(
+            compiler, connection, template=self.postgresql_template, **extra_context
+        )
+
+
+class Hmac(_HashFunc):
+    """
+    Generate a keyed hash (HMAC) of an expression, as a hex string.
+
+    This can be used to pseudonymise data inside the database - the same
+    input value always maps to the same output value (for a given key),
+    so values remain referentially consistent across tables, but the
+    original value cannot be recovered without the key:
+
+        >>> User.objects.update(
+        ...     email=Concat(
+        ...         Substr(Hmac("email", key=settings.SECRET_KEY), 1, 16),
+        ...         Value("@example.com"),
+        ...     )
+        ... )
+
+    On PostgreSQL this uses the `hmac` function from the `pgcrypto`
+    extension, which must be installed in the database - with a
+    `django.contrib.postgres.operations.CryptoExtension()` migration
+    operation, or `CREATE EXTENSION pgcrypto`. On SQLite it uses a
+    function that is registered on each new connection. The output is
+    identical on both.
+
+    """
+
+    sqlite_function = "ANONYMISER_HMAC"
+    postgresql_template = "ENCODE(HMAC(%(expressions)s), 'hex')"
+
+    def __init__(
+        self, expression: Any, key: str, algorithm: str = "sha256", **extra: Any
+    ) -> None:
+        super().__init__(expression, key, algorithm=algorithm, **extra)
+
+
+class Digest(_HashFunc):
+    """
+    Generate an (unkeyed) hash of an expression, as a hex string.
+
+    As `Hmac`, but without a key - use this only where the input values
+    cannot be guessed, as unkeyed hashes are open to dictionary attacks.
+
+    On PostgreSQL this uses the `digest` function from the `pgcrypto`
+    extension, which must be installed in the database (see `Hmac`).
+
+    """
+
+    sqlite_function = "ANONYMISER_DIGEST"
+    postgresql_template = "ENCODE(DIGEST(%(expressions)s), 'hex')"
+
+    def __init__(
+        self, expression: Any, algorithm: str = "sha256", **extra: Any
+    ) -> None:
+        super().__init__(expression, algorithm=algorithm, **extra)
+
+
+def _random_int_sql(connection: BaseDatabaseWrapper, upper: int) -> str:
+    """Return SQL for a random integer in the range [0, upper)."""
+    # NB avoid the "%" operator - it clashes with param placeholders - and
+    # Django's SQLite MOD function (math.fmod) returns a float.
+    if connection.vendor == "sqlite":
+        return f"CAST(MOD(ABS(RANDOM()), {int(upper)}) AS INTEGER)"
+    if connection.vendor == "postgresql":
+        return f"FLOOR(RANDOM() * {int(upper)})::bigint"
+    raise NotImplementedError(
+        f"Random values are not implemented for {connection.vendor}"
+    )
+
+
+class RandomChoice(models.Func):
+    """
+    Pick a random value from a list of values, for each row.
+
+        >>> User.objects.update(location=RandomChoice(["London", "Paris"]))
+
+    Compiles to a CASE expression over a random integer, so the lookup
+    list is sent to the database with the query, and a different value
+    is picked for each row. Implemented for SQLite and PostgreSQL.
+
+    """
+
+    output_field = models.CharField()
+    volatile = True
+
+    def __init__(self, values: Sequence[Any], **extra: Any) -> None:
+        if not values:
+            raise ValueError("RandomChoice requires at least one value")
+        super().__init__(*[models.Value(v) for v in values], **extra)
+
+    def as_sql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        whens, params = [], []
+        for i, expression in enumerate(self.get_source_expressions()):
+            sql, expression_params = compiler.compile(expression)
+            whens.append(f"WHEN {i} THEN {sql}")
+            params.extend(expression_params)
+        random_int = _random_int_sql(connection, len(whens))
+        return f"CASE {random_int} {' '.join(whens)} END", params
 
-        "Works like as_sql() method. When an expression is compiled by
-        compiler.compile(), Django will first try to call
-        as_vendorname(), where vendorname is the vendor name of the
-        backend used for executing the query. The vendorname is one of
-        postgresql, oracle, sqlite, or mysql for Django's built-in
-        backends."
 
-        """
+class RandomFirstName(RandomChoice):
+    """Pick a random first name (from FIRST_NAMES by default), for each row."""
+
+    def __init__(self, values: Sequence[str] = FIRST_NAMES, **extra: Any) -> None:
+        super().__init__(values, **extra)
+
+
+class RandomLastName(RandomChoice):
+    """Pick a random last name (from LAST_NAMES by default), for each row."""
+
+    def __init__(self, values: Sequence[str] = LAST_NAMES, **extra: Any) -> None:
+        super().__init__(values, **extra)
+
+
+class RandomDate(models.Func):
+    """
+    Generate a random date between `start` and `end` (inclusive), for each row.
+
+        >>> User.objects.update(
+        ...     date_of_birth=RandomDate(date(1950, 1, 1), date(2000, 12, 31))
+        ... )
+
+    Implemented for SQLite and PostgreSQL.
+
+    """
+
+    output_field = models.DateField()
+    volatile = True
+
+    def __init__(self, start: datetime.date, end: datetime.date, **extra: Any) -> None:
+        if end < start:
+            raise ValueError("RandomDate end must not be before start")
+        self.days = (end - start).days + 1
+        super().__init__(models.Value(start, output_field=models.DateField()), **extra)
+
+    def as_sql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        raise NotImplementedError(
+            f"RandomDate is not implemented for {connection.vendor}"
+        )
+
+    def as_sqlite(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        random_int = _random_int_sql(connection, self.days)
+        return super().as_sql(
+            compiler,
+            connection,
+            template=f"DATE(%(expressions)s, '+' || {random_int} || ' days')",
+            **extra_context,
+        )
+
+    def as_postgresql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        random_int = _random_int_sql(connection, self.days)
+        return super().as_sql(
+            compiler,
+            connection,
+            template=f"((%(expressions)s)::date + ({random_int})::integer)",
+            **extra_context,
+        )
+
+
+class RandomPhoneNumber(models.Func):
+    """
+    Generate a random phone number, for each row.
+
+    The number is the `prefix` followed by `digits` random (zero-padded)
+    digits. The default is a UK mobile number in the range reserved by
+    Ofcom for use in drama, so will never belong to a real person:
+
+        >>> User.objects.update(phone=RandomPhoneNumber())  # "07700 900123"
+
+    Implemented for SQLite and PostgreSQL.
+
+    """
+
+    output_field = models.CharField()
+    volatile = True
+
+    def __init__(
+        self, prefix: str = "07700 900", digits: int = 3, **extra: Any
+    ) -> None:
+        if not 0 < digits <= 10:
+            raise ValueError("RandomPhoneNumber digits must be between 1 and 10")
+        self.digits = digits
+        super().__init__(models.Value(prefix), **extra)
+
+    def as_sql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        raise NotImplementedError(
+            f"RandomPhoneNumber is not implemented for {connection.vendor}"
+        )
+
+    def as_sqlite(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        random_int = _random_int_sql(connection, 10**self.digits)
         return super().as_sql(
             compiler,
             connection,
-            function="HEX(RANDOMBLOB(16))",
-            # override the default template as otherwise we end up
-            # trying to append parentheses: HEX(RANDOMBLOB(16))()
-            template="%(function)s",
+            template=(
+                f"%(expressions)s || "
+                f"SUBSTR('0000000000' || {random_int}, -{self.digits}, {self.digits})"
+            ),
             **extra_context,
         )
 
@@ -114,6 +515,38 @@ class GenerateUuid4(models.Func):
         connection: BaseDatabaseWrapper,
         **extra_context: Any,
     ) -> tuple[str, list]:
+        random_int = _random_int_sql(connection, 10**self.digits)
         return super().as_sql(
-            compiler, connection, function="gen_random_uuid", **extra_context
+            compiler,
+            connection,
+            template=(
+                f"(%(expressions)s || "
+                f"LPAD(({random_int})::text, {self.digits}, '0'))"
+            ),
+            **extra_context,
+        )
+
+
+class TemplatedEmail(Concat):
+    """
+    Generate an email address from the primary key of each row.
+
+        >>> User.objects.update(email=TemplatedEmail("user_{pk}@example.com"))
+
+    The template must contain a single "{pk}" placeholder. As the pk is
+    unique, so is the generated email, which makes this suitable for
+    fields with a unique constraint. Works on all database vendors.
+
+    """
+
+    def __init__(self, template: str = "user_{pk}@example.com", **extra: Any) -> None:
+        before, placeholder, after = template.partition("{pk}")
+        if not placeholder or "{pk}" in after:
+            raise ValueError("TemplatedEmail template must contain one '{pk}'")
+        super().__init__(
+            models.Value(before),
+            Cast(models.F("pk"), models.CharField()),
+            models.Value(after),
+            output_field=models.CharField(),
+            **extra,
         )
@@ -0,0 +1,44 @@
+from typing import Any
+
+from django.db import models
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models.sql.compiler import SQLCompiler
+
+
+class IsDistinctFrom(models.Lookup):
+    """
+    NULL-safe "not equal" comparison.
+
+        >>> User.objects.filter(IsDistinctFrom(F("first_name"), Value("X")))
+
+    Unlike `~Q(first_name="X")` this includes rows where the column is
+    NULL (and excludes them when comparing NULL with NULL). Compiles to
+    IS DISTINCT FROM on PostgreSQL, IS NOT on SQLite, and NOT <=> on
+    MySQL. The lookup is not registered on any field - it is used as an
+    expression.
+
+    """
+
+    lookup_name = "isdistinctfrom"
+    template = "%s IS DISTINCT FROM %s"
+
+    def as_sql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+        template: str | None = None,
+        **extra_context: Any,
+    ) -> tuple[str, list]:
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (template or self.template) % (lhs, rhs), [*lhs_params, *rhs_params]
+
+    def as_sqlite(
+        self, compiler: SQLCompiler, connection: BaseDatabaseWrapper, **extra: Any
+    ) -> tuple[str, list]:
+        return self.as_sql(compiler, connection, template="%s IS NOT %s")
+
+    def as_mysql(
+        self, compiler: SQLCompiler, connection: BaseDatabaseWrapper, **extra: Any
+    ) -> tuple[str, list]:
+        return self.as_sql(compiler, connection, template="NOT (%s <=> %s)")
@@ -0,0 +1,163 @@
+"""
+Copy-and-swap redaction of whole tables, for PostgreSQL.
+
+An in-place UPDATE of every row writes a new version of every tuple, so
+a fully redacted table (and its indexes) doubles in size until vacuum
+catches up. `copy_and_swap` instead builds a new table from a SELECT of
+the redacted values, rebuilds the constraints and indexes on it, and
+swaps it in for the original, all in a single transaction - see
+`RedacterBase.redact_table`.
+
+Columns (with their defaults, identity and storage settings), primary
+key, unique, check, exclusion and foreign key constraints, indexes, and
+the foreign keys on other tables that reference the table are carried
+over. Serial / identity sequences carry on from their current value.
+Triggers, grants, row level security policies and statistics settings
+are not - and if a view depends on the table, dropping the original
+table fails, and the whole transaction is rolled back.
+
+"""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from django.db import connections, transaction
+from django.db.backends.utils import CursorWrapper
+
+# table name suffixes - PostgreSQL truncates identifiers to 63 bytes
+NEW_TABLE_SUFFIX = "__redacted"
+OLD_TABLE_SUFFIX = "__original"
+
+
+def _get_constraints(cursor: CursorWrapper, table: str) -> list[tuple[str, str]]:
+    """Return (name, definition) for the constraints on a table, PK first."""
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'x', 'c', 'f') "
+        "ORDER BY CASE contype WHEN 'p' THEN 0 WHEN 'f' THEN 2 ELSE 1 END, conname",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _get_referencing_constraints(
+    cursor: CursorWrapper, table: str
+) -> list[tuple[str, str, str]]:
+    """Return (table, name, definition) for foreign keys from other tables."""
+    cursor.execute(
+        "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+        "FROM pg_constraint "
+        "WHERE confrelid = %s::regclass AND contype = 'f' AND conrelid <> confrelid "
+        "ORDER BY 1, 2",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _get_indexes(cursor: CursorWrapper, table: str) -> list[str]:
+    """Return CREATE INDEX statements for indexes that do not back a constraint."""
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = %s::regclass AND NOT EXISTS ("
+        "  SELECT 1 FROM pg_constraint c "
+        "  WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid"
+        ") ORDER BY i.indexrelid",
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _get_sequence(cursor: CursorWrapper, table: str, column: str) -> str | None:
+    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, column])
+    return cursor.fetchone()[0]
+
+
+def _carry_over_sequences(
+    cursor: CursorWrapper, table: str, new_table: str, columns: Sequence[str]
+) -> None:
+    """Move the serial / identity sequences on a table to the new table."""
+    quote_name = cursor.db.ops.quote_name
+    for column in columns:
+        if not (sequence := _get_sequence(cursor, table, column)):
+            continue
+        if new_sequence := _get_sequence(cursor, new_table, column):
+            # identity column - the new table has its own sequence
+            cursor.execute(
+                f"SELECT setval(%s, last_value, is_called) FROM {sequence}",  # noqa: S608
+                [new_sequence],
+            )
+        else:
+            # serial column - the new column default uses the old sequence,
+            # which would otherwise be dropped with the old table
+            cursor.execute(
+                f"ALTER SEQUENCE {sequence} OWNED BY {new_table}.{quote_name(column)}"
+            )
+
+
+def copy_and_swap(
+    table: str,
+    columns: Sequence[str],
+    select_sql: str,
+    params: Sequence[Any],
+    using: str,
+) -> int:
+    """
+    Replace a table with the rows returned by a SELECT.
+
+    The SELECT must return a value for each of the `columns`, in order -
+    columns that are not included (e.g. generated columns) are set to
+    their default. Writes to the table are blocked from the start of
+    the copy, and reads from the swap, until the transaction commits.
+
+    Returns the number of rows copied.
+
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        raise NotImplementedError(
+            f"Copy-and-swap is not implemented for {connection.vendor}"
+        )
+    quote_name = connection.ops.quote_name
+    new_table = quote_name(f"{table[:50]}{NEW_TABLE_SUFFIX}")
+    old_table = f"{table[:50]}{OLD_TABLE_SUFFIX}"
+    table = quote_name(table)
+    column_list = ", ".join(quote_name(c) for c in columns)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN SHARE MODE")
+        constraints = _get_constraints(cursor, table)
+        referencing = _get_referencing_constraints(cursor, table)
+        indexes = _get_indexes(cursor, table)
+        cursor.execute(
+            f"CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING IDENTITY INCLUDING GENERATED INCLUDING STORAGE "
+            "INCLUDING COMMENTS)"
+        )
+        cursor.execute(
+            f"INSERT INTO {new_table} ({column_list}) {select_sql}",  # noqa: S608
+            params,
+        )
+        count = cursor.rowcount
+        _carry_over_sequences(cursor, table, new_table, columns)
+        for other_table, name, _ in referencing:
+            cursor.execute(
+                f"ALTER TABLE {other_table} DROP CONSTRAINT {quote_name(name)}"
+            )
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {quote_name(old_table)}")
+        cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        cursor.execute(f"DROP TABLE {quote_name(old_table)}")
+        # the constraint / index names are free now the old table has gone,
+        # and the index definitions refer to the table by name.
+        for name, definition in constraints:
+            cursor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {quote_name(name)} {definition}"
+            )
+        for definition in indexes:
+            cursor.execute(definition)
+        for other_table, name, definition in referencing:
+            cursor.execute(
+                f"ALTER TABLE {other_table} "
+                f"ADD CONSTRAINT {quote_name(name)} {definition}"
+            )
+        cursor.execute(f"ANALYZE {table}")
+    return count
@@ -0,0 +1,39 @@
+"""
+Python implementations of the SQLite functions used by anonymiser.db.
+
+SQLite has no built-in hash functions, so these are registered on each
+new SQLite connection (see `register_functions`) and called from the
+`as_sqlite` methods of the matching expressions.
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+from typing import Any
+
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def _hmac(value: str | None, key: str, algorithm: str) -> str | None:
+    if value is None:
+        return None
+    return hmac.new(key.encode(), value.encode(), algorithm).hexdigest()
+
+
+def _digest(value: str | None, algorithm: str) -> str | None:
+    if value is None:
+        return None
+    return hashlib.new(algorithm, value.encode()).hexdigest()
+
+
+def register_functions(
+    sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+) -> None:
+    """Register functions on new SQLite connections (connection_created receiver)."""
+    if connection.vendor != "sqlite":
+        return
+    conn = connection.connection
+    conn.create_function("ANONYMISER_HMAC", 3, _hmac, deterministic=True)
+    conn.create_function("ANONYMISER_DIGEST", 2, _digest, deterministic=True)
@@ -0,0 +1,168 @@
+"""
+Fingerprints of the anonymisation config, for CI checks.
+
+Each model is summarised as the definition of each of its fields, and
+whether the field is anonymised / redacted, together with the anonymiser
+class. The model fingerprint is a hash of that summary, so comparing a
+project against a stored fingerprints file is a matter of comparing one
+hash per model; the field summaries are only diffed for models whose
+fingerprint has changed.
+
+The fingerprints file is JSON - model label to model entry - and is
+intended to be checked in:
+
+    $ python manage.py anonymisation_config --fingerprints fingerprints.json --update
+    $ python manage.py anonymisation_config --fingerprints fingerprints.json
+
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from typing import Any
+
+from django.db import models
+
+from . import registry
+from .models import ModelFieldSummary
+
+Fingerprints = dict[str, dict[str, Any]]
+
+
+def _path(value: Any) -> str:
+    if isinstance(value, type) and issubclass(value, models.Model):
+        model: type[models.Model] = value
+        return model._meta.label
+    return f"{value.__module__}.{value.__qualname__}"
+
+
+def _callable(value: Any) -> Any:
+    if isinstance(value, functools.partial):
+        return [_callable(value.func), _stable(value.args), _stable(value.keywords)]
+    # functions have a qualified name, callable instances do not
+    return _path(value if hasattr(value, "__qualname__") else type(value))
+
+
+def _stable(value: Any) -> Any:
+    """Return a JSON serializable representation that is stable between runs."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_stable(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        # set iteration order changes between runs (hash randomisation)
+        return sorted((_stable(v) for v in value), key=json.dumps)
+    if isinstance(value, dict):
+        return {str(k): _stable(v) for k, v in value.items()}
+    if isinstance(value, type):
+        return _path(value)
+    if hasattr(value, "deconstruct"):
+        # validators and other @deconstructible objects
+        return _stable(value.deconstruct())
+    if callable(value):
+        return _callable(value)
+    # str, not repr, as that includes the id of lazy translations
+    return str(value)
+
+
+def get_field_definition(field: models.Field | models.ForeignObjectRel) -> str:
+    """Return a hash of the field definition (from `Field.deconstruct`)."""
+    if isinstance(field, models.ForeignObjectRel):
+        definition: Any = [type(field).__name__, field.related_model._meta.label]
+    else:
+        _, path, args, kwargs = field.deconstruct()
+        definition = [path, _stable(args), _stable(kwargs)]
+    return _hash(definition)
+
+
+def get_field_entry(summary: ModelFieldSummary) -> dict[str, Any]:
+    return {
+        "type": summary.field_type,
+        "definition": get_field_definition(summary.field),
+        "anonymised": summary.is_anonymised,
+        "redaction": summary.redaction_strategy.value or None,
+    }
+
+
+def get_model_entry(model: type[models.Model]) -> dict[str, Any]:
+    """Return the fingerprint, anonymiser and field entries for a model."""
+    anonymiser = registry.get_model_anonymiser(model)
+    entry = {
+        "anonymiser": (
+            f"{type(anonymiser).__module__}.{type(anonymiser).__qualname__}"
+            if anonymiser
+            else None
+        ),
+        "fields": {
+            summary.field_name: get_field_entry(summary)
+            for summary in registry.get_field_summaries(model)
+        },
+    }
+    return {"fingerprint": _hash(entry), **entry}
+
+
+def get_fingerprints(models: list[type[models.Model]]) -> Fingerprints:
+    return {model._meta.label: get_model_entry(model) for model in models}
+
+
+def _hash(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def load_fingerprints(path: str | os.PathLike) -> Fingerprints:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_fingerprints(fingerprints: Fingerprints, path: str | os.PathLike) -> None:
+    with open(path, "w") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _describe(field: dict[str, Any]) -> str:
+    anonymised = "anonymised" if field["anonymised"] else "not anonymised"
+    return f"{field['type']}, {anonymised}, redaction {field['redaction'] or '-'}"
+
+
+def diff_fields(old: dict[str, Any], new: dict[str, Any]) -> list[str]:
+    """Return a line for each field that has been added, removed or changed."""
+    lines = []
+    for name in sorted(old.keys() | new.keys()):
+        before, after = old.get(name), new.get(name)
+        if before == after:
+            continue
+        if before is None:
+            lines.append(f"  + {name}: added ({_describe(new[name])})")
+        elif after is None:
+            lines.append(f"  - {name}: removed")
+        elif before["anonymised"] and not after["anonymised"]:
+            lines.append(f"  ! {name}: NO LONGER ANONYMISED ({_describe(after)})")
+        elif _describe(before) == _describe(after):
+            lines.append(f"  ~ {name}: definition changed")
+        else:
+            lines.append(f"  ~ {name}: {_describe(before)} -> {_describe(after)}")
+    return lines
+
+
+def diff_fingerprints(old: Fingerprints, new: Fingerprints) -> list[str]:
+    """Return lines describing the models (and fields) that have changed."""
+    lines = []
+    for label in sorted(old.keys() | new.keys()):
+        before, after = old.get(label), new.get(label)
+        if before is None:
+            lines.append(f"{label}: added")
+        elif after is None:
+            lines.append(f"{label}: removed")
+        elif before["fingerprint"] != after["fingerprint"]:
+            lines.append(f"{label}: changed")
+            if before["anonymiser"] != after["anonymiser"]:
+                lines.append(
+                    f"  anonymiser: {before['anonymiser']} -> {after['anonymiser']}"
+                )
+            lines.extend(diff_fields(before["fields"], after["fields"]))
+    return lines
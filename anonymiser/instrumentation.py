@@ -0,0 +1,255 @@
+"""
+Instrumentation of anonymisation and redaction.
+
+Anonymisation and redaction operations are wrapped in `measure`, which
+records the wall time, rows touched, SQL statements executed, and bytes
+changed, and passes the resulting `Measurement` to every registered
+metrics callback:
+
+    def send_to_statsd(measurement: Measurement) -> None:
+        ...
+
+    instrumentation.add_callback(send_to_statsd, sample_rate=0.01)
+
+The operations measured are:
+
+- "anonymise_field" - a single field of a single object (in
+  `AnonymiserBase.anonymise_field` and `anonymise_object`)
+- "anonymise_object" - a single call to `AnonymiserBase.anonymise_object`
+- "anonymise_column" - a single field across a batch of objects
+- "anonymise_batch" - a batch of `anonymise_queryset`, including the write
+- "redact_queryset" - a single call to `RedacterBase.redact_queryset`
+- "redact_table" - a single call to `RedacterBase.redact_table`
+
+When no callbacks are registered, or an operation is not sampled, the
+cost is a single function call that returns a no-op recorder, so it is
+safe to leave instrumentation enabled in production. Bytes changed is
+the size of the new values that differ from the old values, so it is
+not known for (set-based) redaction. The async API takes its
+"redact_queryset" measurements per UPDATE statement (so one per chunk),
+and its "anonymise_batch" measurements around the batch write only, in
+the worker thread that runs the queries.
+
+The `collect` context manager registers a `Collector` that aggregates
+measurements by model, field and operation, and can render a summary
+report at the end of a run.
+
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Iterator
+
+from django.db import DEFAULT_DB_ALIAS, connections, models
+
+
+@dataclasses.dataclass(frozen=True)
+class Measurement:
+    operation: str
+    model: str
+    field: str | None
+    seconds: float
+    rows: int
+    queries: int
+    bytes_changed: int
+
+
+MetricsCallback = Callable[[Measurement], None]
+
+# (callback, sample_rate) pairs
+_callbacks: list[tuple[MetricsCallback, float]] = []
+_lock = threading.Lock()
+
+
+def add_callback(callback: MetricsCallback, sample_rate: float = 1.0) -> None:
+    """
+    Register a metrics callback.
+
+    The `sample_rate` (0-1) is the fraction of operations that are
+    measured and passed to the callback.
+
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError("sample_rate must be greater than 0, and at most 1")
+    with _lock:
+        _callbacks.append((callback, sample_rate))
+
+
+def remove_callback(callback: MetricsCallback) -> None:
+    with _lock:
+        _callbacks[:] = [(cb, rate) for cb, rate in _callbacks if cb != callback]
+
+
+def value_size(value: Any) -> int:
+    """Return the size of a field value in bytes (approximate for non-text)."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return len(str(value).encode())
+
+
+class Recorder:
+    """Record a single measurement - see `measure`."""
+
+    def __init__(
+        self,
+        callbacks: list[MetricsCallback],
+        operation: str,
+        model: type[models.Model],
+        field: str | None,
+        using: str,
+    ) -> None:
+        self.callbacks = callbacks
+        self.operation = operation
+        self.model = model
+        self.field = field
+        self.using = using
+        self.rows = 0
+        self.queries = 0
+        self.bytes_changed = 0
+
+    def record(self, rows: int, changes: Iterable[tuple[Any, Any]] = ()) -> None:
+        """Record rows touched, and (old_value, new_value) pairs changed."""
+        self.rows += rows
+        self.bytes_changed += sum(value_size(new) for old, new in changes if old != new)
+
+    def _count_query(self, execute: Callable, *args: Any) -> Any:
+        self.queries += 1
+        return execute(*args)
+
+    def __enter__(self) -> Recorder:
+        connections[self.using].execute_wrappers.append(self._count_query)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        seconds = time.perf_counter() - self.start
+        connections[self.using].execute_wrappers.remove(self._count_query)
+        if exc_type:
+            return
+        measurement = Measurement(
+            operation=self.operation,
+            model=self.model._meta.label,
+            field=self.field,
+            seconds=seconds,
+            rows=self.rows,
+            queries=self.queries,
+            bytes_changed=self.bytes_changed,
+        )
+        for callback in self.callbacks:
+            callback(measurement)
+
+
+class _NullRecorder(Recorder):
+    """Recorder used when an operation is not measured - does nothing."""
+
+    def __init__(self) -> None:
+        pass
+
+    def record(self, rows: int, changes: Iterable[tuple[Any, Any]] = ()) -> None:
+        pass
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def measure(
+    operation: str,
+    model: type[models.Model],
+    field: str | None = None,
+    using: str | None = None,
+) -> Recorder:
+    """Return a context manager that measures an operation."""
+    if not _callbacks:
+        return NULL_RECORDER
+    sampled = [
+        callback
+        for callback, rate in _callbacks
+        if rate == 1 or random.random() < rate  # noqa: S311
+    ]
+    if not sampled:
+        return NULL_RECORDER
+    return Recorder(sampled, operation, model, field, using or DEFAULT_DB_ALIAS)
+
+
+@dataclasses.dataclass
+class Totals:
+    calls: int = 0
+    seconds: float = 0
+    rows: int = 0
+    queries: int = 0
+    bytes_changed: int = 0
+
+    def add(self, measurement: Measurement) -> None:
+        self.calls += 1
+        self.seconds += measurement.seconds
+        self.rows += measurement.rows
+        self.queries += measurement.queries
+        self.bytes_changed += measurement.bytes_changed
+
+
+class Collector:
+    """
+    Metrics callback that aggregates measurements for a summary report.
+
+    Totals are kept per (model, field, operation). When sampling, the
+    totals only cover the sampled operations.
+
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[tuple[str, str, str], Totals] = defaultdict(Totals)
+        self._lock = threading.Lock()
+
+    def __call__(self, measurement: Measurement) -> None:
+        key = (measurement.model, measurement.field or "", measurement.operation)
+        with self._lock:
+            self.totals[key].add(measurement)
+
+    def report(self) -> str:
+        """Return a plain text table of totals, slowest first."""
+        header = (
+            f"{'model':<30} {'field':<20} {'operation':<18} {'calls':>8} "
+            f"{'seconds':>9} {'rows':>10} {'queries':>8} {'bytes':>12}"
+        )
+        lines = [header, "-" * len(header)]
+        for (model, field, operation), totals in sorted(
+            self.totals.items(), key=lambda item: item[1].seconds, reverse=True
+        ):
+            lines.append(
+                f"{model:<30} {field:<20} {operation:<18} {totals.calls:>8} "
+                f"{totals.seconds:>9.3f} {totals.rows:>10} {totals.queries:>8} "
+                f"{totals.bytes_changed:>12}"
+            )
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def collect(sample_rate: float = 1.0) -> Iterator[Collector]:
+    """
+    Collect measurements for the duration of a block.
+
+        with instrumentation.collect() as collector:
+            anonymiser.anonymise_queryset(queryset)
+        print(collector.report())
+
+    """
+    collector = Collector()
+    add_callback(collector, sample_rate)
+    try:
+        yield collector
+    finally:
+        remove_callback(collector)
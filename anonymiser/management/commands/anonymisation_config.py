@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import csv
+import json
+import os
 from collections import namedtuple
-from typing import Any
+from typing import Any, Callable, Iterator
 
 from django.apps import apps
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
 from django.template.loader import render_to_string
 
-from anonymiser import registry
+from anonymiser import fingerprints, registry
+from anonymiser.models import ModelFieldSummary
 
 ModelAnonymiserSummary = namedtuple(
     "ModelAnonymiserSummary",
@@ -39,24 +44,213 @@ def get_model_anonymisers() -> list[ModelAnonymiserSummary]:
     return output
 
 
+def get_models(
+    app_labels: list[str] | None = None, model_labels: list[str] | None = None
+) -> list[type[models.Model]]:
+    """
+    Return the (concrete, non-proxy) models to include, sorted by label.
+
+    Models are filtered by app label and / or model label (app.Model) -
+    if both are given a model is included if it matches either.
+
+    """
+    try:
+        selected = {apps.get_model(label) for label in model_labels or []}
+        for app_label in app_labels or []:
+            selected.update(apps.get_app_config(app_label).get_models())
+    except (LookupError, ValueError) as ex:
+        raise CommandError(str(ex)) from ex
+    if not (app_labels or model_labels):
+        selected = set(apps.get_models())
+    return registry.sort_by_name(
+        [m for m in selected if not (m._meta.abstract or m._meta.proxy)]
+    )
+
+
+def get_scope_filter(
+    models: list[type[models.Model]], app_labels: list[str] | None
+) -> Callable[[str], bool]:
+    """
+    Return a function that tests if a (stored) model label is selected.
+
+    A label is selected if it is one of the selected `models`, or belongs
+    to one of the selected apps - so that models removed from those apps
+    are still reported.
+
+    """
+    labels = {m._meta.label for m in models}
+    app_labels = [apps.get_app_config(a).label for a in app_labels or []]
+    return lambda label: label in labels or label.split(".")[0] in app_labels
+
+
+def iter_field_summaries(
+    models: list[type[models.Model]],
+) -> Iterator[ModelFieldSummary]:
+    for model in models:
+        yield from registry.get_field_summaries(model)
+
+
+def get_row(summary: ModelFieldSummary) -> dict[str, Any]:
+    return {
+        "app": summary.app_label,
+        "model": summary.model_name,
+        "field": summary.field_name,
+        "type": summary.field_type,
+        "anonymised": summary.is_anonymised,
+        "redaction": summary.redaction_strategy.value or None,
+    }
+
+
+def get_columns(row: dict[str, Any]) -> list[str]:
+    """Return the row as (md / csv) display columns."""
+    return [
+        row["app"],
+        row["model"],
+        row["field"],
+        row["type"],
+        "X" if row["anonymised"] else "-",
+        row["redaction"] or "-",
+    ]
+
+
+HEADERS = ["App", "Model", "Field", "Type", "Anonymise", "Redact"]
+
+
 class Command(BaseCommand):
     help = "Display anonymisation configuration"  # noqa: A003
 
     def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=["md", "csv", "json"],
+            default="md",
+            help="Output format (defaults to md).",
+        )
+        parser.add_argument(
+            "--app",
+            action="append",
+            dest="app_labels",
+            metavar="APP_LABEL",
+            help="Only include models in this app (can be repeated).",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="model_labels",
+            metavar="APP_LABEL.MODEL",
+            help="Only include this model (can be repeated).",
+        )
+        parser.add_argument(
+            "--fingerprints",
+            metavar="PATH",
+            help=(
+                "Compare the config against a fingerprints file, and list the "
+                "models that have changed (exits with an error if any have)."
+            ),
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Write the fingerprints file, instead of comparing against it.",
+        )
         parser.add_argument(
             "-t",
             "--template",
-            default="anonymisation_config.md",
-            help=("Template to use for output (defaults to anonymisation_config.md)."),
+            default=None,
+            help=(
+                "Render the output using a template (e.g. anonymisation_config.md) "
+                "instead of streaming it."
+            ),
         )
 
     def handle(self, *args: Any, **options: Any) -> None:
-        template_name = options["template"]
+        models = get_models(options["app_labels"], options["model_labels"])
+        if path := options["fingerprints"]:
+            scope = None
+            if options["app_labels"] or options["model_labels"]:
+                scope = get_scope_filter(models, options["app_labels"])
+            if options["update"]:
+                self.update_fingerprints(path, models, scope)
+            else:
+                self.check_fingerprints(path, models, scope)
+            return
+        if template_name := options["template"]:
+            self.write_template(template_name, models)
+            return
+        rows = (get_row(summary) for summary in iter_field_summaries(models))
+        writer = getattr(self, f"write_{options['format']}")
+        writer(rows)
+
+    def load_fingerprints(self, path: str) -> dict[str, Any]:
+        try:
+            return fingerprints.load_fingerprints(path)
+        except (OSError, ValueError) as ex:
+            raise CommandError(f"Unable to read fingerprints file: {ex}") from ex
+
+    def update_fingerprints(
+        self,
+        path: str,
+        models: list[type[models.Model]],
+        scope: Callable[[str], bool] | None,
+    ) -> None:
+        current = fingerprints.get_fingerprints(models)
+        if scope and os.path.exists(path):
+            # filtered by --app / --model - keep the other stored models
+            stored = self.load_fingerprints(path)
+            current = {
+                **{k: v for k, v in stored.items() if not scope(k)},
+                **current,
+            }
+        fingerprints.write_fingerprints(current, path)
+        self.stdout.write(f"Fingerprints written to {path}")
+
+    def check_fingerprints(
+        self,
+        path: str,
+        models: list[type[models.Model]],
+        scope: Callable[[str], bool] | None,
+    ) -> None:
+        stored = self.load_fingerprints(path)
+        current = fingerprints.get_fingerprints(models)
+        if scope:
+            # filtered by --app / --model - only compare the selected models
+            stored = {k: v for k, v in stored.items() if scope(k)}
+        if lines := fingerprints.diff_fingerprints(stored, current):
+            self.stdout.write("\n".join(lines))
+            raise CommandError("Anonymisation config has changed")
+        self.stdout.write("Anonymisation config unchanged")
+
+    def write_template(
+        self, template_name: str, models: list[type[models.Model]]
+    ) -> None:
         out = render_to_string(
             f"anonymiser/{template_name}",
             {
                 "model_anonymisers": get_model_anonymisers(),
-                "model_fields": registry.get_all_model_fields(),
+                "model_fields": {
+                    m._meta.label: registry.get_field_summaries(m) for m in models
+                },
             },
         )
         self.stdout.write(out)
+
+    def write_md(self, rows: Iterator[dict[str, Any]]) -> None:
+        self.stdout.write("## Model field anonymisation")
+        self.stdout.write(" | ".join(HEADERS))
+        self.stdout.write(" | ".join(["---"] * len(HEADERS)))
+        for row in rows:
+            self.stdout.write(" | ".join(get_columns(row)))
+
+    def write_csv(self, rows: Iterator[dict[str, Any]]) -> None:
+        writer = csv.writer(self.stdout, lineterminator="\n")
+        writer.writerow(HEADERS)
+        for row in rows:
+            writer.writerow(get_columns(row))
+
+    def write_json(self, rows: Iterator[dict[str, Any]]) -> None:
+        # a JSON array, written one object (line) at a time
+        self.stdout.write("[", ending="")
+        for i, row in enumerate(rows):
+            self.stdout.write(f"{',' if i else ''}\n  {json.dumps(row)}", ending="")
+        self.stdout.write("\n]")
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import functools
+from typing import Any
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from anonymiser import instrumentation, planner, registry
+from anonymiser.batching import DEFAULT_BATCH_SIZE
+from anonymiser.scheduler import ModelResult, anonymise_model, run_models
+
+
+class Command(BaseCommand):
+    help = "Redact and anonymise all registered models (DESTRUCTIVE)"  # noqa: A003
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.ModelName",
+            help="Models to anonymise (defaults to all registered models).",
+        )
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Do NOT prompt the user for input of any kind.",
+        )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of models to anonymise concurrently (defaults to 1).",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Use a process pool instead of a thread pool for workers.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Row-level anonymisation batch size.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Redact in pk ranges of this many rows, committing each.",
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            default=0,
+            help="Seconds to sleep between redaction chunks.",
+        )
+        parser.add_argument(
+            "--skip-unchanged",
+            action="store_true",
+            help="Only redact rows that do not already have the redacted values.",
+        )
+        parser.add_argument(
+            "--no-redact",
+            action="store_false",
+            dest="redact",
+            help="Skip table-level redaction.",
+        )
+        parser.add_argument(
+            "--no-anonymise",
+            action="store_false",
+            dest="anonymise",
+            help="Skip row-level anonymisation.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Checkpoint anonymisation, resuming from any previous checkpoint.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only process rows added / changed since the last incremental run.",
+        )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Output what the run would do, without changing any data.",
+        )
+        parser.add_argument(
+            "--throughput",
+            metavar="PATH",
+            default=None,
+            help="Benchmark results file used to project durations (with --plan).",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Output a timing report per model / field (not with --processes).",
+        )
+        parser.add_argument(
+            "--sample-rate",
+            type=float,
+            default=1.0,
+            help="Fraction of operations to measure for the report (0-1).",
+        )
+
+    def get_models(self, labels: list[str]) -> list[type[models.Model]]:
+        if not labels:
+            return registry.get_anonymisable_models()
+        try:
+            selected = [apps.get_model(label) for label in labels]
+        except (LookupError, ValueError) as ex:
+            raise CommandError(str(ex)) from ex
+        for model in selected:
+            if not registry.get_model_anonymiser(model):
+                raise CommandError(f"No anonymiser registered for {model._meta.label}")
+        return selected
+
+    def confirm(self, selected: list[type[models.Model]]) -> bool:
+        labels = ", ".join(m._meta.label for m in selected)
+        answer = input(
+            f"This will IRREVERSIBLY overwrite data in: {labels}.\n"
+            "Type 'yes' to continue, or 'no' to cancel: "
+        )
+        return answer == "yes"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["report"] and options["processes"]:
+            raise CommandError("--report cannot be used with --processes")
+        if not 0 < options["sample_rate"] <= 1:
+            raise CommandError("--sample-rate must be greater than 0, and at most 1")
+        selected = self.get_models(options["models"])
+        if options["plan"]:
+            self.write_plan(selected, **options)
+            return
+        if options["interactive"] and not self.confirm(selected):
+            self.stdout.write("Anonymisation cancelled.")
+            return
+        job = functools.partial(
+            anonymise_model,
+            redact=options["redact"],
+            anonymise=options["anonymise"],
+            batch_size=options["batch_size"],
+            chunk_size=options["chunk_size"],
+            throttle=options["throttle"],
+            resume=options["resume"],
+            incremental=options["incremental"],
+            skip_unchanged=options["skip_unchanged"],
+        )
+        if not options["report"]:
+            results = self.run_models(job, selected, **options)
+        else:
+            with instrumentation.collect(options["sample_rate"]) as collector:
+                results = self.run_models(job, selected, **options)
+        for label, result in sorted(results.items()):
+            self.stdout.write(
+                f"{label}: {result.redacted} redacted, {result.anonymised} anonymised"
+            )
+        if options["report"]:
+            self.stdout.write(collector.report())
+
+    def write_plan(self, selected: list[type[models.Model]], **options: Any) -> None:
+        throughput = {}
+        if options["throughput"]:
+            try:
+                throughput = planner.load_throughput(options["throughput"])
+            except (OSError, ValueError, KeyError) as ex:
+                raise CommandError(f"Unable to read throughput: {ex}") from ex
+        plans = planner.plan_models(
+            selected,
+            redact=options["redact"],
+            anonymise=options["anonymise"],
+            chunk_size=options["chunk_size"],
+            skip_unchanged=options["skip_unchanged"],
+            resume=options["resume"],
+            incremental=options["incremental"],
+            throughput=throughput,
+        )
+        self.stdout.write(planner.format_plan(plans))
+
+    def run_models(
+        self, job: Any, selected: list[type[models.Model]], **options: Any
+    ) -> dict[str, ModelResult]:
+        return run_models(
+            job,
+            selected,
+            max_workers=options["workers"],
+            processes=options["processes"],
+        )
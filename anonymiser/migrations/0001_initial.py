@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="AnonymisationCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_label", models.CharField(max_length=100, unique=True)),
+                ("anonymiser_version", models.CharField(blank=True, max_length=50)),
+                ("last_pk", models.CharField(blank=True, max_length=255)),
+                ("batch_number", models.PositiveIntegerField(default=0)),
+                ("rows_processed", models.PositiveBigIntegerField(default=0)),
+                ("started_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("anonymiser", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnonymisationWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_label", models.CharField(max_length=100, unique=True)),
+                ("field_name", models.CharField(max_length=100)),
+                ("value", models.CharField(max_length=255)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import dataclasses
+import datetime
+import inspect
+import time
+import uuid
+from decimal import Decimal
 from enum import StrEnum  # 3.11 only
-from typing import Any, Callable, TypeAlias
-
-from django.db import models
-
-from .redacters import get_default_field_redacter
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, TypeAlias
+
+from asgiref.sync import sync_to_async
+from django.db import connections, models, transaction
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+from . import instrumentation
+from .batching import (
+    DEFAULT_BATCH_SIZE,
+    aiter_pk_batches,
+    aiter_pk_chunks,
+    iter_pk_batches,
+    iter_pk_chunks,
+)
+from .db import postgres, writers
+from .db.functions import is_volatile_expression
+from .db.lookups import IsDistinctFrom
+from .redacters import get_default_field_redacter, is_volatile
 
 # (old_value, new_value) tuple
 AnonymisationResult: TypeAlias = tuple[Any, Any]
+# anonymise_<field>(obj) - anonymise a single field on an object
+RowFunction: TypeAlias = Callable[[models.Model], None]
+# anonymise_<field>__batch(values) - anonymise a column of values
+BatchFunction: TypeAlias = Callable[[list[Any]], list[Any]]
 
 
 def get_model_fields(model: type[models.Model]) -> list[models.Field]:
@@ -26,20 +52,384 @@ def get_model_fields(model: type[models.Model]) -> list[models.Field]:
     ]
 
 
+def _bind(func: Any, instance: Any) -> Any:
+    """Bind a class attribute to an instance, as normal attribute access would."""
+    if binder := getattr(func, "__get__", None):
+        return binder(instance, type(instance))
+    return func
+
+
+def _row_function(field_name: str, batch_func: BatchFunction) -> RowFunction:
+    """Adapt an anonymise_<field>__batch function to a single object."""
+
+    def anonymise_field(obj: models.Model) -> None:
+        setattr(obj, field_name, batch_func([getattr(obj, field_name)])[0])
+
+    return anonymise_field
+
+
+@dataclasses.dataclass(frozen=True)
+class AnonymisationPlan:
+    """
+    Precompiled anonymisation plan for an anonymiser class.
+
+    Holds the ordered list of anonymisable fields, and the matching
+    `anonymise_<field>` and `anonymise_<field>__batch` functions (either
+    of which may be None), so that anonymising an object does no
+    reflection at all. Plans are built once per anonymiser class - see
+    `AnonymiserBase.get_anonymisation_plan`.
+
+    """
+
+    fields: tuple[models.Field, ...]
+    functions: tuple[Any, ...]
+    batch_functions: tuple[Any, ...]
+
+    @property
+    def field_names(self) -> list[str]:
+        return [f.name for f in self.fields]
+
+    def bind(self, anonymiser: AnonymiserBase) -> list[tuple[str, RowFunction]]:
+        """
+        Return (field_name, bound_method) pairs for the anonymiser.
+
+        Fields that only have a batch function are adapted to work on a
+        single object.
+
+        """
+        return [
+            (
+                field.name,
+                (
+                    _bind(func, anonymiser)
+                    if func
+                    else _row_function(field.name, _bind(batch_func, anonymiser))
+                ),
+            )
+            for field, func, batch_func in zip(
+                self.fields, self.functions, self.batch_functions
+            )
+        ]
+
+    def bind_columns(
+        self, anonymiser: AnonymiserBase
+    ) -> list[tuple[str, RowFunction, BatchFunction | None]]:
+        """Return (field_name, bound_method, bound_batch_method) for the anonymiser."""
+        return [
+            (field_name, func, _bind(batch_func, anonymiser) if batch_func else None)
+            for (field_name, func), batch_func in zip(
+                self.bind(anonymiser), self.batch_functions
+            )
+        ]
+
+
+@dataclasses.dataclass(frozen=True)
+class RedactionPlan:
+    """
+    Precompiled redaction plan for a redacter class.
+
+    Holds the redactable fields, and the auto-redacter function for
+    each field that has one - see `RedacterBase.get_redaction_plan`.
+
+    The auto-redaction values are memoised in the plan, with the
+    exception of those from volatile (e.g. time-dependent) redacters,
+    which are called each time the values are requested.
+
+    """
+
+    fields: tuple[models.Field, ...]
+    auto_redacters: tuple[tuple[models.Field, Callable[[models.Field], Any]], ...]
+    memoised_values: Mapping[str, Any]
+    volatile_redacters: tuple[tuple[models.Field, Callable[[models.Field], Any]], ...]
+
+    def get_auto_redaction_values(self) -> dict[str, Any]:
+        values = dict(self.memoised_values)
+        values.update({f.name: func(f) for f, func in self.volatile_redacters})
+        return values
+
+
+# plans are cached per anonymiser class - see clear_plan_cache
+_anonymisation_plans: dict[type, AnonymisationPlan] = {}
+_redaction_plans: dict[type, RedactionPlan] = {}
+
+
+def clear_plan_cache(*args: Any, **kwargs: Any) -> None:
+    """
+    Clear all cached anonymisation and redaction plans.
+
+    Called whenever the anonymiser registry or the app registry changes,
+    and can be used as a signal receiver.
+
+    """
+    _anonymisation_plans.clear()
+    _redaction_plans.clear()
+
+
+def _set_column(
+    objects: list[models.Model], field_name: str, values: list[Any]
+) -> None:
+    if len(values) != len(objects):
+        raise ValueError(
+            f"anonymise_{field_name}__batch returned {len(values)} values "
+            f"for {len(objects)} objects"
+        )
+    for obj, value in zip(objects, values):
+        setattr(obj, field_name, value)
+
+
+# values of these types cannot be changed in place - see is_changed
+_IMMUTABLE_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+)
+
+
+def is_changed(old_value: Any, new_value: Any) -> bool:
+    """Return True if the anonymised value differs from the original."""
+    if old_value is new_value:
+        # a mutable value (e.g. a JSONField dict) may have been updated in
+        # place, in which case the old value _is_ the new value.
+        return not isinstance(new_value, _IMMUTABLE_TYPES)
+    return old_value != new_value
+
+
+def get_changes(
+    objects: list[models.Model], old_values: dict[str, list[Any]]
+) -> tuple[list[models.Model], list[str]]:
+    """
+    Return the objects, and the fields, that have been changed.
+
+    The `old_values` dict maps field names to the list of values before
+    anonymisation (in the same order as `objects`). A field is included
+    if it has changed on any object, and an object is included if any of
+    its fields has changed.
+
+    """
+    changed_fields = []
+    changed_objects: set[int] = set()
+    for field_name, values in old_values.items():
+        changed = {
+            i
+            for i, (obj, old_value) in enumerate(zip(objects, values))
+            if is_changed(old_value, getattr(obj, field_name))
+        }
+        if changed:
+            changed_fields.append(field_name)
+            changed_objects |= changed
+    return [objects[i] for i in sorted(changed_objects)], changed_fields
+
+
+def get_changed_filter(
+    queryset: models.QuerySet[models.Model], values: dict[str, Any]
+) -> models.Q | None:
+    """
+    Return a filter for rows where any field is distinct from its value.
+
+    Volatile expressions (e.g. GenerateUuid4) are not compared, as they
+    never match the current value. Returns None if there are no values
+    left to compare.
+
+    """
+    values = {k: v for k, v in values.items() if not is_volatile_expression(v)}
+    if not values:
+        return None
+    opts = queryset.model._meta
+    return models.Q(
+        *(
+            IsDistinctFrom(
+                models.F(name),
+                (
+                    value
+                    if hasattr(value, "resolve_expression")
+                    else models.Value(value, output_field=opts.get_field(name))
+                ),
+            )
+            for name, value in values.items()
+        ),
+        _connector=models.Q.OR,
+    )
+
+
+def get_update_sql(
+    queryset: models.QuerySet[models.Model], values: dict[str, Any]
+) -> tuple[str, tuple[Any, ...]]:
+    """Return the SQL and params of `queryset.update(**values)`, without running it."""
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    query.clear_select_clause()
+    return query.get_compiler(queryset.db).as_sql()
+
+
+def get_redaction_select(
+    queryset: models.QuerySet[models.Model], values: dict[str, Any]
+) -> tuple[list[str], str, list[Any]]:
+    """
+    Return the columns, and the SQL / params, of a SELECT of redacted rows.
+
+    The SELECT returns every (non-generated) column of the model table,
+    with the redaction value in place of the current value for each
+    field in `values` - i.e. the rows as they would be after an UPDATE
+    of those values. The queryset filters are ignored - it is the whole
+    table.
+
+    """
+    model = queryset.model
+    query = queryset.query.chain()
+    compiler = query.get_compiler(queryset.db)
+    fields = [
+        f for f in model._meta.concrete_fields if not getattr(f, "generated", False)
+    ]
+    select, params = [], []
+    for field in fields:
+        value = values.get(field.name, models.F(field.attname))
+        if not hasattr(value, "resolve_expression"):
+            value = models.Value(value, output_field=field)
+        sql, value_params = compiler.compile(
+            value.resolve_expression(query, allow_joins=False, for_save=True)
+        )
+        select.append(sql)
+        params.extend(value_params)
+    table = compiler.quote_name_unless_alias(model._meta.db_table)
+    return (
+        [f.column for f in fields],
+        f"SELECT {', '.join(select)} FROM {table}",  # noqa: S608
+        params,
+    )
+
+
 class _ModelBase:
     # Override with the model to be anonymised
     model: type[models.Model]
 
+    # Field used to find new / changed rows in incremental runs (e.g. an
+    # auto_now "updated_at" field) - defaults to the primary key, which
+    # only finds new rows. The field is never redacted or anonymised, as
+    # that would move every row above the watermark.
+    incremental_field: str | None = None
+
     def get_model_fields(self) -> list[models.Field]:
         """Return a list of fields on the model."""
         if not self.model:
             raise NotImplementedError("model must be set")
         return get_model_fields(self.model)
 
+    def get_incremental_field(self) -> models.Field:
+        """Return the watermark field for incremental runs."""
+        if self.incremental_field:
+            return self.model._meta.get_field(self.incremental_field)
+        return self.model._meta.pk
+
+    def is_incremental_field(self, field: models.Field) -> bool:
+        return bool(self.incremental_field) and field.name == self.incremental_field
+
+
+class AnonymisationCheckpoint(models.Model):
+    """
+    Progress of a resumable `anonymise_queryset` run.
+
+    There is (at most) one checkpoint per model, which records the last
+    primary key anonymised, and is updated in the same transaction as
+    each batch. The checkpoint is deleted when the run completes, and is
+    ignored (and reset) if the anonymiser version has changed.
+
+    """
+
+    model_label = models.CharField(max_length=100, unique=True)
+    anonymiser_version = models.CharField(max_length=50, blank=True)
+    last_pk = models.CharField(max_length=255, blank=True)
+    batch_number = models.PositiveIntegerField(default=0)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.model_label} (batch {self.batch_number}, pk {self.last_pk})"
+
+    @classmethod
+    def get_checkpoint(
+        cls, model: type[models.Model], version: str, using: str | None = None
+    ) -> AnonymisationCheckpoint:
+        """Return the checkpoint for a model (unsaved if there isn't one)."""
+        label = model._meta.label
+        checkpoint = cls.objects.using(using).filter(model_label=label).first()
+        if checkpoint and checkpoint.anonymiser_version == version:
+            return checkpoint
+        # new, or stale - start from the beginning
+        return cls(
+            id=checkpoint.id if checkpoint else None,
+            model_label=label,
+            anonymiser_version=version,
+        )
+
+    def get_last_pk(self, model: type[models.Model]) -> Any:
+        """Return last_pk as a pk value (None if nothing has been processed)."""
+        if not self.last_pk:
+            return None
+        return model._meta.pk.to_python(self.last_pk)
+
+    def advance(self, last_pk: Any, rows: int, using: str | None = None) -> None:
+        """Record a processed batch (and SAVE)."""
+        self.last_pk = str(last_pk)
+        self.batch_number += 1
+        self.rows_processed += rows
+        self.save(using=using)
+
+
+class AnonymisationWatermark(models.Model):
+    """
+    High-water mark of the last incremental run for a model.
+
+    The value is the maximum value of the watermark field (the
+    anonymiser `incremental_field`, or the primary key) at the start of
+    the last completed incremental run. The watermark is ignored if the
+    field has changed since it was recorded.
+
+    """
+
+    model_label = models.CharField(max_length=100, unique=True)
+    field_name = models.CharField(max_length=100)
+    value = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.model_label}.{self.field_name} > {self.value}"
+
+    @classmethod
+    def get_watermark(cls, field: models.Field, using: str | None = None) -> Any | None:
+        """Return the last watermark value for a model field (or None)."""
+        watermark = (
+            cls.objects.using(using)
+            .filter(model_label=field.model._meta.label, field_name=field.name)
+            .first()
+        )
+        return field.to_python(watermark.value) if watermark else None
+
+    @classmethod
+    def set_watermark(
+        cls, field: models.Field, value: Any, using: str | None = None
+    ) -> None:
+        cls.objects.using(using).update_or_create(
+            model_label=field.model._meta.label,
+            defaults={"field_name": field.name, "value": str(value)},
+        )
+
 
 class AnonymiserBase(_ModelBase):
     """Base class for anonymisation functions."""
 
+    # Change this whenever the anonymisation functions change, so that
+    # resumable runs started with an older version start again.
+    version: str = ""
+
     def __setattr__(self, __name: str, __value: Any) -> None:
         """
         Prevent setting of attribute on the anonymiser itself.
@@ -53,7 +443,7 @@ class AnonymiserBase(_ModelBase):
         that looks like it maps to an anonymiser method.
 
         """
-        if hasattr(self, f"anonymise_{__name}"):
+        if self._has_anonymiser(__name):
             raise AttributeError(
                 "Cannot set anonymiser attributes directly - did you mean to "
                 "use 'obj' instead of 'self' in method "
@@ -61,26 +451,60 @@ class AnonymiserBase(_ModelBase):
             )
         super().__setattr__(__name, __value)
 
+    def _has_anonymiser(self, field_name: str) -> bool:
+        return hasattr(self, f"anonymise_{field_name}") or hasattr(
+            self, f"anonymise_{field_name}__batch"
+        )
+
     def is_field_anonymised(self, field: models.Field) -> bool:
-        return hasattr(self, f"anonymise_{field.name}")
+        if self.is_incremental_field(field):
+            return False
+        return self._has_anonymiser(field.name)
 
     def get_anonymisable_fields(self) -> list[models.Field]:
         """Return a list of fields on the model that are anonymisable."""
         return [f for f in self.get_model_fields() if self.is_field_anonymised(f)]
 
+    def get_anonymisation_plan(self) -> AnonymisationPlan:
+        """
+        Return the (cached) anonymisation plan for this anonymiser class.
+
+        The plan is built from `get_anonymisable_fields` the first time it
+        is requested, and cached until the registry or the app registry
+        changes. Anonymisation config is therefore assumed to be declared
+        on the class, not set per instance.
+
+        """
+        cls = type(self)
+        if (plan := _anonymisation_plans.get(cls)) is None:
+            fields = tuple(self.get_anonymisable_fields())
+            plan = AnonymisationPlan(
+                fields=fields,
+                functions=tuple(
+                    inspect.getattr_static(self, f"anonymise_{f.name}", None)
+                    for f in fields
+                ),
+                batch_functions=tuple(
+                    inspect.getattr_static(self, f"anonymise_{f.name}__batch", None)
+                    for f in fields
+                ),
+            )
+            _anonymisation_plans[cls] = plan
+        return plan
+
     def anonymise_field(
         self, obj: models.Model, field: models.Field
     ) -> AnonymisationResult:
         """Anonymise a single field on the model instance."""
         field_name = field.name
         if not (anon_func := getattr(self, f"anonymise_{field_name}", None)):
-            raise NotImplementedError(
-                f"Anonymiser function 'anonymise_{field_name}' not implemented"
-            )
-        old_value = getattr(obj, field_name)
-        anon_func(obj)
-        new_value = getattr(obj, field_name)
-        return old_value, new_value
+            batch_func = getattr(self, f"anonymise_{field_name}__batch", None)
+            if not batch_func:
+                raise NotImplementedError(
+                    f"Anonymiser function 'anonymise_{field_name}' not implemented"
+                )
+            anon_func = _row_function(field_name, batch_func)
+        return self._anonymise_fields(obj, [(field_name, anon_func)])[field_name]
 
     def anonymise_object(self, obj: models.Model) -> list[str]:
         """
@@ -89,12 +513,221 @@ class AnonymiserBase(_ModelBase):
         Returns the list of fields that were anonymised.
 
         """
-        output = {}
-        for field in self.get_anonymisable_fields():
-            output[field.name] = self.anonymise_field(obj, field)
-        self.post_anonymise_object(obj, **output)
+        plan = self.get_anonymisation_plan()
+        with instrumentation.measure(
+            "anonymise_object", type(obj), using=obj._state.db
+        ) as recorder:
+            if type(self).anonymise_field is AnonymiserBase.anonymise_field:
+                output = self._anonymise_fields(obj, plan.bind(self))
+            else:
+                # subclasses that override anonymise_field are called per field
+                output = {f.name: self.anonymise_field(obj, f) for f in plan.fields}
+            self.post_anonymise_object(obj, **output)
+            recorder.record(1, output.values())
         return list(output.keys())
 
+    def _anonymise_fields(
+        self, obj: models.Model, functions: list[tuple[str, RowFunction]]
+    ) -> dict[str, AnonymisationResult]:
+        output = {}
+        for field_name, anon_func in functions:
+            with instrumentation.measure(
+                "anonymise_field", type(obj), field_name, obj._state.db
+            ) as recorder:
+                old_value = getattr(obj, field_name)
+                anon_func(obj)
+                output[field_name] = (old_value, getattr(obj, field_name))
+                recorder.record(1, [output[field_name]])
+        return output
+
+    def anonymise_objects(self, objects: list[models.Model]) -> list[str]:
+        """
+        Anonymise a list of model instances (NOT THREAD SAFE).
+
+        This is the batched counterpart of `anonymise_object`. Fields are
+        anonymised a column at a time - where an anonymiser declares an
+        `anonymise_<field>__batch(values)` method, it is called once with
+        the list of current values for the column, and must return a list
+        of new values in the same order; otherwise `anonymise_<field>` is
+        called for each object. `post_anonymise_object` is then called
+        for each object, as it would be by `anonymise_object`.
+
+        Returns the list of fields that were anonymised.
+
+        """
+        columns = self.get_anonymisation_plan().bind_columns(self)
+        return list(self._anonymise_objects(objects, columns))
+
+    def anonymise_objects_for_update(
+        self, objects: list[models.Model]
+    ) -> tuple[list[models.Model], list[str]]:
+        """
+        Anonymise a list of model instances, and return what has changed.
+
+        As `anonymise_objects`, but returns the objects that have changed,
+        and the fields that have changed on any of them - i.e. what needs
+        to be written back. Re-anonymising already anonymised objects
+        will typically return nothing.
+
+        """
+        columns = self.get_anonymisation_plan().bind_columns(self)
+        return get_changes(objects, self._anonymise_objects(objects, columns))
+
+    def _anonymise_objects(
+        self,
+        objects: list[models.Model],
+        columns: list[tuple[str, RowFunction, BatchFunction | None]],
+    ) -> dict[str, list[Any]]:
+        """Anonymise the objects, returning the old values for each field."""
+        old_values = {}
+        for field_name, anon_func, batch_func in columns:
+            old_values[field_name] = [getattr(obj, field_name) for obj in objects]
+            with self._measure_column(objects, field_name) as recorder:
+                if batch_func:
+                    values = batch_func(old_values[field_name])
+                    _set_column(objects, field_name, values)
+                else:
+                    for obj in objects:
+                        anon_func(obj)
+                recorder.record(
+                    len(objects),
+                    zip(
+                        old_values[field_name],
+                        (getattr(obj, field_name) for obj in objects),
+                    ),
+                )
+        for i, obj in enumerate(objects):
+            output = {
+                field_name: (values[i], getattr(obj, field_name))
+                for field_name, values in old_values.items()
+            }
+            self.post_anonymise_object(obj, **output)
+        return old_values
+
+    def _measure_column(
+        self, objects: list[models.Model], field_name: str
+    ) -> instrumentation.Recorder:
+        if not objects:
+            return instrumentation.NULL_RECORDER
+        obj = objects[0]
+        return instrumentation.measure(
+            "anonymise_column", type(obj), field_name, obj._state.db
+        )
+
+    def anonymise_queryset(
+        self,
+        queryset: models.QuerySet[models.Model],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        resume: bool = False,
+        skip_unchanged: bool = True,
+    ) -> list[int]:
+        """
+        Anonymise a queryset in batches (and SAVE).
+
+        The queryset is walked in primary key order using keyset
+        pagination. Each batch of objects is passed through
+        `anonymise_objects`, and is then written back in one go, restricted
+        to the anonymised fields - see `anonymiser.db.writers`. Unless
+        `skip_unchanged` is False, only the objects and fields whose values
+        have actually changed are written (see `get_changes`), so that
+        re-running anonymisation over anonymised data is cheap.
+
+        If `resume` is True, progress is recorded in an
+        `AnonymisationCheckpoint` that is saved in the same transaction
+        as each batch, and the run starts after the last checkpointed pk
+        (if any) - so a run that is interrupted can be restarted without
+        repeating work. Checkpoints are per model, so resumable runs of
+        the same model must not overlap.
+
+        Returns the number of rows updated in each batch (of this run).
+
+        """
+        plan = self.get_anonymisation_plan()
+        if not (field_names := plan.field_names):
+            return []
+        checkpoint = (
+            AnonymisationCheckpoint.get_checkpoint(
+                queryset.model, self.version, using=queryset.db
+            )
+            if resume
+            else None
+        )
+        start_after = checkpoint.get_last_pk(queryset.model) if checkpoint else None
+        columns = plan.bind_columns(self)
+        counts = []
+        for batch in iter_pk_batches(queryset, batch_size, start_after):
+            # the checkpoint must be committed with the batch it records
+            atomic = (
+                transaction.atomic(using=queryset.db)
+                if checkpoint
+                else contextlib.nullcontext()
+            )
+            with atomic, instrumentation.measure(
+                "anonymise_batch", queryset.model, using=queryset.db
+            ) as recorder:
+                old_values = self._anonymise_objects(batch, columns)
+                objects, fields = (
+                    get_changes(batch, old_values)
+                    if skip_unchanged
+                    else (batch, field_names)
+                )
+                counts.append(writers.update_objects(objects, fields, queryset.db))
+                recorder.record(counts[-1])
+                if checkpoint:
+                    checkpoint.advance(batch[-1].pk, counts[-1], using=queryset.db)
+        if checkpoint and checkpoint.pk:
+            checkpoint.delete(using=queryset.db)
+        return counts
+
+    async def aanonymise_queryset(
+        self,
+        queryset: models.QuerySet[models.Model],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        skip_unchanged: bool = True,
+    ) -> list[int]:
+        """
+        Async version of `anonymise_queryset` (and SAVE).
+
+        Batches are fetched with the async ORM, and the anonymiser
+        functions are called in the event loop, between queries - so they
+        must not themselves query the database. Each batch is written with
+        `anonymiser.db.writers` (as for `anonymise_queryset`) in the
+        ORM's worker thread, where the "anonymise_batch" measurement is
+        taken - so it covers the write only, not the anonymiser functions.
+        Runs cannot be resumed, as checkpoints are saved in the same
+        transaction as each batch, and the async ORM does not support
+        transactions.
+
+        """
+        plan = self.get_anonymisation_plan()
+        if not (field_names := plan.field_names):
+            return []
+        columns = plan.bind_columns(self)
+        write_batch = sync_to_async(self._write_batch)
+        counts = []
+        async for batch in aiter_pk_batches(queryset, batch_size):
+            old_values = self._anonymise_objects(batch, columns)
+            objects, fields = (
+                get_changes(batch, old_values)
+                if skip_unchanged
+                else (batch, field_names)
+            )
+            counts.append(await write_batch(queryset, objects, fields))
+        return counts
+
+    def _write_batch(
+        self,
+        queryset: models.QuerySet[models.Model],
+        objects: list[models.Model],
+        field_names: list[str],
+    ) -> int:
+        with instrumentation.measure(
+            "anonymise_batch", queryset.model, using=queryset.db
+        ) as recorder:
+            count = writers.update_objects(objects, field_names, queryset.db)
+            recorder.record(count)
+        return count
+
     def post_anonymise_object(
         self, obj: models.Model, **updates: AnonymisationResult
     ) -> None:
@@ -120,6 +753,10 @@ class RedacterBase(_ModelBase):
     # or a db function, e.g. F("field_name") or Value("static value").
     custom_field_redactions: dict[str, Any] = {}
 
+    # Set to False to call the auto-redacter functions on every redaction,
+    # rather than memoising the values - see get_redaction_plan.
+    memoise_redaction_values: bool = True
+
     class FieldRedactionStrategy(StrEnum):
         AUTO = "AUTO"
         CUSTOM = "CUSTOM"
@@ -129,12 +766,15 @@ class RedacterBase(_ModelBase):
         """
         Return True if the field can be redacted.
 
-        By default primary keys, relations, and choice fields cannot be
-        redacted. Override this method to change this behaviour.
+        By default primary keys, relations, choice fields, and the
+        `incremental_field` cannot be redacted. Override this method to
+        change this behaviour.
 
         """
         if field.is_relation:
             return False
+        if self.is_incremental_field(field):
+            return False
         if getattr(field, "primary_key", False):
             return False
         if getattr(field, "choices", None):
@@ -147,8 +787,50 @@ class RedacterBase(_ModelBase):
         """Return a list of fields on the model that are redactable."""
         return [f for f in self.get_model_fields() if self.is_field_redactable(f)]
 
+    def get_redaction_plan(self) -> RedactionPlan:
+        """
+        Return the (cached) redaction plan for this redacter class.
+
+        The plan is built from `get_redactable_fields` and
+        `get_field_auto_redacter` the first time it is requested, and
+        cached until the registry or the app registry changes. The
+        auto-redaction values are memoised at the same time, unless the
+        redacter function is marked as `volatile`, or the class sets
+        `memoise_redaction_values = False`.
+
+        """
+        cls = type(self)
+        if (plan := _redaction_plans.get(cls)) is None:
+            fields = tuple(self.get_redactable_fields())
+            # because None is a valid redaction value, we need to do this
+            # in two passes - first get the redacter function, which _can_
+            # be None, then filter out the None values.
+            redacters = ((f, self.get_field_auto_redacter(f)) for f in fields)
+            auto_redacters = tuple((f, func) for f, func in redacters if func)
+            memoised = self.memoise_redaction_values
+            plan = RedactionPlan(
+                fields=fields,
+                auto_redacters=auto_redacters,
+                memoised_values=MappingProxyType(
+                    {
+                        f.name: func(f)
+                        for f, func in auto_redacters
+                        if memoised and not is_volatile(func)
+                    }
+                ),
+                volatile_redacters=tuple(
+                    (f, func)
+                    for f, func in auto_redacters
+                    if not memoised or is_volatile(func)
+                ),
+            )
+            _redaction_plans[cls] = plan
+        return plan
+
     def field_redaction_strategy(self, field: models.Field) -> FieldRedactionStrategy:
         """Return the FieldRedaction value for a field."""
+        if self.is_incremental_field(field):
+            return self.FieldRedactionStrategy.NONE
         if field.name in self.custom_field_redactions:
             return self.FieldRedactionStrategy.CUSTOM
         if self.get_field_auto_redacter(field):
@@ -173,16 +855,17 @@ class RedacterBase(_ModelBase):
         # default redacters.
         return get_default_field_redacter(field)
 
+    def get_volatile_auto_redactions(self) -> set[str]:
+        """Return the names of the fields whose auto-redacter is volatile."""
+        return {
+            f.name
+            for f, func in self.get_redaction_plan().auto_redacters
+            if is_volatile(func)
+        }
+
     def get_auto_redaction_values(self) -> dict[str, Any]:
         """Return field:value dict for all auto-redactable fields."""
-        # because None is a valid redaction value, we need to do this in
-        # two passes - first get the redacter function, which _can_ be None,
-        # then filter out the None values and call the redacter function
-        # on the field.
-        auto_redactors = {
-            f: self.get_field_auto_redacter(f) for f in self.get_redactable_fields()
-        }
-        return {f.name: func(f) for f, func in auto_redactors.items() if func}
+        return self.get_redaction_plan().get_auto_redaction_values()
 
     def get_field_redaction_values(self) -> dict[str, Any]:
         """
@@ -194,11 +877,16 @@ class RedacterBase(_ModelBase):
         """
         vals = self.get_auto_redaction_values()
         vals.update(self.custom_field_redactions)
+        vals.pop(self.incremental_field or "", None)
         return vals
 
     def redact_queryset(
         self,
         queryset: models.QuerySet[models.Model],
+        *,
+        chunk_size: int | None = None,
+        throttle: float = 0,
+        skip_unchanged: bool = False,
         **field_overrides: Any,
     ) -> int:
         """
@@ -217,10 +905,170 @@ class RedacterBase(_ModelBase):
         - field_redactions (static values set on the anonymiser)
         - field_overrides (values passed in to method)
 
+        By default the queryset is redacted in a single UPDATE statement.
+        On large tables this is one very long transaction, which holds
+        row locks on everything (and on Postgres bloats the WAL and blocks
+        autovacuum). Set `chunk_size` to walk the table in pk ranges of
+        (at most) that many rows instead, each of which is committed
+        separately (unless the method is called inside an outer
+        transaction). The `throttle` param is the number of seconds to
+        sleep between chunks - e.g. to let a replica catch up.
+
+        If `skip_unchanged` is True, rows where every field already has
+        its redaction value are excluded from the UPDATE (using a
+        `field IS DISTINCT FROM value` filter), so re-redacting a table
+        only writes the rows that have changed. Fields with volatile
+        redaction values (e.g. `now()` dates, GenerateUuid4) are left out
+        of the comparison, as they never match - so a row that has been
+        redacted before is skipped even if those fields have changed
+        since. If every value is volatile, every row is written.
+
         """
+        queryset, redactions = self._get_redactions(
+            queryset, skip_unchanged, field_overrides
+        )
+        with instrumentation.measure(
+            "redact_queryset", queryset.model, using=queryset.db
+        ) as recorder:
+            count = self._redact_queryset(queryset, redactions, chunk_size, throttle)
+            recorder.record(count)
+        return count
+
+    async def aredact_queryset(
+        self,
+        queryset: models.QuerySet[models.Model],
+        *,
+        chunk_size: int | None = None,
+        throttle: float = 0,
+        skip_unchanged: bool = False,
+        **field_overrides: Any,
+    ) -> int:
+        """
+        Async version of `redact_queryset` (and SAVE).
+
+        Each chunk is a single UPDATE statement, which is committed on
+        its own (the async ORM does not support transactions), and the
+        `throttle` between chunks does not block the event loop. Each
+        UPDATE is measured separately, in the ORM's worker thread, so a
+        chunked redaction records a "redact_queryset" measurement per
+        chunk.
+
+        """
+        queryset, redactions = self._get_redactions(
+            queryset, skip_unchanged, field_overrides
+        )
+        update = sync_to_async(self._update)
+        if not chunk_size:
+            return await update(queryset, redactions)
+        count = 0
+        i = 0
+        async for chunk in aiter_pk_chunks(queryset, chunk_size):
+            if i and throttle:
+                await asyncio.sleep(throttle)
+            count += await update(chunk, redactions)
+            i += 1
+        return count
+
+    def _update(
+        self, queryset: models.QuerySet[models.Model], redactions: dict[str, Any]
+    ) -> int:
+        with instrumentation.measure(
+            "redact_queryset", queryset.model, using=queryset.db
+        ) as recorder:
+            count = queryset.update(**redactions)
+            recorder.record(count)
+        return count
+
+    def plan_redact_queryset(
+        self,
+        queryset: models.QuerySet[models.Model],
+        *,
+        skip_unchanged: bool = False,
+        **field_overrides: Any,
+    ) -> tuple[str, tuple[Any, ...]]:
+        """
+        Return the UPDATE SQL and params that `redact_queryset` would run.
+
+        This is a dry run - nothing is executed. When `redact_queryset` is
+        chunked, the same statement is run for each chunk, restricted to
+        a pk range.
+
+        """
+        queryset, redactions = self._get_redactions(
+            queryset, skip_unchanged, field_overrides
+        )
+        return get_update_sql(queryset, redactions)
+
+    def redact_table(self, using: str | None = None, **field_overrides: Any) -> int:
+        """
+        Redact the whole table by copy-and-swap (PostgreSQL only).
+
+        Rather than updating every row in place, which writes a new
+        version of every tuple and leaves the table bloated until it is
+        vacuumed, a new table is created from a SELECT of the redacted
+        values (see `get_redaction_select`), its constraints and indexes
+        are rebuilt, and it is swapped in for the original table - all
+        in a single transaction. See `anonymiser.db.postgres` for what is
+        (and is not) carried over to the new table.
+
+        The `field_overrides` are as for `redact_queryset`.
+
+        Returns the number of rows redacted.
+
+        """
+        queryset = self.model._base_manager.db_manager(using).all()
+        if (vendor := connections[queryset.db].vendor) != "postgresql":
+            raise NotImplementedError(f"redact_table is not implemented for {vendor}")
+        redactions = self.get_field_redaction_values()
+        redactions.update(field_overrides)
+        columns, sql, params = get_redaction_select(queryset, redactions)
+        with instrumentation.measure(
+            "redact_table", self.model, using=queryset.db
+        ) as recorder:
+            count = postgres.copy_and_swap(
+                self.model._meta.db_table, columns, sql, params, queryset.db
+            )
+            recorder.record(count)
+        return count
+
+    def _get_redactions(
+        self,
+        queryset: models.QuerySet[models.Model],
+        skip_unchanged: bool,
+        field_overrides: dict[str, Any],
+    ) -> tuple[models.QuerySet[models.Model], dict[str, Any]]:
+        """Return the queryset to update, and the redaction values."""
         redactions = self.get_field_redaction_values()
         redactions.update(field_overrides)
-        return queryset.update(**redactions)
+        if not skip_unchanged:
+            return queryset, redactions
+        # volatile auto-redactions that have not been overridden
+        volatile = (
+            self.get_volatile_auto_redactions()
+            - self.custom_field_redactions.keys()
+            - field_overrides.keys()
+        )
+        compared = {k: v for k, v in redactions.items() if k not in volatile}
+        if changed := get_changed_filter(queryset, compared):
+            queryset = queryset.filter(changed)
+        return queryset, redactions
+
+    def _redact_queryset(
+        self,
+        queryset: models.QuerySet[models.Model],
+        redactions: dict[str, Any],
+        chunk_size: int | None,
+        throttle: float,
+    ) -> int:
+        if not chunk_size:
+            return queryset.update(**redactions)
+        count = 0
+        for i, chunk in enumerate(iter_pk_chunks(queryset, chunk_size)):
+            if i and throttle:
+                time.sleep(throttle)
+            with transaction.atomic(using=queryset.db):
+                count += chunk.update(**redactions)
+        return count
 
 
 class ModelAnonymiser(AnonymiserBase, RedacterBase):
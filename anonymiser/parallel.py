@@ -0,0 +1,151 @@
+"""
+Run row-level anonymisation across multiple processes.
+
+Python-level anonymisation is CPU-bound in the `anonymise_<field>`
+methods, so a single process cannot keep the database busy. This module
+splits each model table into contiguous primary key ranges ("shards")
+and hands each shard to a process pool worker. Every worker opens its
+own database connection and runs `anonymise_queryset` over its shard;
+the row counts are collected centrally.
+
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import math
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable
+
+import django
+from django.apps import apps
+from django.db import connections, models
+from django.db.models import Max, Min
+
+from . import registry
+from .batching import DEFAULT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class Shard:
+    """A contiguous, inclusive, range of primary keys on a model."""
+
+    model_label: str
+    first_pk: int
+    last_pk: int
+
+    def get_queryset(self) -> models.QuerySet[models.Model]:
+        model = apps.get_model(self.model_label)
+        return model._base_manager.filter(pk__gte=self.first_pk, pk__lte=self.last_pk)
+
+
+@dataclasses.dataclass(frozen=True)
+class ShardResult:
+    shard: Shard
+    rows: int
+
+
+def get_pk_shards(
+    queryset: models.QuerySet[models.Model], num_shards: int
+) -> list[Shard]:
+    """
+    Split a queryset into (up to) `num_shards` equal-width pk ranges.
+
+    Only integer primary keys are supported, as the ranges are derived
+    from the MIN / MAX pk values. Ranges are equal in width, not in row
+    count, so heavily skewed tables benefit from more shards than there
+    are workers.
+
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be a positive integer")
+    model = queryset.model
+    if not isinstance(model._meta.pk, models.IntegerField):
+        raise ValueError(
+            f"{model._meta.label} cannot be sharded - integer primary key required"
+        )
+    bounds = queryset.aggregate(first_pk=Min("pk"), last_pk=Max("pk"))
+    if (first_pk := bounds["first_pk"]) is None:
+        return []
+    last_pk = bounds["last_pk"]
+    width = math.ceil((last_pk - first_pk + 1) / num_shards)
+    return [
+        Shard(model._meta.label, start, min(start + width - 1, last_pk))
+        for start in range(first_pk, last_pk + 1, width)
+    ]
+
+
+def anonymise_shard(shard: Shard, batch_size: int = DEFAULT_BATCH_SIZE) -> ShardResult:
+    """Anonymise all rows in a shard using the registered anonymiser."""
+    queryset = shard.get_queryset()
+    if not (anonymiser := registry.get_model_anonymiser(queryset.model)):
+        raise ValueError(f"No anonymiser registered for {shard.model_label}")
+    counts = anonymiser.anonymise_queryset(queryset, batch_size=batch_size)
+    return ShardResult(shard, sum(counts))
+
+
+def init_worker() -> None:
+    """Initialise a pool worker process (Django setup, own db connection)."""
+    # workers started with "spawn" / "forkserver" have to set up Django
+    # themselves; forked workers inherit the (ready) app registry.
+    if not apps.ready:
+        django.setup()
+    # never share a connection with the parent process
+    connections.close_all()
+
+
+def _is_anonymised(model: type[models.Model]) -> bool:
+    anonymiser = registry.get_model_anonymiser(model)
+    return bool(anonymiser and anonymiser.get_anonymisation_plan().fields)
+
+
+def anonymise_in_parallel(
+    models: Iterable[type[models.Model]] | None = None,
+    max_workers: int | None = None,
+    shards_per_model: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    mp_context: multiprocessing.context.BaseContext | None = None,
+) -> dict[str, int]:
+    """
+    Anonymise models across a pool of worker processes.
+
+    Each model (default: all registered anonymisable models) is split
+    into `shards_per_model` pk ranges (default: `max_workers`), and all
+    shards are processed by a pool of `max_workers` processes (default:
+    the number of CPUs). Models are read through their base manager, so
+    rows hidden by a filtering default manager (e.g. soft-deleted rows)
+    are anonymised too.
+
+    Returns a dict of model label to the number of rows anonymised.
+
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    num_shards = shards_per_model or max_workers
+    if models is None:
+        models = registry.get_anonymisable_models()
+    shards = [
+        shard
+        for model in models
+        if _is_anonymised(model)
+        for shard in get_pk_shards(model._base_manager.all(), num_shards)
+    ]
+    logger.debug("Anonymising %i shards using %i workers", len(shards), max_workers)
+    # close connections before forking, so that the workers do not
+    # inherit (and share) the parent process connection.
+    connections.close_all()
+    results: dict[str, int] = defaultdict(int)
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp_context, initializer=init_worker
+    ) as executor:
+        futures = [executor.submit(anonymise_shard, s, batch_size) for s in shards]
+        for future in as_completed(futures):
+            result = future.result()
+            logger.debug("Anonymised shard %s (%i rows)", result.shard, result.rows)
+            results[result.shard.model_label] += result.rows
+    return dict(results)
@@ -0,0 +1,83 @@
+"""
+Streaming anonymisation pipeline with bounded memory.
+
+The pipeline is a chain of generators - read -> batch -> anonymise ->
+write - each of which pulls from the previous stage on demand. Because
+nothing is pulled until the write stage needs it, at most one read chunk
+plus one write batch of objects is held in memory at any time, so peak
+memory is constant regardless of the size of the table.
+
+The anonymise stage calls `AnonymiserBase.anonymise_objects_for_update`,
+so anonymisers work unchanged, and only the objects and fields that have
+changed are passed on to the write stage.
+
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Iterable, Iterator, TypeAlias
+
+from django.db import models
+
+from .batching import DEFAULT_BATCH_SIZE
+from .db import writers
+from .models import AnonymiserBase
+
+# (objects, field_names) to be written back
+Update: TypeAlias = tuple[list[models.Model], list[str]]
+
+# default number of rows fetched from the database cursor at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def read(
+    queryset: models.QuerySet[models.Model], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[models.Model]:
+    """Stream objects from the database (bypasses the queryset cache)."""
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def batch(
+    objects: Iterable[models.Model], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[list[models.Model]]:
+    """Group objects into lists of (at most) batch_size objects."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    iterator = iter(objects)
+    while chunk := list(itertools.islice(iterator, batch_size)):
+        yield chunk
+
+
+def anonymise(
+    anonymiser: AnonymiserBase, batches: Iterable[list[models.Model]]
+) -> Iterator[Update]:
+    """Anonymise each batch, yielding the changed (objects, field_names)."""
+    for objects in batches:
+        yield anonymiser.anonymise_objects_for_update(objects)
+
+
+def write(updates: Iterable[Update], using: str | None = None) -> Iterator[int]:
+    """Write each batch back to the database, yielding the rows updated."""
+    for objects, field_names in updates:
+        yield writers.update_objects(objects, field_names, using)
+
+
+def run_pipeline(
+    anonymiser: AnonymiserBase,
+    queryset: models.QuerySet[models.Model],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Anonymise a queryset using the streaming pipeline (and SAVE).
+
+    Returns the total number of rows updated.
+
+    """
+    if not anonymiser.get_anonymisation_plan().field_names:
+        return 0
+    objects = read(queryset, chunk_size)
+    batches = batch(objects, batch_size)
+    updates = anonymise(anonymiser, batches)
+    return sum(write(updates, queryset.db))
@@ -0,0 +1,237 @@
+"""
+Dry-run planning of redaction and anonymisation.
+
+`plan_models` reports what a run of the `anonymise` command would do,
+without changing any data. For each model, in the order in which it
+would be run, the plan has:
+
+- the UPDATE statement that redaction would execute (compiled from
+  `get_field_redaction_values` - see `RedacterBase.plan_redact_queryset`).
+  The statement params are not reported, as they can include secrets
+  (e.g. the key of an `Hmac` redaction).
+- the estimated number of rows, from the database planner statistics
+  (never a COUNT(*), which would scan the table)
+- the fields that are anonymised row by row
+- the projected duration, from the throughput (rows per second)
+  recorded by the benchmarks - see `load_throughput`
+
+Row estimates are only as good as the statistics, so run ANALYZE
+first. Estimates are not available on all databases (or for SQLite
+tables that have not been analysed), in which case no duration is
+projected either.
+
+As with a real run, `incremental` restricts the plan to the rows
+changed since the last incremental run, and `resume` skips redaction
+of a model that has a checkpoint.
+
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+from collections import defaultdict
+from graphlib import TopologicalSorter
+from typing import Any, Callable, Iterable
+
+from django.db import connections, models
+
+from . import registry
+from .models import RedacterBase
+from .scheduler import get_incremental_queryset, get_schedule, is_resuming
+
+# benchmark modes used to project durations - see benchmarks.suite
+REDACT_MODE = "redact"
+REDACT_CHUNKED_MODE = "redact_chunked"
+ANONYMISE_MODE = "anonymise_queryset"
+
+
+def _estimate_postgresql(queryset: models.QuerySet[models.Model]) -> int | None:
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _estimate_sqlite(queryset: models.QuerySet[models.Model]) -> int | None:
+    # the first number of each sqlite_stat1 row is the number of rows in
+    # the table (the table is only in sqlite_stat1 once it is analysed)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )
+        if not cursor.fetchone():
+            return None
+        cursor.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = %s",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
+
+
+def _estimate_mysql(queryset: models.QuerySet[models.Model]) -> int | None:
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+_ESTIMATORS: dict[str, Callable[[models.QuerySet[models.Model]], int | None]] = {
+    "postgresql": _estimate_postgresql,
+    "sqlite": _estimate_sqlite,
+    "mysql": _estimate_mysql,
+}
+
+
+def estimate_rows(queryset: models.QuerySet[models.Model]) -> int | None:
+    """
+    Return the planner's estimate of the number of rows in a queryset.
+
+    On PostgreSQL this is the EXPLAIN estimate for the queryset. On
+    SQLite and MySQL it is the table row count from the table statistics,
+    so any queryset filters are ignored. Returns None if there is no
+    estimate.
+
+    """
+    if estimator := _ESTIMATORS.get(connections[queryset.db].vendor):
+        return estimator(queryset)
+    return None
+
+
+def load_throughput(path: str | os.PathLike) -> dict[str, float]:
+    """
+    Return the mean rows per second of each mode in a benchmark results file.
+
+    The file is the JSON output of `python -m benchmarks --output PATH`,
+    ideally recorded against the same database server as the run.
+
+    """
+    with open(path) as f:
+        results = json.load(f)["results"]
+    rates: dict[str, list[float]] = defaultdict(list)
+    for result in results:
+        if result["rows_per_sec"] > 0:
+            rates[result["mode"]].append(result["rows_per_sec"])
+    return {mode: sum(values) / len(values) for mode, values in rates.items()}
+
+
+def project_seconds(
+    rows: int | None, throughput: dict[str, float], mode: str
+) -> float | None:
+    """Return the projected duration of a mode over a number of rows."""
+    if rows is None or mode not in throughput:
+        return None
+    return rows / throughput[mode]
+
+
+@dataclasses.dataclass
+class ModelPlan:
+    """What a run will do to a single model."""
+
+    label: str
+    estimated_rows: int | None
+    redact_sql: str | None = None
+    redact_params: tuple[Any, ...] = ()
+    anonymised_fields: list[str] = dataclasses.field(default_factory=list)
+    redact_seconds: float | None = None
+    anonymise_seconds: float | None = None
+
+    @property
+    def seconds(self) -> float | None:
+        """Return the total projected duration (None if not known)."""
+        total = 0.0
+        for work, seconds in (
+            (self.redact_sql, self.redact_seconds),
+            (self.anonymised_fields, self.anonymise_seconds),
+        ):
+            if not work:
+                continue
+            if seconds is None:
+                return None
+            total += seconds
+        return total
+
+
+def plan_model(
+    model: type[models.Model],
+    redact: bool = True,
+    anonymise: bool = True,
+    chunk_size: int | None = None,
+    skip_unchanged: bool = False,
+    resume: bool = False,
+    incremental: bool = False,
+    throughput: dict[str, float] | None = None,
+) -> ModelPlan:
+    """Return the plan for redacting / anonymising a model - see `anonymise_model`."""
+    queryset = model._base_manager.all()
+    if not (anonymiser := registry.get_model_anonymiser(model)):
+        return ModelPlan(model._meta.label, estimate_rows(queryset))
+    if incremental:
+        queryset, _ = get_incremental_queryset(queryset, anonymiser)
+        if queryset.query.is_empty():
+            # nothing has changed since the last incremental run
+            return ModelPlan(model._meta.label, 0)
+    if resume and is_resuming(model, anonymiser.version, queryset.db):
+        redact = False
+    rows = estimate_rows(queryset)
+    plan = ModelPlan(model._meta.label, rows)
+    throughput = throughput or {}
+    if redact and isinstance(anonymiser, RedacterBase):
+        plan.redact_sql, plan.redact_params = anonymiser.plan_redact_queryset(
+            queryset, skip_unchanged=skip_unchanged
+        )
+        mode = REDACT_CHUNKED_MODE if chunk_size else REDACT_MODE
+        plan.redact_seconds = project_seconds(rows, throughput, mode)
+    if anonymise:
+        plan.anonymised_fields = anonymiser.get_anonymisation_plan().field_names
+    if plan.anonymised_fields:
+        plan.anonymise_seconds = project_seconds(rows, throughput, ANONYMISE_MODE)
+    return plan
+
+
+def plan_models(
+    models: Iterable[type[models.Model]] | None = None, **kwargs: Any
+) -> list[ModelPlan]:
+    """
+    Return the plan for each model, in the order they would be run.
+
+    Models default to all registered anonymisable models; `kwargs` are
+    passed to `plan_model`. Cycles in the model relations are broken in
+    the same way as a real run - see `scheduler.get_schedule`.
+
+    """
+    if models is None:
+        models = registry.get_anonymisable_models()
+    sorter = TopologicalSorter(get_schedule(models))
+    return [plan_model(model, **kwargs) for model in sorter.static_order()]
+
+
+def _format_seconds(seconds: float | None) -> str:
+    return "unknown" if seconds is None else f"{seconds:.1f}s"
+
+
+def format_plan(plans: list[ModelPlan]) -> str:
+    """Return a plain text report of the plans (without the redaction params)."""
+    lines = []
+    for plan in plans:
+        rows = "unknown" if plan.estimated_rows is None else plan.estimated_rows
+        lines += [plan.label, f"  estimated rows: {rows}"]
+        if plan.redact_sql:
+            lines.append(f"  redact: {plan.redact_sql}")
+        lines += [
+            f"  anonymise: {', '.join(plan.anonymised_fields) or '-'}",
+            f"  projected duration: {_format_seconds(plan.seconds)}",
+        ]
+    projected = [plan.seconds for plan in plans]
+    total = None if None in projected else sum(s or 0.0 for s in projected)
+    lines.append(f"Total projected duration: {_format_seconds(total)}")
+    return "\n".join(lines)
@@ -0,0 +1,223 @@
+"""
+Consistent pseudonyms across models.
+
+The same real value (e.g. an email address) should map to the same fake
+value wherever it appears - users, audit logs, CRM tables - so that the
+anonymised data still joins up. A `PseudonymCache` maps (namespace,
+value) pairs to pseudonyms:
+
+    from anonymiser import pseudonyms
+
+    def anonymise_email(self, obj: User) -> None:
+        obj.email = pseudonyms.pseudonymise("email", obj.email, pseudonyms.email)
+
+The pseudonym for a value that has not been seen before is created by a
+generator function, which is passed a `random.Random` instance. If the
+cache has a seed, the generator's random instance is itself seeded from
+the seed and the value, so pseudonyms are reproducible between runs (and
+between processes) - the cache then just saves regenerating them.
+Without a seed, pseudonyms are random, and the cache is what makes them
+consistent within a run.
+
+The in-memory cache is a bounded LRU. Entries that are evicted (and
+all entries, when the cache is closed) can be "spilled" to a local
+SQLite file, which is checked on a cache miss, so that unseeded
+pseudonyms remain consistent however many distinct values there are.
+Real values are never stored - cache keys are keyed hashes of the
+namespace and value.
+
+The spill file can be shared by several caches - e.g. one per worker
+process - as every write is committed immediately (in WAL mode, so
+readers are not blocked). The first pseudonym written for a key wins.
+Caches only share pseudonyms if they have the same seed, as without a
+seed each cache hashes its keys with its own random key.
+
+Note that pseudonyms are not guaranteed to be unique - two real values
+can map to the same pseudonym.
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .db.functions import FIRST_NAMES, LAST_NAMES
+
+Generator = Callable[[random.Random], Any]
+
+DEFAULT_MAXSIZE = 100_000
+
+# seconds to wait for another cache's write to the spill file
+SPILL_TIMEOUT = 30
+
+
+class PseudonymCache:
+    """
+    Bounded LRU mapping of real values to pseudonyms.
+
+    Args:
+        maxsize: the maximum number of pseudonyms held in memory.
+        spill_path: path of a SQLite file to write evicted pseudonyms to
+            (default: evicted pseudonyms are discarded). Pseudonyms must
+            be JSON serializable to be spilled.
+        seed: seed for reproducible pseudonyms (default: random).
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        spill_path: str | os.PathLike | None = None,
+        seed: str | bytes | None = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.seed = seed.encode() if isinstance(seed, str) else seed
+        # keys are hashed with the seed, or a per-cache random key - so
+        # that the spill file cannot be used to look up real values.
+        self._key = hashlib.sha256(self.seed).digest() if self.seed else os.urandom(32)
+        self._cache: OrderedDict[bytes, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill: sqlite3.Connection | None = None
+        if spill_path is not None:
+            # autocommit, so that other caches see every write at once
+            self._spill = sqlite3.connect(
+                spill_path,
+                timeout=SPILL_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._spill.execute("PRAGMA journal_mode=WAL")
+            self._spill.execute(
+                "CREATE TABLE IF NOT EXISTS pseudonyms "
+                "(key BLOB PRIMARY KEY, value TEXT NOT NULL)"
+            )
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get_key(self, namespace: str, value: Any) -> bytes:
+        """Return the cache key for a value (the value is not recoverable)."""
+        message = f"{namespace}\0{value}".encode()
+        return hashlib.blake2b(message, key=self._key, digest_size=16).digest()
+
+    def get_random(self, key: bytes) -> random.Random:
+        """Return the random instance passed to the generator."""
+        if self.seed is None:
+            return random.Random()  # noqa: S311
+        return random.Random(key)  # noqa: S311
+
+    def get(self, namespace: str, value: Any, generator: Generator) -> Any:
+        """Return the pseudonym for a value, generating it if not seen before."""
+        key = self.get_key(namespace, value)
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            pseudonym = self._read_spill(key)
+            if pseudonym is None:
+                self.misses += 1
+                pseudonym = generator(self.get_random(key))
+            else:
+                self.hits += 1
+            self._cache[key] = pseudonym
+            if len(self._cache) > self.maxsize:
+                self._write_spill(self._cache.popitem(last=False))
+            return pseudonym
+
+    def _read_spill(self, key: bytes) -> Any:
+        if not self._spill:
+            return None
+        row = self._spill.execute(
+            "SELECT value FROM pseudonyms WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write_spill(self, *items: tuple[bytes, Any]) -> None:
+        if self._spill:
+            self._spill.executemany(
+                "INSERT OR IGNORE INTO pseudonyms VALUES (?, ?)",
+                ((key, json.dumps(pseudonym)) for key, pseudonym in items),
+            )
+
+    def clear(self) -> None:
+        """Clear the in-memory cache and the spill file."""
+        with self._lock:
+            self._cache.clear()
+            if self._spill:
+                self._spill.execute("DELETE FROM pseudonyms")
+            self.hits = self.misses = 0
+
+    def close(self) -> None:
+        """Write the in-memory pseudonyms to the spill file, and close it."""
+        with self._lock:
+            if self._spill:
+                self._spill.execute("BEGIN")
+                self._write_spill(*self._cache.items())
+                self._spill.execute("COMMIT")
+                self._spill.close()
+                self._spill = None
+
+
+_cache: PseudonymCache | None = None
+
+
+def get_pseudonym_cache() -> PseudonymCache:
+    """Return the shared cache, configured from the ANONYMISER_PSEUDONYM settings."""
+    global _cache
+    if _cache is None:
+        # read on first use, not on import
+        from . import settings
+
+        _cache = PseudonymCache(
+            maxsize=settings.PSEUDONYM_CACHE_SIZE,
+            spill_path=settings.PSEUDONYM_SPILL_PATH,
+            seed=settings.PSEUDONYM_SEED,
+        )
+    return _cache
+
+
+def reset_pseudonym_cache() -> None:
+    """Discard the shared cache (it is recreated on next use)."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
+
+
+def pseudonymise(namespace: str, value: Any, generator: Generator) -> Any:
+    """
+    Return the pseudonym for a value, using the shared cache.
+
+    Empty values (None, "") are returned unchanged.
+
+    """
+    if value is None or value == "":
+        return value
+    return get_pseudonym_cache().get(namespace, value, generator)
+
+
+# generators
+
+
+def first_name(rng: random.Random) -> str:
+    return rng.choice(FIRST_NAMES)
+
+
+def last_name(rng: random.Random) -> str:
+    return rng.choice(LAST_NAMES)
+
+
+def email(rng: random.Random) -> str:
+    return f"user_{rng.getrandbits(48):012x}@example.com"
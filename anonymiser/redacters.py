@@ -1,13 +1,32 @@
 from __future__ import annotations
 
 import datetime
-from typing import Any, Callable
+from typing import Any, Callable, TypeVar
 
 from django.db import models
 from django.utils import timezone
 
 from anonymiser.db.functions import GenerateUuid4
 
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def volatile(func: F) -> F:
+    """
+    Mark a redacter function as volatile.
+
+    Redaction values are memoised per redacter class and field (see
+    `RedacterBase.get_redaction_plan`). Volatile redacters - e.g. those
+    that depend on the current time - are called on every redaction.
+
+    """
+    func.volatile = True  # type: ignore[attr-defined]
+    return func
+
+
+def is_volatile(func: Callable) -> bool:
+    return getattr(func, "volatile", False) is True
+
 
 def default_redact_charfield(field: models.CharField) -> str:
     return "X" * field.max_length
@@ -17,10 +36,12 @@ def default_redact_textfield(field: models.TextField) -> str:
     return "X" * 400
 
 
+@volatile
 def default_redact_datefield(field: models.DateField) -> datetime.date:
     return timezone.now().date()
 
 
+@volatile
 def default_redact_datetimefield(field: models.DateTimeField) -> datetime.datetime:
     return timezone.now()
 
@@ -33,20 +54,44 @@ def default_redact_uuidfield(field: models.UUIDField) -> str:
     return GenerateUuid4()
 
 
+# concrete field class: redacter (or None) - see get_default_field_redacter
+_field_redacters: dict[type[models.Field], Callable[[models.Field], Any] | None] = {}
+
+
+def clear_field_redacter_cache(*args: Any, **kwargs: Any) -> None:
+    """Clear the cached field class redacters (can be used as a signal receiver)."""
+    _field_redacters.clear()
+
+
 def get_default_field_redacter(
     field: models.Field,
 ) -> Callable[[models.Field], Any] | None:
-    """Return default redacter for basic Django field types."""
-    if isinstance(field, models.CharField):
-        return default_redact_charfield
-    if isinstance(field, models.TextField):
-        return default_redact_textfield
-    if isinstance(field, models.DateTimeField):
-        return default_redact_datetimefield
-    if isinstance(field, models.DateField):
-        return default_redact_datefield
-    if isinstance(field, models.JSONField):
-        return default_redact_jsonfield
-    if isinstance(field, models.UUIDField):
-        return default_redact_uuidfield
-    return None
+    """
+    Return the default redacter for the field.
+
+    Redacters are looked up in `settings.AUTO_REDACT_FIELD_FUNCS` (which
+    includes any ANONYMISER_AUTO_REDACT_FIELD_FUNCS overrides), by walking
+    the MRO of the field class, so that custom field subclasses use the
+    redacter of their closest registered ancestor. A field type can be
+    excluded by mapping it to None. The result is cached per concrete
+    field class, so each lookup after the first is a single dict hit.
+
+    """
+    field_class = type(field)
+    try:
+        return _field_redacters[field_class]
+    except KeyError:
+        pass
+    # circ import
+    from .settings import AUTO_REDACT_FIELD_FUNCS
+
+    redacter = next(
+        (
+            AUTO_REDACT_FIELD_FUNCS[klass]
+            for klass in field_class.__mro__
+            if klass in AUTO_REDACT_FIELD_FUNCS
+        ),
+        None,
+    )
+    _field_redacters[field_class] = redacter
+    return redacter
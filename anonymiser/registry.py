@@ -2,12 +2,11 @@ from __future__ import annotations
 
 import logging
 import threading
-from collections import defaultdict
 
 from django.apps import apps
 from django.db import models
 
-from .models import ModelAnonymiser, ModelFieldSummary
+from .models import ModelAnonymiser, ModelFieldSummary, clear_plan_cache
 
 lock = threading.Lock()
 logger = logging.getLogger(__name__)
@@ -18,6 +17,45 @@ def sort_by_name(models: list[type[models.Model]]) -> list[type[models.Model]]:
 
 
 class Registry(dict):
+    """
+    Map of model to registered anonymiser class.
+
+    Anonymisers are stateless, so the registry instantiates each one
+    lazily, on first use, and reuses the instance. The field summaries
+    for each model are cached in the same way. Both caches are cleared
+    whenever the registry changes.
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._instances: dict[type[models.Model], ModelAnonymiser] = {}
+        self._field_summaries: dict[type[models.Model], list[ModelFieldSummary]] = {}
+
+    def get_anonymiser(self, model: type[models.Model]) -> ModelAnonymiser | None:
+        """Return the (cached) anonymiser instance for a model."""
+        if (anonymiser := self._instances.get(model)) is None:
+            if not (anonymiser_class := self.get(model)):
+                return None
+            with lock:
+                anonymiser = self._instances.setdefault(model, anonymiser_class())
+        return anonymiser
+
+    def get_field_summaries(self, model: type[models.Model]) -> list[ModelFieldSummary]:
+        """Return the (cached) field summaries for a model."""
+        if (summaries := self._field_summaries.get(model)) is None:
+            summaries = [ModelFieldSummary(f) for f in model._meta.get_fields()]
+            # sort fields by type then name - easier to scan.
+            summaries.sort(key=lambda d: f"{d.field_type}.{d.field_name}")
+            with lock:
+                summaries = self._field_summaries.setdefault(model, summaries)
+        return summaries
+
+    def _clear_caches(self) -> None:
+        self._instances.clear()
+        self._field_summaries.clear()
+        clear_plan_cache()
+
     def get_anonymisable_models(self) -> list[type[models.Model]]:
         return sort_by_name([m for m in self.keys() if self[m]])
 
@@ -32,6 +70,12 @@ class Registry(dict):
                 raise ValueError(f"Anonymiser for {model} already registered")
             logger.debug("Adding anonymiser for %s to registry", model._meta.label)
             self[model] = anonymiser
+            self._clear_caches()
+
+    def clear(self) -> None:
+        with lock:
+            super().clear()
+            self._clear_caches()
 
 
 def register_model_anonymiser(anonymiser: type[ModelAnonymiser]) -> None:
@@ -39,10 +83,13 @@ def register_model_anonymiser(anonymiser: type[ModelAnonymiser]) -> None:
 
 
 def get_model_anonymiser(model: type[models.Model]) -> ModelAnonymiser | None:
-    """Return newly instantiated anonymiser for model."""
-    if anonymiser := _registry.get(model):
-        return anonymiser()
-    return None
+    """Return the anonymiser for model (instantiated once, on first use)."""
+    return _registry.get_anonymiser(model)
+
+
+def get_field_summaries(model: type[models.Model]) -> list[ModelFieldSummary]:
+    """Return the field summaries for a model, sorted by field type and name."""
+    return list(_registry.get_field_summaries(model))
 
 
 def get_anonymisable_models() -> list[type[models.Model]]:
@@ -62,17 +109,11 @@ def get_all_model_fields(
     param is True.
 
     """
-    models = sorted(apps.get_models(), key=lambda m: m._meta.label)
-    output = defaultdict(list)
-    for m in models:
-        anonymiser = get_model_anonymiser(m)
-        if anonymised_only and not anonymiser:
-            continue
-        for f in m._meta.get_fields():
-            output[m._meta.label].append(ModelFieldSummary(f))
-        # sort fields by type then name - easier to scan.
-        output[m._meta.label].sort(key=lambda d: f"{d.field_type}.{d.field_name}")
-    return dict(output)
+    return {
+        m._meta.label: list(_registry.get_field_summaries(m))
+        for m in sort_by_name(apps.get_models())
+        if not anonymised_only or _registry.get(m)
+    }
 
 
 # principle access point for the registry
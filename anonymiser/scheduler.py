@@ -0,0 +1,372 @@
+"""
+Schedule anonymisation of all registered models.
+
+Models are anonymised in dependency order - a model with a foreign key
+to another scheduled model (e.g. one whose `post_anonymise_object` reads
+a related row) waits for that model to finish. Independent models are
+run concurrently, so the wall-clock time of a full run is bounded by the
+critical path through the graph rather than the sum of all tables.
+Mutual relations (e.g. a nullable "latest_order" foreign key back from
+a customer to its orders) are broken, rather than refusing to run.
+
+The async counterparts (`aanonymise_model`, `arun_models`) run models as
+tasks on a single event loop, with a bounded number of models in flight.
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from django.db import connections, models
+from django.db.models import Max
+
+from . import registry
+from .batching import DEFAULT_BATCH_SIZE
+from .models import (
+    AnonymisationCheckpoint,
+    AnonymisationWatermark,
+    AnonymiserBase,
+    RedacterBase,
+)
+from .parallel import init_worker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ModelGraph = dict[type[models.Model], set[type[models.Model]]]
+
+
+@dataclasses.dataclass
+class ModelResult:
+    """Number of rows redacted / anonymised for a single model."""
+
+    redacted: int = 0
+    anonymised: int = 0
+
+
+def get_model_dependencies(
+    models: Iterable[type[models.Model]], nullable: bool = True
+) -> ModelGraph:
+    """
+    Return the dependency graph for the models.
+
+    Each model maps to the set of other models in the graph that it has
+    a forward relation (ForeignKey / OneToOneField) to. Self-referential
+    relations, and relations to models outside the graph, are ignored,
+    as are nullable relations if `nullable` is False.
+
+    """
+    scheduled = set(models)
+    return {
+        model: {
+            f.related_model
+            for f in model._meta.get_fields()
+            if f.concrete and (f.many_to_one or f.one_to_one)
+            if f.related_model in scheduled and f.related_model is not model
+            if nullable or not f.null
+        }
+        for model in scheduled
+    }
+
+
+def _find_cycle(graph: ModelGraph) -> list[type[models.Model]] | None:
+    try:
+        TopologicalSorter(graph).prepare()
+    except CycleError as ex:
+        return ex.args[1]
+    return None
+
+
+def remove_cycles(graph: ModelGraph, required: ModelGraph) -> ModelGraph:
+    """
+    Remove dependencies from the graph until it has no cycles.
+
+    From each cycle one dependency is removed - a dependency that is not
+    in the `required` graph (e.g. a nullable foreign key) if there is
+    one, otherwise the first in the cycle. The models in a cycle can
+    then be run concurrently, so a warning is logged for each removal.
+
+    """
+    graph = {model: set(dependencies) for model, dependencies in graph.items()}
+    while cycle := _find_cycle(graph):
+        # each model in the cycle is a dependency of the next one
+        edges = list(zip(cycle[1:], cycle))
+        model, dependency = next(
+            (
+                (model, dependency)
+                for model, dependency in edges
+                if dependency not in required.get(model, ())
+            ),
+            edges[0],
+        )
+        logger.warning(
+            "Ignoring dependency of %s on %s, as it is part of a cycle",
+            model._meta.label,
+            dependency._meta.label,
+        )
+        graph[model].discard(dependency)
+    return graph
+
+
+def get_schedule(models: Iterable[type[models.Model]]) -> ModelGraph:
+    """Return the (acyclic) dependency graph used to schedule the models."""
+    models = list(models)
+    return remove_cycles(
+        get_model_dependencies(models),
+        get_model_dependencies(models, nullable=False),
+    )
+
+
+def anonymise_model(
+    model: type[models.Model],
+    redact: bool = True,
+    anonymise: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_size: int | None = None,
+    throttle: float = 0,
+    resume: bool = False,
+    incremental: bool = False,
+    skip_unchanged: bool = False,
+) -> ModelResult:
+    """
+    Redact, and then anonymise, all rows of a model.
+
+    Redaction (table-level UPDATE, optionally chunked) runs first,
+    followed by the row-level anonymisation in batches - see
+    `redact_queryset` and `anonymise_queryset`. All rows are processed,
+    using the model's base manager, so rows hidden by a filtering default
+    manager (e.g. soft-deleted rows) are not left behind.
+
+    If `resume` is True, anonymisation is checkpointed, and if a
+    checkpoint already exists the run is resumed from it - in which case
+    redaction is skipped, as it has already run, and would overwrite
+    the rows that have been anonymised.
+
+    If `incremental` is True, only rows added or changed since the last
+    incremental run are redacted and anonymised - see
+    `get_incremental_queryset`. The watermark is only advanced when both
+    redaction and anonymisation run, so rows are not skipped by the next
+    incremental run when one of them was switched off.
+
+    If `skip_unchanged` is True, rows that already have their redaction
+    values are not redacted again (anonymisation always skips unchanged
+    rows).
+
+    """
+    result = ModelResult()
+    if not (anonymiser := registry.get_model_anonymiser(model)):
+        return result
+    queryset = model._base_manager.all()
+    high_water_mark = None
+    if incremental:
+        queryset, high_water_mark = get_incremental_queryset(queryset, anonymiser)
+    complete = redact and anonymise
+    if resume and is_resuming(model, anonymiser.version, queryset.db):
+        redact = False
+    if redact and isinstance(anonymiser, RedacterBase):
+        result.redacted = anonymiser.redact_queryset(
+            queryset,
+            chunk_size=chunk_size,
+            throttle=throttle,
+            skip_unchanged=skip_unchanged,
+        )
+    if anonymise:
+        result.anonymised = sum(
+            anonymiser.anonymise_queryset(queryset, batch_size, resume=resume)
+        )
+    if complete and high_water_mark is not None:
+        AnonymisationWatermark.set_watermark(
+            anonymiser.get_incremental_field(), high_water_mark, using=queryset.db
+        )
+    return result
+
+
+async def aanonymise_model(
+    model: type[models.Model],
+    redact: bool = True,
+    anonymise: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_size: int | None = None,
+    throttle: float = 0,
+    skip_unchanged: bool = False,
+) -> ModelResult:
+    """
+    Async version of `anonymise_model`.
+
+    Resumable and incremental runs are not supported, as they depend on
+    transactions.
+
+    """
+    result = ModelResult()
+    if not (anonymiser := registry.get_model_anonymiser(model)):
+        return result
+    queryset = model._base_manager.all()
+    if redact and isinstance(anonymiser, RedacterBase):
+        result.redacted = await anonymiser.aredact_queryset(
+            queryset,
+            chunk_size=chunk_size,
+            throttle=throttle,
+            skip_unchanged=skip_unchanged,
+        )
+    if anonymise:
+        result.anonymised = sum(
+            await anonymiser.aanonymise_queryset(queryset, batch_size)
+        )
+    return result
+
+
+def get_incremental_queryset(
+    queryset: models.QuerySet[models.Model], anonymiser: AnonymiserBase
+) -> tuple[models.QuerySet[models.Model], Any]:
+    """
+    Return the rows changed since the last incremental run, and the new watermark.
+
+    Rows are selected using the anonymiser `incremental_field` (or the
+    primary key) - those with a value greater than the last watermark,
+    and no greater than the current maximum value, which becomes the new
+    watermark once the run is complete. Rows changed during the run are
+    therefore picked up by the next run. The first run includes all
+    rows; subsequent runs exclude rows where the field is NULL.
+
+    """
+    field = anonymiser.get_incremental_field()
+    high_water_mark = queryset.aggregate(value=Max(field.name))["value"]
+    last = AnonymisationWatermark.get_watermark(field, using=queryset.db)
+    if last is None:
+        return queryset, high_water_mark
+    if high_water_mark is None:
+        return queryset.none(), None
+    return (
+        queryset.filter(
+            **{f"{field.name}__gt": last, f"{field.name}__lte": high_water_mark}
+        ),
+        high_water_mark,
+    )
+
+
+def is_resuming(model: type[models.Model], version: str, using: str) -> bool:
+    """Return True if a resumed run would continue from a checkpoint."""
+    checkpoint = AnonymisationCheckpoint.get_checkpoint(model, version, using)
+    return checkpoint.pk is not None and checkpoint.last_pk != ""
+
+
+def _run_in_thread(
+    job: Callable[[type[models.Model]], T], model: type[models.Model]
+) -> T:
+    # each worker thread has its own connections, which would otherwise
+    # be left open when the pool shuts down.
+    try:
+        return job(model)
+    finally:
+        connections.close_all()
+
+
+def _get_executor(max_workers: int, processes: bool) -> Executor:
+    if processes:
+        # close connections before forking - see anonymise_in_parallel
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def run_models(
+    job: Callable[[type[models.Model]], T],
+    models: Iterable[type[models.Model]] | None = None,
+    max_workers: int = 1,
+    processes: bool = False,
+) -> dict[str, T]:
+    """
+    Run job(model) for every model, in dependency order.
+
+    Models default to all registered anonymisable models. With
+    `max_workers=1` the jobs are run in the current thread; otherwise
+    every model whose dependencies have completed is submitted to a
+    thread pool (or a process pool if `processes` is True, in which
+    case the job must be picklable).
+
+    Cycles in the model relations are broken - see `remove_cycles`.
+
+    Returns a dict of model label to job result.
+
+    """
+    if models is None:
+        models = registry.get_anonymisable_models()
+    sorter = TopologicalSorter(get_schedule(models))
+    if max_workers == 1:
+        return {m._meta.label: job(m) for m in sorter.static_order()}
+    sorter.prepare()
+    results: dict[str, T] = {}
+    with _get_executor(max_workers, processes) as executor:
+        pending: dict[Future[T], Any] = {}
+        while sorter.is_active():
+            for model in sorter.get_ready():
+                logger.debug("Scheduling %s", model._meta.label)
+                if processes:
+                    future = executor.submit(job, model)
+                else:
+                    future = executor.submit(_run_in_thread, job, model)
+                pending[future] = model
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                model = pending.pop(future)
+                results[model._meta.label] = future.result()
+                sorter.done(model)
+    return results
+
+
+async def arun_models(
+    job: Callable[[type[models.Model]], Awaitable[T]],
+    models: Iterable[type[models.Model]] | None = None,
+    max_concurrency: int = 1,
+) -> dict[str, T]:
+    """
+    Await job(model) for every model, in dependency order.
+
+    The async version of `run_models` - every model whose dependencies
+    have completed is started as a task on the current event loop, with
+    at most `max_concurrency` jobs running at once.
+
+    Cycles in the model relations are broken - see `remove_cycles`.
+
+    Returns a dict of model label to job result.
+
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be a positive integer")
+    if models is None:
+        models = registry.get_anonymisable_models()
+    sorter = TopologicalSorter(get_schedule(models))
+    sorter.prepare()
+    ready: list[Any] = []
+    results: dict[str, T] = {}
+    pending: dict[asyncio.Task[T], Any] = {}
+    try:
+        while sorter.is_active():
+            ready.extend(sorter.get_ready())
+            while ready and len(pending) < max_concurrency:
+                model = ready.pop(0)
+                logger.debug("Scheduling %s", model._meta.label)
+                pending[asyncio.ensure_future(job(model))] = model
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                model = pending.pop(task)
+                results[model._meta.label] = task.result()
+                sorter.done(model)
+    finally:
+        for task in pending:
+            task.cancel()
+    return results
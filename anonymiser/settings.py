@@ -4,38 +4,19 @@ from typing import Any, Callable
 
 from django.conf import settings as django_settings
 from django.db import models
-from django.utils import timezone
-
-from .db.functions import GenerateUuid4
-
-
-def default_redact_charfield(field: models.CharField) -> str:
-    return "X" * field.max_length
-
-
-def default_redact_textfield(field: models.TextField) -> str:
-    return "X" * 400
-
-
-def default_redact_datefield(field: models.DateField) -> str:
-    return timezone.now().date().isoformat()
-
-
-def default_redact_datetimefield(field: models.DateTimeField) -> str:
-    return timezone.now().isoformat()
-
-
-def default_redact_jsonfield(field: models.JSONField) -> dict[str, Any]:
-    return {}
-
-
-def default_redact_uuidfield(field: models.UUIDField) -> str:
-    return GenerateUuid4()
 
+from .redacters import (
+    default_redact_charfield,
+    default_redact_datefield,
+    default_redact_datetimefield,
+    default_redact_jsonfield,
+    default_redact_textfield,
+    default_redact_uuidfield,
+)
 
-AUTO_REDACT_FIELD_FUNCS: dict[
-    type[models.Model],
-    Callable[[type[models.Field]], Any],
+DEFAULT_AUTO_REDACT_FIELD_FUNCS: dict[
+    type[models.Field],
+    Callable[[models.Field], Any] | None,
 ] = {
     models.CharField: default_redact_charfield,
     models.TextField: default_redact_textfield,
@@ -45,7 +26,29 @@ AUTO_REDACT_FIELD_FUNCS: dict[
     models.UUIDField: default_redact_uuidfield,
 }
 
-# update map with any new field types or overrides declared in settings
-AUTO_REDACT_FIELD_FUNCS.update(
-    getattr(django_settings, "ANONYMISER_AUTO_REDACT_FIELD_FUNCS", {})
+# shared pseudonym cache - see anonymiser.pseudonyms
+PSEUDONYM_CACHE_SIZE: int = getattr(
+    django_settings, "ANONYMISER_PSEUDONYM_CACHE_SIZE", 100_000
+)
+PSEUDONYM_SPILL_PATH: str | None = getattr(
+    django_settings, "ANONYMISER_PSEUDONYM_SPILL_PATH", None
 )
+PSEUDONYM_SEED: str | None = getattr(django_settings, "ANONYMISER_PSEUDONYM_SEED", None)
+
+AUTO_REDACT_FIELD_FUNCS: dict[
+    type[models.Field],
+    Callable[[models.Field], Any] | None,
+] = {}
+
+
+def load_auto_redact_field_funcs() -> None:
+    """Reload AUTO_REDACT_FIELD_FUNCS (in place) from the defaults and settings."""
+    AUTO_REDACT_FIELD_FUNCS.clear()
+    AUTO_REDACT_FIELD_FUNCS.update(DEFAULT_AUTO_REDACT_FIELD_FUNCS)
+    # update map with any new field types or overrides declared in settings
+    AUTO_REDACT_FIELD_FUNCS.update(
+        getattr(django_settings, "ANONYMISER_AUTO_REDACT_FIELD_FUNCS", {})
+    )
+
+
+load_auto_redact_field_funcs()
@@ -0,0 +1,5 @@
+# Throughput benchmarks for redaction and anonymisation.
+#
+# Run with `python -m benchmarks --help`. The database is configured by
+# the DATABASE_URL environment variable (see tests/settings.py), so the
+# same suite can be run against SQLite and a local Postgres.
@@ -0,0 +1,55 @@
+"""
+Run the benchmark suite.
+
+    $ python -m benchmarks --rows 10000 100000 --wide 20 --output results.json
+    $ DATABASE_URL=postgres://localhost/bench python -m benchmarks
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+import django
+
+
+def main() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark.db")
+    django.setup()
+
+    from django.core.management import call_command
+
+    from .suite import MODES, run_benchmarks, write_results
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    parser.add_argument(
+        "--wide",
+        type=int,
+        nargs="*",
+        default=[20],
+        help="Number of fields on each wide synthetic model.",
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--no-memory", action="store_false", dest="memory")
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    results = []
+    for result in run_benchmarks(args.rows, args.wide, args.modes, args.memory):
+        sys.stdout.write(
+            f"{result.model:<20} {result.mode:<20} {result.rows:>9} rows "
+            f"{result.rows_per_sec:>12.0f} rows/s {result.queries:>7} queries "
+            f"{result.peak_memory_bytes or 0:>12} bytes\n"
+        )
+        results.append(result)
+    write_results(results, args.output)
+    sys.stdout.write(f"Results written to {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
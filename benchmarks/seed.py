@@ -0,0 +1,93 @@
+"""Generate benchmark data - seeded User rows, and wide synthetic models."""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Iterator
+
+from django.db import connection, models
+
+from anonymiser.models import ModelAnonymiser
+from tests.models import User
+
+SEED_BATCH_SIZE = 5000
+
+
+def _batched(iterable: Iterator[Any], size: int) -> Iterator[list[Any]]:
+    while batch := list(itertools.islice(iterable, size)):
+        yield batch
+
+
+def seed_users(num_rows: int) -> None:
+    """Replace all tests.User rows with `num_rows` generated users."""
+    User.objects.all().delete()
+    users = (
+        User(
+            username=f"user_{i}",
+            first_name=f"first_{i}",
+            last_name=f"last_{i}",
+            email=f"user_{i}@example.com",
+            password="!",  # noqa: S106
+            location="London",
+            biography="Lorem ipsum dolor sit amet " * 4,
+        )
+        for i in range(num_rows)
+    )
+    for batch in _batched(users, SEED_BATCH_SIZE):
+        User.objects.bulk_create(batch)
+
+
+def make_wide_model(num_fields: int) -> type[models.Model]:
+    """
+    Create (and migrate) a model with `num_fields` CharFields.
+
+    The model is created dynamically - and its table created with the
+    schema editor - so that it does not need to be part of the tests
+    app migrations. Use `drop_model` to remove the table.
+
+    """
+    attrs: dict[str, Any] = {
+        "__module__": __name__,
+        "Meta": type(
+            "Meta",
+            (),
+            {"app_label": "tests", "db_table": f"benchmark_wide_{num_fields}"},
+        ),
+    }
+    for i in range(num_fields):
+        attrs[f"field_{i}"] = models.CharField(max_length=50)
+    model = type(f"Wide{num_fields}", (models.Model,), attrs)
+    with connection.schema_editor() as editor:
+        editor.create_model(model)
+    return model
+
+
+def drop_model(model: type[models.Model]) -> None:
+    with connection.schema_editor() as editor:
+        editor.delete_model(model)
+
+
+def make_wide_anonymiser(model: type[models.Model]) -> ModelAnonymiser:
+    """Return an anonymiser with an anonymise_<field> method for every field."""
+
+    def anonymiser(field_name: str) -> Any:
+        def anonymise_field(self: Any, obj: models.Model) -> None:
+            setattr(obj, field_name, f"anon_{obj.pk}")
+
+        return anonymise_field
+
+    attrs: dict[str, Any] = {"model": model}
+    for field in model._meta.concrete_fields:
+        if not field.primary_key:
+            attrs[f"anonymise_{field.name}"] = anonymiser(field.name)
+    return type(f"{model.__name__}Anonymiser", (ModelAnonymiser,), attrs)()
+
+
+def seed_wide_model(model: type[models.Model], num_rows: int) -> None:
+    model._default_manager.all().delete()
+    field_names = [f.name for f in model._meta.concrete_fields if not f.primary_key]
+    objects = (
+        model(**{name: f"{name}_{i}" for name in field_names}) for i in range(num_rows)
+    )
+    for batch in _batched(objects, SEED_BATCH_SIZE):
+        model._default_manager.bulk_create(batch)
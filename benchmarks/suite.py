@@ -0,0 +1,206 @@
+"""
+Benchmark scenarios, measurement and results.
+
+Each scenario runs one mode (e.g. "redact", "anonymise_queryset") over
+all rows of a seeded model, and records wall time, rows / sec, the
+number of SQL statements executed, and (optionally) the peak Python
+memory allocated. Memory is measured in a separate run, as tracemalloc
+slows down the Python-heavy modes considerably.
+
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import functools
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator
+
+import django
+from django.db import connection, models
+
+from anonymiser.models import ModelAnonymiser
+from anonymiser.pipeline import run_pipeline
+
+from . import seed
+
+# mode name: function(anonymiser, queryset)
+MODES: dict[str, Callable[[ModelAnonymiser, models.QuerySet], Any]] = {}
+
+
+def mode(name: str) -> Callable:
+    def register(func: Callable) -> Callable:
+        MODES[name] = func
+        return func
+
+    return register
+
+
+@mode("redact")
+def redact(anonymiser: ModelAnonymiser, queryset: models.QuerySet) -> None:
+    anonymiser.redact_queryset(queryset)
+
+
+@mode("redact_chunked")
+def redact_chunked(anonymiser: ModelAnonymiser, queryset: models.QuerySet) -> None:
+    anonymiser.redact_queryset(queryset, chunk_size=10_000)
+
+
+@mode("anonymise_object")
+def anonymise_object(anonymiser: ModelAnonymiser, queryset: models.QuerySet) -> None:
+    # the "naive" baseline - one save() per row
+    field_names = anonymiser.get_anonymisation_plan().field_names
+    for obj in queryset.iterator():
+        anonymiser.anonymise_object(obj)
+        obj.save(update_fields=field_names)
+
+
+@mode("anonymise_queryset")
+def anonymise_queryset(anonymiser: ModelAnonymiser, queryset: models.QuerySet) -> None:
+    anonymiser.anonymise_queryset(queryset)
+
+
+@mode("pipeline")
+def pipeline(anonymiser: ModelAnonymiser, queryset: models.QuerySet) -> None:
+    run_pipeline(anonymiser, queryset)
+
+
+@dataclasses.dataclass
+class Result:
+    model: str
+    num_fields: int
+    mode: str
+    rows: int
+    seconds: float
+    queries: int
+    peak_memory_bytes: int | None = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**dataclasses.asdict(self), "rows_per_sec": self.rows_per_sec}
+
+
+class QueryCounter:
+    """Count statements executed (without storing them, unlike DEBUG)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: Any
+    ) -> Any:
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(
+    func: Callable[[ModelAnonymiser, models.QuerySet], Any],
+    anonymiser: ModelAnonymiser,
+    queryset: models.QuerySet,
+) -> tuple[float, int]:
+    """Return the (seconds, queries) taken to run func."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        func(anonymiser, queryset)
+        seconds = time.perf_counter() - start
+    return seconds, counter.count
+
+
+def measure_memory(
+    func: Callable[[ModelAnonymiser, models.QuerySet], Any],
+    anonymiser: ModelAnonymiser,
+    queryset: models.QuerySet,
+) -> int:
+    """Return the peak memory (bytes) allocated whilst running func."""
+    tracemalloc.start()
+    try:
+        func(anonymiser, queryset)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_scenarios(
+    anonymiser: ModelAnonymiser,
+    rows: int,
+    modes: list[str],
+    reseed: Callable[[], None],
+    memory: bool = True,
+) -> Iterator[Result]:
+    """
+    Run each mode over all rows of the anonymiser model.
+
+    Every mode (and the memory run) rewrites the rows, and unchanged
+    rows are skipped, so the model is re-seeded (with `reseed`) before
+    each run - otherwise later runs would have nothing to write.
+
+    """
+    model = anonymiser.model
+    queryset = model._default_manager.all()
+    num_fields = len(anonymiser.get_model_fields())
+    for name in modes:
+        reseed()
+        seconds, queries = measure(MODES[name], anonymiser, queryset)
+        peak = None
+        if memory:
+            reseed()
+            peak = measure_memory(MODES[name], anonymiser, queryset)
+        yield Result(model._meta.label, num_fields, name, rows, seconds, queries, peak)
+
+
+def run_benchmarks(
+    rows: list[int],
+    wide: list[int],
+    modes: list[str],
+    memory: bool = True,
+) -> Iterator[Result]:
+    """
+    Run all modes against tests.User, and a wide model per `wide` size.
+
+    The models are re-seeded with the number of rows for each entry in
+    `rows`, before every run. Wide models are created at the start of
+    the run, and dropped at the end.
+
+    """
+    from tests.anonymisers import UserAnonymiser
+
+    for num_rows in rows:
+        reseed = functools.partial(seed.seed_users, num_rows)
+        yield from run_scenarios(UserAnonymiser(), num_rows, modes, reseed, memory)
+    for num_fields in wide:
+        model = seed.make_wide_model(num_fields)
+        try:
+            anonymiser = seed.make_wide_anonymiser(model)
+            for num_rows in rows:
+                reseed = functools.partial(seed.seed_wide_model, model, num_rows)
+                yield from run_scenarios(anonymiser, num_rows, modes, reseed, memory)
+        finally:
+            seed.drop_model(model)
+
+
+def get_metadata() -> dict[str, Any]:
+    return {
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        "vendor": connection.vendor,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_results(results: list[Result], path: str) -> None:
+    """Write results as JSON - see anonymiser.planner for the consumer."""
+    with open(path, "w") as f:
+        json.dump(
+            {"meta": get_metadata(), "results": [r.as_dict() for r in results]},
+            f,
+            indent=2,
+        )
@@ -31,13 +31,29 @@ class BadUserAnonymiser(AnonymiserBase):
         self.first_name = "Anonymous"
 
 
+class BatchUserAnonymiser(AnonymiserBase):
+    model = User
+
+    def anonymise_first_name(self, obj: User) -> None:
+        obj.first_name = "Anonymous"
+
+    def anonymise_last_name__batch(self, values: list[str]) -> list[str]:
+        # column-wise hook - called once per batch
+        return [v.upper() for v in values]
+
+
 class UserRedacter(RedacterBase):
     model = User
 
     custom_field_redactions = {
         "first_name": "FIRST_NAME",
         "last_name": "LAST_NAME",
-        "email": Concat(Value("user_"), F("id"), Value("@example.com")),
+        "email": Concat(
+            Value("user_"),
+            F("id"),
+            Value("@example.com"),
+            output_field=models.CharField(),
+        ),
     }
 
     def get_field_auto_redacter(
@@ -1,6 +1,12 @@
+from typing import Any, Iterator
+from unittest import mock
+
 import pytest
 from django.conf import settings
+from django.contrib.auth.models import UserManager
+from django.db import connection, models
 
+from anonymiser.models import clear_plan_cache
 from tests.anonymisers import UserAnonymiser, UserRedacter
 from tests.models import User
 
@@ -10,6 +16,20 @@ IS_POSTGRES = (
 )
 
 
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup: Any, django_db_blocker: Any) -> None:
+    # Hmac / Digest use pgcrypto on PostgreSQL
+    if settings.IS_POSTGRES:
+        with django_db_blocker.unblock(), connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+
+
+@pytest.fixture(autouse=True)
+def clear_anonymisation_plans() -> None:
+    # plans are cached per class, which would leak mocks between tests
+    clear_plan_cache()
+
+
 @pytest.fixture
 def user() -> User:
     return User.objects.create_user(
@@ -40,3 +60,17 @@ def user_anonymiser() -> UserAnonymiser:
 @pytest.fixture
 def user_redacter() -> UserRedacter:
     return UserRedacter()
+
+
+class ActiveUserManager(UserManager):
+    def get_queryset(self) -> models.QuerySet[User]:
+        return super().get_queryset().filter(is_active=True)
+
+
+@pytest.fixture
+def filtered_default_manager() -> Iterator[None]:
+    """Replace the User default manager with one that hides inactive users."""
+    manager = ActiveUserManager()
+    manager.model = User
+    with mock.patch.object(User._meta, "default_manager", manager):
+        yield
@@ -0,0 +1,74 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import Group
+from django.core.management import CommandError, call_command
+
+from anonymiser.management.commands.anonymisation_config import get_models
+
+from .models import ProxyUser, User
+
+
+def anonymisation_config(*args: str) -> str:
+    out = StringIO()
+    call_command("anonymisation_config", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_get_models() -> None:
+    models = get_models()
+    assert User in models
+    assert ProxyUser not in models
+    assert models == sorted(models, key=lambda m: m._meta.label)
+
+
+def test_get_models__filtered() -> None:
+    assert get_models(model_labels=["tests.User"]) == [User]
+    assert get_models(app_labels=["tests"]) == [User]
+    assert get_models(["tests"], ["auth.Group"]) == [Group, User]
+
+
+@pytest.mark.parametrize(
+    "app_labels,model_labels",
+    [(["unknown"], None), (None, ["tests.Unknown"]), (None, ["invalid"])],
+)
+def test_get_models__invalid(app_labels: list, model_labels: list) -> None:
+    with pytest.raises(CommandError):
+        get_models(app_labels, model_labels)
+
+
+def test_command__md() -> None:
+    lines = anonymisation_config("--model", "tests.User").splitlines()
+    assert lines[1] == "App | Model | Field | Type | Anonymise | Redact"
+    assert "tests | User | first_name | CharField | X | CUSTOM" in lines
+    assert "tests | User | id | AutoField | - | -" in lines
+    assert all(line.startswith("tests | User") for line in lines[3:])
+
+
+def test_command__csv() -> None:
+    rows = list(
+        csv.reader(StringIO(anonymisation_config("-f", "csv", "--app", "tests")))
+    )
+    assert rows[0] == ["App", "Model", "Field", "Type", "Anonymise", "Redact"]
+    assert ["tests", "User", "last_name", "CharField", "-", "AUTO"] in rows
+
+
+def test_command__json() -> None:
+    rows = json.loads(anonymisation_config("-f", "json", "--app", "tests"))
+    assert {
+        "app": "tests",
+        "model": "User",
+        "field": "first_name",
+        "type": "CharField",
+        "anonymised": True,
+        "redaction": "CUSTOM",
+    } in rows
+    assert {r["model"] for r in rows} == {"User"}
+
+
+def test_command__template() -> None:
+    streamed = anonymisation_config("-f", "csv", "--app", "tests")
+    rendered = anonymisation_config("-t", "anonymisation_config.csv", "--app", "tests")
+    assert rendered.strip() == streamed.strip()
@@ -0,0 +1,92 @@
+from typing import Any, AsyncIterator
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from anonymiser.batching import (
+    aiter_pk_batches,
+    aiter_pk_chunks,
+    iter_pk_batches,
+    iter_pk_chunks,
+)
+
+from .models import User
+
+
+@pytest.mark.django_db
+class TestIterPkBatches:
+    def test_batches(self, user: User, user2: User) -> None:
+        batches = list(iter_pk_batches(User.objects.all(), batch_size=1))
+        assert batches == [[user], [user2]]
+
+    def test_batches__partial(self, user: User, user2: User) -> None:
+        batches = list(iter_pk_batches(User.objects.all(), batch_size=5))
+        assert batches == [[user, user2]]
+
+    def test_batches__start_after(self, user: User, user2: User) -> None:
+        batches = list(iter_pk_batches(User.objects.all(), start_after=user.pk))
+        assert batches == [[user2]]
+
+    def test_batches__empty(self) -> None:
+        assert list(iter_pk_batches(User.objects.all())) == []
+
+    @pytest.mark.parametrize("batch_size", [0, -1])
+    def test_batches__invalid_batch_size(self, batch_size: int) -> None:
+        with pytest.raises(ValueError):
+            list(iter_pk_batches(User.objects.all(), batch_size=batch_size))
+
+
+@pytest.mark.django_db
+class TestIterPkChunks:
+    def test_chunks(self, user: User, user2: User) -> None:
+        chunks = [list(qs) for qs in iter_pk_chunks(User.objects.all(), 1)]
+        assert chunks == [[user], [user2]]
+
+    def test_chunks__empty(self) -> None:
+        assert list(iter_pk_chunks(User.objects.all(), 1)) == []
+
+    def test_chunks__bounded(self, user: User, user2: User) -> None:
+        chunks = iter_pk_chunks(User.objects.all(), 5)
+        chunk = next(chunks)
+        # rows inserted after the chunks are started are not included
+        User.objects.create(username="testuser3")
+        assert list(chunk) == [user, user2]
+        assert list(chunks) == []
+
+    def test_chunks__partial(self, user: User, user2: User) -> None:
+        chunks = [list(qs) for qs in iter_pk_chunks(User.objects.all(), 5)]
+        assert chunks == [[user, user2]]
+
+    def test_chunks__filtered(self, user: User, user2: User) -> None:
+        qs = User.objects.filter(username="testuser2")
+        chunks = [list(qs) for qs in iter_pk_chunks(qs, 1)]
+        assert chunks == [[user2]]
+
+    def test_chunks__invalid_chunk_size(self) -> None:
+        with pytest.raises(ValueError):
+            list(iter_pk_chunks(User.objects.all(), 0))
+
+
+async def _collect(iterator: AsyncIterator[Any]) -> list[Any]:
+    return [item async for item in iterator]
+
+
+@pytest.mark.django_db
+class TestAsyncIterators:
+    def test_aiter_pk_batches(self, user: User, user2: User) -> None:
+        collect = async_to_sync(_collect)
+        qs = User.objects.all()
+        assert collect(aiter_pk_batches(qs, batch_size=1)) == [[user], [user2]]
+        assert collect(aiter_pk_batches(qs, start_after=user.pk)) == [[user2]]
+        assert collect(aiter_pk_batches(User.objects.none())) == []
+
+    def test_aiter_pk_chunks(self, user: User, user2: User) -> None:
+        chunks = async_to_sync(_collect)(aiter_pk_chunks(User.objects.all(), 1))
+        assert [list(qs) for qs in chunks] == [[user], [user2]]
+
+    def test_invalid_size(self) -> None:
+        collect = async_to_sync(_collect)
+        with pytest.raises(ValueError):
+            collect(aiter_pk_batches(User.objects.all(), batch_size=0))
+        with pytest.raises(ValueError):
+            collect(aiter_pk_chunks(User.objects.all(), 0))
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+from django.db import connection
+
+from benchmarks.suite import MODES, run_benchmarks, write_results
+from tests.models import User
+
+
+@pytest.mark.django_db
+def test_run_benchmarks(tmp_path) -> None:
+    results = list(run_benchmarks(rows=[3], wide=[], modes=list(MODES)))
+    assert [r.mode for r in results] == list(MODES)
+    assert User.objects.count() == 3
+    for result in results:
+        assert result.model == "tests.User"
+        assert result.rows == 3
+        assert result.queries > 0
+        assert result.peak_memory_bytes > 0
+    path = tmp_path / "results.json"
+    write_results(results, str(path))
+    data = json.loads(path.read_text())
+    assert data["meta"]["vendor"] == connection.vendor
+    assert data["results"][0]["rows_per_sec"] == results[0].rows_per_sec
+
+
+@pytest.mark.django_db
+def test_run_benchmarks__no_memory() -> None:
+    results = list(run_benchmarks(rows=[2], wide=[], modes=["redact"], memory=False))
+    assert len(results) == 1
+    assert results[0].peak_memory_bytes is None
+
+
+@pytest.mark.django_db
+def test_run_benchmarks__reseeded() -> None:
+    # every mode runs against freshly seeded rows, so the results do not
+    # depend on the modes run before it (unchanged rows are not written)
+    modes = ["anonymise_queryset", "pipeline"]
+    results = {r.mode: r for r in run_benchmarks(rows=[5], wide=[], modes=modes)}
+    for name in modes:
+        (alone,) = run_benchmarks(rows=[5], wide=[], modes=[name], memory=False)
+        assert results[name].queries == alone.queries
@@ -1,40 +1,294 @@
+import datetime
+import hashlib
+import hmac
+import time
+import uuid
+from typing import Any
 from unittest import mock
 
 import pytest
 from django.db import connection
 from django.db.backends.utils import CursorWrapper
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Substr
 
-from anonymiser.db.functions import GenerateUuid4
+from anonymiser.db.functions import (
+    FIRST_NAMES,
+    LAST_NAMES,
+    Digest,
+    GenerateUuid4,
+    GenerateUuid7,
+    Hmac,
+    RandomChoice,
+    RandomDate,
+    RandomFirstName,
+    RandomLastName,
+    RandomPhoneNumber,
+    TemplatedEmail,
+    is_volatile_expression,
+)
+from anonymiser.db.lookups import IsDistinctFrom
 
 from .models import User
 
 
 @pytest.mark.django_db
+@pytest.mark.parametrize("expression", [GenerateUuid4(), GenerateUuid7()])
+def test_generate_uuid(user: User, user2: User, expression: GenerateUuid4) -> None:
+    User.objects.update(uuid=expression)
+    # the text format depends on the database (hex on SQLite, hyphenated
+    # on PostgreSQL), so compare the parsed values
+    values = list(
+        User.objects.order_by("pk").values_list(Cast("uuid", CharField()), flat=True)
+    )
+    uuids = [uuid.UUID(v) for v in values]
+    assert len(set(uuids)) == 2
+    for value in uuids:
+        assert value.version == expression.version
+        assert value.variant == uuid.RFC_4122
+    # stored in the same format as uuid values saved by Django, so the
+    # stored value can be used in lookups
+    assert User.objects.get(uuid=uuids[0]).pk == user.pk
+    assert User.objects.get(uuid=uuids[1]).pk == user2.pk
+
+
+@pytest.mark.django_db
+def test_generate_uuid7__timestamp(user: User) -> None:
+    before = int(time.time() * 1000)
+    User.objects.update(uuid=GenerateUuid7())
+    after = int(time.time() * 1000)
+    user.refresh_from_db()
+    # leading 48 bits are the Unix time in ms (allow for float rounding)
+    assert before - 1 <= user.uuid.int >> 80 <= after + 1
+
+
 @pytest.mark.parametrize(
-    "vendor,sql_func",
+    "vendor,sql",
     [
-        ("sqlite", "HEX(RANDOMBLOB(16))"),
-        ("postgresql", "gen_random_uuid()"),
+        ("postgresql", "GEN_RANDOM_UUID()"),
+        ("mysql", "CONCAT(SUBSTR(LOWER(HEX(RANDOM_BYTES(6))), 1, 12), '4', "),
+        ("oracle", "(LOWER(TO_CHAR(TRUNC(DBMS_RANDOM.VALUE(0, 281474976710656))"),
     ],
 )
-@mock.patch.object(CursorWrapper, "execute")
-def test_generate_uuid4(
-    mock_execute: mock.MagicMock, vendor: str, sql_func: str
-) -> None:
-    uuid_expression = GenerateUuid4()
+def test_generate_uuid4__vendors(vendor: str, sql: str) -> None:
     with mock.patch.object(connection, "vendor", vendor):
-        assert connection.vendor == vendor
-        User.objects.update(uuid=uuid_expression)
-        assert mock_execute.call_args[0][0] == (
-            f'UPDATE "tests_user" SET "uuid" = {sql_func}'  # noqa: S608
-        )
+        assert GenerateUuid4().as_sql(None, connection)[0].startswith(sql)
 
 
-@pytest.mark.django_db
-@pytest.mark.parametrize("vendor", ["mysql", "oracle"])
-def test_unsupported_databases_engines(vendor: str) -> None:
-    uuid_expression = GenerateUuid4()
+@pytest.mark.parametrize(
+    "vendor,sql",
+    [
+        ("postgresql", "CAST((LPAD(TO_HEX(FLOOR(EXTRACT(EPOCH FROM CLOCK_TIMESTAMP()"),
+        ("mysql", "CONCAT(LPAD(LOWER(HEX(FLOOR(UNIX_TIMESTAMP(SYSDATE(3))"),
+        ("oracle", "(LOWER(TO_CHAR(ROUND((CAST(SYS_EXTRACT_UTC(SYSTIMESTAMP)"),
+    ],
+)
+def test_generate_uuid7__vendors(vendor: str, sql: str) -> None:
     with mock.patch.object(connection, "vendor", vendor):
-        assert connection.vendor == vendor
+        assert GenerateUuid7().as_sql(None, connection)[0].startswith(sql)
+
+
+@pytest.mark.parametrize("expression", [GenerateUuid4(), GenerateUuid7()])
+def test_generate_uuid__unsupported(expression: GenerateUuid4) -> None:
+    with mock.patch.object(connection, "vendor", "mssql"):
         with pytest.raises(NotImplementedError):
-            uuid_expression.as_sql(None, connection)
+            expression.as_sql(None, connection)
+
+
+@pytest.mark.django_db
+class TestHashExpressions:
+    def test_hmac(self, user: User, user2: User) -> None:
+        User.objects.update(last_name=Substr(Hmac("username", key="secret"), 1, 16))
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        expected = hmac.new(b"secret", b"testuser1", "sha256").hexdigest()[:16]
+        assert user.last_name == expected
+        assert user2.last_name != expected
+
+    def test_hmac__consistent(self, user: User) -> None:
+        # the same value hashes to the same output, wherever it is used
+        User.objects.update(
+            first_name=Substr(Hmac("location", key="secret"), 1, 16),
+            last_name=Substr(Hmac(Value("London"), key="secret"), 1, 16),
+        )
+        user.refresh_from_db()
+        assert user.first_name == user.last_name
+
+    def test_hmac__null(self, user: User) -> None:
+        qs = User.objects.annotate(h=Hmac("date_of_birth", key="secret"))
+        assert qs.get().h is None
+
+    def test_hmac__non_text(self, user: User) -> None:
+        qs = User.objects.annotate(h=Hmac("id", key="secret", algorithm="md5"))
+        expected = hmac.new(b"secret", str(user.id).encode(), "md5").hexdigest()
+        assert qs.get().h == expected
+
+    def test_digest(self, user: User) -> None:
+        qs = User.objects.annotate(h=Digest("username", algorithm="sha1"))
+        assert qs.get().h == hashlib.sha1(b"testuser1").hexdigest()  # noqa: S324
+
+    def test_invalid_algorithm(self) -> None:
+        with pytest.raises(ValueError):
+            Hmac("username", key="secret", algorithm="crc32")
+
+    @pytest.mark.parametrize(
+        "expression,sql_func",
+        [
+            (
+                Hmac("username", key="k"),
+                """ENCODE(HMAC(("tests_user"."username")::text, %s, %s), 'hex')""",
+            ),
+            (
+                Digest("username"),
+                """ENCODE(DIGEST(("tests_user"."username")::text, %s), 'hex')""",
+            ),
+        ],
+    )
+    @mock.patch.object(CursorWrapper, "execute")
+    def test_postgresql(
+        self, mock_execute: mock.MagicMock, expression: Any, sql_func: str
+    ) -> None:
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            User.objects.update(last_name=expression)
+            assert mock_execute.call_args[0][0] == (
+                f'UPDATE "tests_user" SET "last_name" = {sql_func}'  # noqa: S608
+            )
+
+    @pytest.mark.parametrize("vendor", ["mysql", "oracle"])
+    def test_unsupported_databases_engines(self, vendor: str) -> None:
+        with mock.patch.object(connection, "vendor", vendor):
+            with pytest.raises(NotImplementedError):
+                Hmac("username", key="k").as_sql(None, connection)
+
+
+@pytest.mark.django_db
+class TestFakeDataExpressions:
+    def test_random_choice(self, user: User, user2: User) -> None:
+        User.objects.update(location=RandomChoice(["Paris", "Rome"]))
+        assert set(User.objects.values_list("location", flat=True)) <= {
+            "Paris",
+            "Rome",
+        }
+
+    def test_random_choice__single(self, user: User) -> None:
+        User.objects.update(location=RandomChoice(["Paris"]))
+        user.refresh_from_db()
+        assert user.location == "Paris"
+
+    def test_random_choice__empty(self) -> None:
+        with pytest.raises(ValueError):
+            RandomChoice([])
+
+    def test_random_names(self, user: User) -> None:
+        User.objects.update(first_name=RandomFirstName(), last_name=RandomLastName())
+        user.refresh_from_db()
+        assert user.first_name in FIRST_NAMES
+        assert user.last_name in LAST_NAMES
+
+    def test_random_date(self, user: User, user2: User) -> None:
+        start, end = datetime.date(2000, 1, 1), datetime.date(2000, 1, 3)
+        User.objects.update(date_of_birth=RandomDate(start, end))
+        for dob in User.objects.values_list("date_of_birth", flat=True):
+            assert start <= dob <= end
+
+    def test_random_date__invalid(self) -> None:
+        with pytest.raises(ValueError):
+            RandomDate(datetime.date(2000, 1, 2), datetime.date(2000, 1, 1))
+
+    def test_random_phone_number(self, user: User) -> None:
+        User.objects.update(location=RandomPhoneNumber(prefix="+44 ", digits=10))
+        user.refresh_from_db()
+        assert user.location.startswith("+44 ")
+        assert len(user.location) == 14
+        assert user.location[4:].isdigit()
+
+    @pytest.mark.parametrize("digits", [0, 11])
+    def test_random_phone_number__invalid(self, digits: int) -> None:
+        with pytest.raises(ValueError):
+            RandomPhoneNumber(digits=digits)
+
+    def test_templated_email(self, user: User, user2: User) -> None:
+        User.objects.update(email=TemplatedEmail("person.{pk}@example.org"))
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.email == f"person.{user.pk}@example.org"
+        assert user2.email == f"person.{user2.pk}@example.org"
+
+    @pytest.mark.parametrize("template", ["user@example.com", "{pk}{pk}@example.com"])
+    def test_templated_email__invalid(self, template: str) -> None:
+        with pytest.raises(ValueError):
+            TemplatedEmail(template)
+
+    @pytest.mark.parametrize(
+        "expression,sql_func",
+        [
+            (
+                RandomChoice(["a", "b"]),
+                "CASE FLOOR(RANDOM() * 2)::bigint WHEN 0 THEN %s WHEN 1 THEN %s END",
+            ),
+            (
+                RandomDate(datetime.date(2000, 1, 1), datetime.date(2000, 1, 10)),
+                "((%s)::date + (FLOOR(RANDOM() * 10)::bigint)::integer)",
+            ),
+            (
+                RandomPhoneNumber(digits=3),
+                "(%s || LPAD((FLOOR(RANDOM() * 1000)::bigint)::text, 3, '0'))",
+            ),
+        ],
+    )
+    @mock.patch.object(CursorWrapper, "execute")
+    def test_postgresql(
+        self, mock_execute: mock.MagicMock, expression: Any, sql_func: str
+    ) -> None:
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            User.objects.update(last_name=expression)
+            assert mock_execute.call_args[0][0] == (
+                f'UPDATE "tests_user" SET "last_name" = {sql_func}'  # noqa: S608
+            )
+
+    @pytest.mark.parametrize("vendor", ["mysql", "oracle"])
+    def test_unsupported_databases_engines(self, vendor: str) -> None:
+        with mock.patch.object(connection, "vendor", vendor):
+            with pytest.raises(NotImplementedError):
+                User.objects.update(last_name=RandomChoice(["a"]))
+
+
+@pytest.mark.django_db
+class TestIsDistinctFrom:
+    def test_null_safe(self) -> None:
+        User.objects.create(username="a", date_of_birth=None)
+        User.objects.create(username="b", date_of_birth=datetime.date(2000, 1, 1))
+        User.objects.create(username="c", date_of_birth=datetime.date(2001, 1, 1))
+        dob = User._meta.get_field("date_of_birth")
+
+        def usernames(value: Any) -> list[str]:
+            lookup = IsDistinctFrom(F("date_of_birth"), Value(value, dob))
+            qs = User.objects.filter(lookup).order_by("username")
+            return list(qs.values_list("username", flat=True))
+
+        assert usernames(datetime.date(2000, 1, 1)) == ["a", "c"]
+        assert usernames(None) == ["b", "c"]
+
+    def test_expression(self) -> None:
+        User.objects.create(username="a", first_name="a")
+        User.objects.create(username="b", first_name="x")
+        lookup = IsDistinctFrom(F("first_name"), F("username"))
+        assert list(User.objects.filter(lookup).values_list("username", flat=True)) == [
+            "b"
+        ]
+
+
+@pytest.mark.parametrize(
+    "value,volatile",
+    [
+        ("X", False),
+        (Value("X"), False),
+        (F("first_name"), False),
+        (TemplatedEmail(), False),
+        (GenerateUuid4(), True),
+        (RandomFirstName(), True),
+        (Substr(RandomPhoneNumber(), 1, 5), True),
+    ],
+)
+def test_is_volatile_expression(value: Any, volatile: bool) -> None:
+    assert is_volatile_expression(value) is volatile
@@ -0,0 +1,206 @@
+import functools
+import json
+import uuid
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import Group
+from django.core.management import CommandError, call_command
+from django.core.validators import MaxLengthValidator
+from django.db import models
+from django.utils.translation import gettext_lazy
+
+from anonymiser import fingerprints
+
+from .anonymisers import UserAnonymiser
+from .models import User
+
+
+class DefaultFactory:
+    # a callable field default (has no __qualname__)
+    def __call__(self) -> dict:
+        return {}
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, None),
+        ("x", "x"),
+        ((1, [True]), [1, [True]]),
+        ({"a": 1.5}, {"a": 1.5}),
+        (gettext_lazy("name"), "name"),
+        (uuid.uuid4, "uuid.uuid4"),
+        (User, "tests.User"),
+        (str, "builtins.str"),
+        (
+            MaxLengthValidator(10),
+            ["django.core.validators.MaxLengthValidator", [10], {}],
+        ),
+        (
+            functools.partial(uuid.uuid5, uuid.NAMESPACE_DNS, name="x"),
+            ["uuid.uuid5", ["6ba7b810-9dad-11d1-80b4-00c04fd430c8"], {"name": "x"}],
+        ),
+        (DefaultFactory(), "tests.test_fingerprints.DefaultFactory"),
+        ({"b", "a", 3}, ["a", "b", 3]),
+        (frozenset(["b", "a"]), ["a", "b"]),
+    ],
+)
+def test_stable(value: object, expected: object) -> None:
+    assert fingerprints._stable(value) == expected
+
+
+def test_get_field_definition() -> None:
+    definition = fingerprints.get_field_definition(User._meta.get_field("uuid"))
+    assert definition == fingerprints.get_field_definition(User._meta.get_field("uuid"))
+    assert definition != fingerprints.get_field_definition(
+        User._meta.get_field("location")
+    )
+    # reverse relations
+    assert fingerprints.get_field_definition(Group._meta.get_field("user"))
+
+
+@pytest.mark.parametrize(
+    "default", [functools.partial(dict, a=1), DefaultFactory(), {"a", "b"}]
+)
+def test_get_field_definition__default(default: object) -> None:
+    field = models.JSONField(default=default)
+    definition = fingerprints.get_field_definition(field)
+    assert definition == fingerprints.get_field_definition(
+        models.JSONField(default=default)
+    )
+
+
+def test_get_model_entry() -> None:
+    entry = fingerprints.get_model_entry(User)
+    assert entry["anonymiser"] == "tests.anonymisers.UserAnonymiser"
+    assert entry["fields"]["first_name"] == {
+        "type": "CharField",
+        "definition": mock.ANY,
+        "anonymised": True,
+        "redaction": "CUSTOM",
+    }
+    assert fingerprints.get_model_entry(User) == entry
+    assert fingerprints.get_model_entry(Group)["anonymiser"] is None
+
+
+def test_get_model_entry__fingerprint() -> None:
+    fingerprint = fingerprints.get_model_entry(User)["fingerprint"]
+    with mock.patch.object(UserAnonymiser, "is_field_anonymised", return_value=False):
+        assert fingerprints.get_model_entry(User)["fingerprint"] != fingerprint
+
+
+def field(anonymised: bool = False, redaction: str | None = None) -> dict:
+    return {
+        "type": "CharField",
+        "definition": "x",
+        "anonymised": anonymised,
+        "redaction": redaction,
+    }
+
+
+def test_diff_fields() -> None:
+    old = {
+        "a": field(True),
+        "b": field(),
+        "c": field(),
+        "d": field(),
+        "e": field(),
+    }
+    new = {
+        "a": field(False),
+        "b": field(redaction="AUTO"),
+        "c": {**field(), "definition": "y"},
+        "e": field(),
+        "f": field(True),
+    }
+    assert fingerprints.diff_fields(old, new) == [
+        "  ! a: NO LONGER ANONYMISED (CharField, not anonymised, redaction -)",
+        "  ~ b: CharField, not anonymised, redaction - -> "
+        "CharField, not anonymised, redaction AUTO",
+        "  ~ c: definition changed",
+        "  - d: removed",
+        "  + f: added (CharField, anonymised, redaction -)",
+    ]
+
+
+def test_diff_fingerprints() -> None:
+    old = fingerprints.get_fingerprints([Group, User])
+    with mock.patch.object(UserAnonymiser, "is_field_anonymised", return_value=False):
+        new = fingerprints.get_fingerprints([User])
+    lines = fingerprints.diff_fingerprints(old, new)
+    assert lines[0] == "auth.Group: removed"
+    assert lines[1] == "tests.User: changed"
+    assert "  ! first_name: NO LONGER ANONYMISED" in "\n".join(lines)
+    assert fingerprints.diff_fingerprints(new, old)[0] == "auth.Group: added"
+    assert fingerprints.diff_fingerprints(old, old) == []
+
+
+class TestCommand:
+    def call(self, *args: str) -> str:
+        out = StringIO()
+        call_command("anonymisation_config", *args, stdout=out)
+        return out.getvalue()
+
+    def test_update(self, tmp_path: Path) -> None:
+        path = tmp_path / "fingerprints.json"
+        self.call("--fingerprints", str(path), "--update")
+        data = json.loads(path.read_text())
+        assert "tests.User" in data
+        assert "tests.ProxyUser" not in data
+
+    def test_unchanged(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "fingerprints.json")
+        self.call("--fingerprints", path, "--update")
+        assert self.call("--fingerprints", path).strip() == (
+            "Anonymisation config unchanged"
+        )
+        # filtering does not report the other models as removed
+        assert self.call("--fingerprints", path, "--app", "tests").strip() == (
+            "Anonymisation config unchanged"
+        )
+
+    def test_filtered(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "fingerprints.json")
+        self.call("--fingerprints", path, "--update", "--model", "tests.User")
+        out = StringIO()
+        with pytest.raises(CommandError):
+            call_command(
+                "anonymisation_config",
+                "--fingerprints",
+                path,
+                "--app",
+                "auth",
+                stdout=out,
+            )
+        # tests.User is not selected, so is not reported as removed
+        assert "tests.User" not in out.getvalue()
+        assert "auth.Group: added" in out.getvalue()
+
+    def test_update__filtered(self, tmp_path: Path) -> None:
+        path = tmp_path / "fingerprints.json"
+        self.call("--fingerprints", str(path), "--update", "--model", "tests.User")
+        self.call("--fingerprints", str(path), "--update", "--app", "auth")
+        # the stored tests.User fingerprint is kept
+        data = json.loads(path.read_text())
+        assert "tests.User" in data
+        assert "auth.Group" in data
+        assert "contenttypes.ContentType" not in data
+
+    def test_changed(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "fingerprints.json")
+        self.call("--fingerprints", path, "--update")
+        out = StringIO()
+        with mock.patch.object(
+            UserAnonymiser, "is_field_anonymised", return_value=False
+        ):
+            with pytest.raises(CommandError):
+                call_command("anonymisation_config", "--fingerprints", path, stdout=out)
+        assert "tests.User: changed" in out.getvalue()
+        assert "first_name: NO LONGER ANONYMISED" in out.getvalue()
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        with pytest.raises(CommandError):
+            self.call("--fingerprints", str(tmp_path / "missing.json"))
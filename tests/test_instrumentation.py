@@ -0,0 +1,148 @@
+from typing import Iterator
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from anonymiser import instrumentation
+from anonymiser.instrumentation import Collector, Measurement, value_size
+
+from .anonymisers import BatchUserAnonymiser, UserAnonymiser
+from .models import User
+
+
+@pytest.fixture
+def measurements() -> Iterator[list[Measurement]]:
+    recorded: list[Measurement] = []
+    instrumentation.add_callback(recorded.append)
+    yield recorded
+    instrumentation.remove_callback(recorded.append)
+
+
+@pytest.mark.parametrize(
+    "value,size",
+    [(None, 0), ("abc", 3), ("é", 2), (b"abcd", 4), (123, 3)],
+)
+def test_value_size(value: object, size: int) -> None:
+    assert value_size(value) == size
+
+
+def test_add_callback__invalid_sample_rate() -> None:
+    with pytest.raises(ValueError):
+        instrumentation.add_callback(print, sample_rate=0)
+
+
+def test_measure__disabled() -> None:
+    assert instrumentation.measure("test", User) is instrumentation.NULL_RECORDER
+
+
+@mock.patch("anonymiser.instrumentation.random.random", return_value=0.5)
+def test_measure__sampling(mock_random: mock.Mock) -> None:
+    with instrumentation.collect(sample_rate=0.1):
+        assert instrumentation.measure("test", User) is instrumentation.NULL_RECORDER
+    with instrumentation.collect(sample_rate=0.9):
+        assert (
+            instrumentation.measure("test", User) is not instrumentation.NULL_RECORDER
+        )
+
+
+def test_measure__exception(measurements: list[Measurement]) -> None:
+    with pytest.raises(ZeroDivisionError):
+        with instrumentation.measure("test", User):
+            1 / 0  # noqa: B018
+    assert measurements == []
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+    def test_anonymise_field(self, user: User, measurements: list[Measurement]) -> None:
+        UserAnonymiser().anonymise_field(user, User._meta.get_field("first_name"))
+        (measurement,) = measurements
+        assert measurement.operation == "anonymise_field"
+        assert measurement.model == "tests.User"
+        assert measurement.field == "first_name"
+        assert measurement.rows == 1
+        assert measurement.queries == 0
+        assert measurement.bytes_changed == len("Anonymous")
+
+    def test_anonymise_object(
+        self, user: User, measurements: list[Measurement]
+    ) -> None:
+        UserAnonymiser().anonymise_object(user)
+        field_measurement, measurement = measurements
+        assert field_measurement.operation == "anonymise_field"
+        assert field_measurement.field == "first_name"
+        assert field_measurement.bytes_changed == len("Anonymous")
+        assert measurement.operation == "anonymise_object"
+        assert measurement.field is None
+        assert measurement.rows == 1
+
+    def test_anonymise_queryset(
+        self, user: User, user2: User, measurements: list[Measurement]
+    ) -> None:
+        BatchUserAnonymiser().anonymise_queryset(User.objects.all())
+        operations = [(m.operation, m.field, m.rows) for m in measurements]
+        assert operations == [
+            ("anonymise_column", "first_name", 2),
+            ("anonymise_column", "last_name", 2),
+            ("anonymise_batch", None, 2),
+        ]
+        # the SELECT is outside the batch - only the write is counted
+        assert measurements[-1].queries == settings.WRITE_QUERIES
+        assert measurements[1].bytes_changed == len("FLINTSTONE" + "ROGERS")
+
+    def test_redact_queryset(
+        self, user: User, user2: User, measurements: list[Measurement]
+    ) -> None:
+        UserAnonymiser().redact_queryset(User.objects.all(), chunk_size=1)
+        (measurement,) = measurements
+        assert measurement.operation == "redact_queryset"
+        assert measurement.rows == 2
+        assert measurement.queries > 2
+        assert measurement.bytes_changed == 0
+
+    def test_aanonymise_queryset(
+        self, user: User, user2: User, measurements: list[Measurement]
+    ) -> None:
+        async_to_sync(BatchUserAnonymiser().aanonymise_queryset)(User.objects.all())
+        operations = [(m.operation, m.field, m.rows) for m in measurements]
+        assert operations[-1] == ("anonymise_batch", None, 2)
+        # the write runs in the worker thread, so its queries are counted
+        assert measurements[-1].queries == settings.WRITE_QUERIES
+
+    def test_aredact_queryset(
+        self, user: User, user2: User, measurements: list[Measurement]
+    ) -> None:
+        redact = async_to_sync(UserAnonymiser().aredact_queryset)
+        redact(User.objects.all(), chunk_size=1)
+        # one measurement per chunk
+        assert [(m.operation, m.rows, m.queries) for m in measurements] == [
+            ("redact_queryset", 1, 1),
+            ("redact_queryset", 1, 1),
+        ]
+
+
+@pytest.mark.django_db
+def test_collect(user: User) -> None:
+    with instrumentation.collect() as collector:
+        UserAnonymiser().anonymise_object(user)
+        UserAnonymiser().anonymise_object(user)
+    assert isinstance(collector, Collector)
+    totals = collector.totals[("tests.User", "", "anonymise_object")]
+    assert totals.calls == 2
+    assert totals.rows == 2
+    report = collector.report()
+    assert report.splitlines()[0].split() == [
+        "model",
+        "field",
+        "operation",
+        "calls",
+        "seconds",
+        "rows",
+        "queries",
+        "bytes",
+    ]
+    assert "tests.User" in report
+    # collector is removed on exit
+    assert instrumentation.measure("test", User) is instrumentation.NULL_RECORDER
@@ -1,13 +1,32 @@
+import datetime
+from typing import Any
 from unittest import mock
 
 import freezegun
 import pytest
-from django.db import models
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection, models
 
-from anonymiser.db.functions import GenerateUuid4
+from anonymiser.db.functions import GenerateUuid4, TemplatedEmail
+from anonymiser.models import (
+    AnonymisationCheckpoint,
+    RedacterBase,
+    clear_plan_cache,
+    get_changed_filter,
+    get_changes,
+    get_redaction_select,
+    is_changed,
+)
+from anonymiser.redacters import volatile
 from anonymiser.registry import ModelFieldSummary
 
-from .anonymisers import BadUserAnonymiser, UserAnonymiser, UserRedacter
+from .anonymisers import (
+    BadUserAnonymiser,
+    BatchUserAnonymiser,
+    UserAnonymiser,
+    UserRedacter,
+)
 from .models import User
 
 
@@ -60,6 +79,19 @@ class TestAnonymisableUserModel:
         assert user.last_name == "flintstone"
         assert user.username == "testuser1"
 
+    def test_anonymise__anonymise_field_override(self, user: User) -> None:
+        class LoggingUserAnonymiser(UserAnonymiser):
+            def anonymise_field(
+                self, obj: models.Model, field: models.Field
+            ) -> tuple[Any, Any]:
+                anonymised.append(field.name)
+                return super().anonymise_field(obj, field)
+
+        anonymised: list[str] = []
+        assert LoggingUserAnonymiser().anonymise_object(user) == ["first_name"]
+        assert anonymised == ["first_name"]
+        assert user.first_name == "Anonymous"
+
     @mock.patch.object(UserAnonymiser, "post_anonymise_object")
     def test_post_anonymise_object(
         self,
@@ -77,6 +109,143 @@ class TestAnonymisableUserModel:
             User._meta.get_field("first_name")
         ]
 
+    def test_get_anonymisation_plan(self, user_anonymiser: UserAnonymiser) -> None:
+        plan = user_anonymiser.get_anonymisation_plan()
+        assert plan.fields == (User._meta.get_field("first_name"),)
+        assert plan.field_names == ["first_name"]
+        # plans are cached per class, not per instance
+        assert UserAnonymiser().get_anonymisation_plan() is plan
+
+    def test_get_anonymisation_plan__cleared(
+        self, user_anonymiser: UserAnonymiser
+    ) -> None:
+        plan = user_anonymiser.get_anonymisation_plan()
+        clear_plan_cache()
+        assert user_anonymiser.get_anonymisation_plan() is not plan
+        assert user_anonymiser.get_anonymisation_plan() == plan
+
+    @mock.patch.object(UserAnonymiser, "get_anonymisable_fields")
+    def test_anonymise_object__no_reflection(
+        self,
+        mock_get_fields: mock.Mock,
+        user: User,
+        user2: User,
+        user_anonymiser: UserAnonymiser,
+    ) -> None:
+        mock_get_fields.return_value = [User._meta.get_field("first_name")]
+        user_anonymiser.anonymise_object(user)
+        user_anonymiser.anonymise_object(user2)
+        assert user2.first_name == "Anonymous"
+        mock_get_fields.assert_called_once()
+
+    def test_anonymise_queryset(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        assert user_anonymiser.anonymise_queryset(User.objects.all(), batch_size=1) == [
+            1,
+            1,
+        ]
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.first_name == "Anonymous"
+        assert user.last_name == "flintstone"
+        assert user2.first_name == "Anonymous"
+        assert user2.last_name == "rogers"
+
+    def test_anonymise_queryset__filtered(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        qs = User.objects.filter(username="testuser2")
+        assert user_anonymiser.anonymise_queryset(qs) == [1]
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.first_name == "fred"
+        assert user2.first_name == "Anonymous"
+
+    def test_anonymise_queryset__num_queries(
+        self,
+        user: User,
+        user2: User,
+        user_anonymiser: UserAnonymiser,
+        django_assert_num_queries: Any,
+    ) -> None:
+        # one SELECT and one write per batch - no per-row saves
+        with django_assert_num_queries(1 + settings.WRITE_QUERIES):
+            assert user_anonymiser.anonymise_queryset(User.objects.all()) == [2]
+
+    def test_anonymise_queryset_none(self, user_anonymiser: UserAnonymiser) -> None:
+        assert user_anonymiser.anonymise_queryset(User.objects.none()) == []
+
+
+@pytest.mark.django_db
+class TestBatchAnonymiser:
+    def test_get_anonymisable_fields(self) -> None:
+        assert BatchUserAnonymiser().get_anonymisable_fields() == [
+            User._meta.get_field("first_name"),
+            User._meta.get_field("last_name"),
+        ]
+
+    def test_anonymise_field(self, user: User) -> None:
+        BatchUserAnonymiser().anonymise_field(user, User._meta.get_field("last_name"))
+        assert user.last_name == "FLINTSTONE"
+
+    def test_anonymise_object(self, user: User) -> None:
+        assert BatchUserAnonymiser().anonymise_object(user) == [
+            "first_name",
+            "last_name",
+        ]
+        assert user.first_name == "Anonymous"
+        assert user.last_name == "FLINTSTONE"
+
+    @mock.patch.object(BatchUserAnonymiser, "anonymise_last_name__batch")
+    @mock.patch.object(BatchUserAnonymiser, "post_anonymise_object")
+    def test_anonymise_objects(
+        self,
+        mock_post_anonymise: mock.Mock,
+        mock_batch: mock.Mock,
+        user: User,
+        user2: User,
+    ) -> None:
+        mock_batch.return_value = ["A", "B"]
+        assert BatchUserAnonymiser().anonymise_objects([user, user2]) == [
+            "first_name",
+            "last_name",
+        ]
+        # one call for the whole column
+        mock_batch.assert_called_once_with(["flintstone", "rogers"])
+        assert (user.last_name, user2.last_name) == ("A", "B")
+        assert mock_post_anonymise.call_args_list == [
+            mock.call(
+                user,
+                first_name=("fred", "Anonymous"),
+                last_name=("flintstone", "A"),
+            ),
+            mock.call(
+                user2,
+                first_name=("ginger", "Anonymous"),
+                last_name=("rogers", "B"),
+            ),
+        ]
+
+    @mock.patch.object(BatchUserAnonymiser, "anonymise_last_name__batch")
+    def test_anonymise_objects__bad_length(
+        self, mock_batch: mock.Mock, user: User, user2: User
+    ) -> None:
+        mock_batch.return_value = ["A"]
+        with pytest.raises(ValueError):
+            BatchUserAnonymiser().anonymise_objects([user, user2])
+
+    def test_anonymise_queryset(self, user: User, user2: User) -> None:
+        assert BatchUserAnonymiser().anonymise_queryset(User.objects.all()) == [2]
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert (user.first_name, user.last_name) == ("Anonymous", "FLINTSTONE")
+        assert (user2.first_name, user2.last_name) == ("Anonymous", "ROGERS")
+
+    def test_set_batch_attribute(self) -> None:
+        with pytest.raises(AttributeError):
+            BatchUserAnonymiser().last_name = "foo"
+
 
 def test_bad_anonymiser() -> None:
     with pytest.raises(AttributeError):
@@ -110,6 +279,33 @@ class TestRedaction:
         # confirm that we haven't reused the same uuid for all objects
         assert user.uuid != user2.uuid
 
+    def test_redact_queryset__chunked(
+        self,
+        user: User,
+        user2: User,
+        user_redacter: UserRedacter,
+    ) -> None:
+        qs = User.objects.all()
+        assert user_redacter.redact_queryset(qs, chunk_size=1) == 2
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.last_name == "LAST_NAME"
+        assert user2.last_name == "LAST_NAME"
+        assert user.uuid != user2.uuid
+
+    @mock.patch("anonymiser.models.time.sleep")
+    def test_redact_queryset__throttle(
+        self,
+        mock_sleep: mock.Mock,
+        user: User,
+        user2: User,
+        user_redacter: UserRedacter,
+    ) -> None:
+        qs = User.objects.all()
+        assert user_redacter.redact_queryset(qs, chunk_size=1, throttle=0.5) == 2
+        # two chunks - only sleep between them
+        mock_sleep.assert_called_once_with(0.5)
+
     def test_redact_queryset__field_overrides(
         self,
         user: User,
@@ -129,6 +325,60 @@ class TestRedaction:
         user.refresh_from_db()
         assert user.uuid != uuid
 
+    def test_get_redaction_plan(self, user_redacter: UserRedacter) -> None:
+        plan = user_redacter.get_redaction_plan()
+        assert plan.fields == tuple(user_redacter.get_redactable_fields())
+        assert UserRedacter().get_redaction_plan() is plan
+        assert [f.name for f, _ in plan.auto_redacters] == [
+            f.name for f in plan.fields if user_redacter.get_field_auto_redacter(f)
+        ]
+
+    @mock.patch.object(UserRedacter, "get_field_auto_redacter")
+    def test_get_field_redaction_values__memoised(
+        self, mock_get_redacter: mock.Mock, user_redacter: UserRedacter
+    ) -> None:
+        redacter = mock.Mock(return_value="X")
+        mock_get_redacter.return_value = redacter
+        values = user_redacter.get_field_redaction_values()
+        assert user_redacter.get_field_redaction_values() == values
+        # one call per field, not per field per call
+        assert redacter.call_count == mock_get_redacter.call_count
+        # and the returned dict is a copy
+        values["foo"] = "bar"
+        assert "foo" not in user_redacter.get_field_redaction_values()
+
+    @mock.patch.object(UserRedacter, "get_field_auto_redacter")
+    def test_get_field_redaction_values__volatile(
+        self, mock_get_redacter: mock.Mock, user_redacter: UserRedacter
+    ) -> None:
+        mock_get_redacter.return_value = volatile(mock.Mock(return_value="X"))
+        user_redacter.get_field_redaction_values()
+        num_calls = mock_get_redacter.return_value.call_count
+        user_redacter.get_field_redaction_values()
+        assert mock_get_redacter.return_value.call_count == 2 * num_calls
+
+    @mock.patch.object(UserRedacter, "memoise_redaction_values", False)
+    def test_get_field_redaction_values__not_memoised(
+        self, user_redacter: UserRedacter
+    ) -> None:
+        with freezegun.freeze_time("2021-01-01"):
+            assert user_redacter.get_field_redaction_values()["location"] == 255 * "X"
+        with mock.patch.object(UserRedacter, "get_field_auto_redacter") as mock_func:
+            # the redacter functions are cached, but not the values
+            user_redacter.get_field_redaction_values()
+            mock_func.assert_not_called()
+
+    def test_get_field_redaction_values__datetime(
+        self, user_redacter: UserRedacter
+    ) -> None:
+        # date / time redacters are volatile, and never memoised
+        with freezegun.freeze_time("2021-01-01"):
+            values = user_redacter.get_field_redaction_values()
+            assert values["date_of_birth"] == datetime.date(2021, 1, 1)
+        with freezegun.freeze_time("2022-01-01"):
+            values = user_redacter.get_field_redaction_values()
+            assert values["date_of_birth"] == datetime.date(2022, 1, 1)
+
     @freezegun.freeze_time("2021-01-01")
     @mock.patch.object(UserRedacter, "get_model_fields")
     def test_auto_redact(
@@ -169,3 +419,288 @@ def test_model_fields_data() -> None:
     assert isinstance(mfs.anonymiser, UserAnonymiser)
     assert mfs.is_anonymised is True
     assert mfs.redaction_strategy == UserAnonymiser.FieldRedactionStrategy.CUSTOM
+
+
+@pytest.mark.django_db
+class TestAnonymisationCheckpoint:
+    def test_get_checkpoint__new(self) -> None:
+        checkpoint = AnonymisationCheckpoint.get_checkpoint(User, "1")
+        assert checkpoint.pk is None
+        assert checkpoint.model_label == "tests.User"
+        assert checkpoint.get_last_pk(User) is None
+
+    def test_get_checkpoint__stale(self) -> None:
+        AnonymisationCheckpoint.objects.create(
+            model_label="tests.User", anonymiser_version="1", last_pk="99"
+        )
+        checkpoint = AnonymisationCheckpoint.get_checkpoint(User, "2")
+        assert checkpoint.pk is not None
+        assert checkpoint.anonymiser_version == "2"
+        assert checkpoint.get_last_pk(User) is None
+
+    def test_advance(self) -> None:
+        checkpoint = AnonymisationCheckpoint.get_checkpoint(User, "1")
+        checkpoint.advance(42, 10)
+        checkpoint.advance(84, 10)
+        checkpoint.refresh_from_db()
+        assert checkpoint.get_last_pk(User) == 84
+        assert checkpoint.batch_number == 2
+        assert checkpoint.rows_processed == 20
+
+    def test_anonymise_queryset__resume(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        AnonymisationCheckpoint.objects.create(
+            model_label="tests.User", last_pk=str(user.pk), batch_number=1
+        )
+        counts = user_anonymiser.anonymise_queryset(User.objects.all(), resume=True)
+        assert counts == [1]
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.first_name == "fred"
+        assert user2.first_name == "Anonymous"
+        # completed runs remove the checkpoint
+        assert not AnonymisationCheckpoint.objects.exists()
+
+    def test_anonymise_queryset__interrupted(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        with mock.patch.object(
+            user_anonymiser, "post_anonymise_object", side_effect=[None, Exception]
+        ):
+            with pytest.raises(Exception):
+                user_anonymiser.anonymise_queryset(
+                    User.objects.all(), batch_size=1, resume=True
+                )
+        checkpoint = AnonymisationCheckpoint.objects.get()
+        assert checkpoint.get_last_pk(User) == user.pk
+        assert checkpoint.batch_number == 1
+        assert checkpoint.rows_processed == 1
+        user2.refresh_from_db()
+        assert user2.first_name == "ginger"
+        assert user_anonymiser.anonymise_queryset(
+            User.objects.all(), batch_size=1, resume=True
+        ) == [1]
+        user2.refresh_from_db()
+        assert user2.first_name == "Anonymous"
+
+    def test_anonymise_queryset__no_resume(
+        self, user: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        AnonymisationCheckpoint.objects.create(
+            model_label="tests.User", last_pk=str(user.pk)
+        )
+        assert user_anonymiser.anonymise_queryset(User.objects.all()) == [1]
+        # checkpoints are ignored (and left untouched)
+        assert AnonymisationCheckpoint.objects.get().last_pk == str(user.pk)
+
+
+DICT = {"email": "fred@example.com"}
+
+
+@pytest.mark.parametrize(
+    "old_value,new_value,changed",
+    [
+        ("fred", "fred", False),
+        ("fred", "Anonymous", True),
+        (None, None, False),
+        (None, "", True),
+        ({"a": 1}, {"a": 1}, False),
+        # a mutable value changed in place cannot be compared
+        (DICT, DICT, True),
+        (datetime.date(2000, 1, 1), datetime.date(2000, 1, 1), False),
+    ],
+)
+def test_is_changed(old_value: Any, new_value: Any, changed: bool) -> None:
+    assert is_changed(old_value, new_value) is changed
+
+
+def test_get_changes() -> None:
+    users = [User(first_name="A", last_name="B"), User(first_name="C", last_name="D")]
+    old_values = {"first_name": ["A", "X"], "last_name": ["B", "D"]}
+    assert get_changes(users, old_values) == ([users[1]], ["first_name"])
+    assert get_changes(users, {"last_name": ["B", "D"]}) == ([], [])
+
+
+@pytest.mark.django_db
+class TestSkipUnchanged:
+    def test_anonymise_objects_for_update(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        user2.first_name = "Anonymous"
+        assert user_anonymiser.anonymise_objects_for_update([user, user2]) == (
+            [user],
+            ["first_name"],
+        )
+
+    def test_anonymise_queryset__rerun(
+        self,
+        user: User,
+        user_anonymiser: UserAnonymiser,
+        django_assert_num_queries: Any,
+    ) -> None:
+        assert user_anonymiser.anonymise_queryset(User.objects.all()) == [1]
+        # nothing has changed, so only the SELECT is run
+        with django_assert_num_queries(1):
+            assert user_anonymiser.anonymise_queryset(User.objects.all()) == [0]
+
+    def test_anonymise_queryset__no_skip_unchanged(
+        self, user: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        user_anonymiser.anonymise_queryset(User.objects.all())
+        assert user_anonymiser.anonymise_queryset(
+            User.objects.all(), skip_unchanged=False
+        ) == [1]
+
+    def test_redact_queryset(self, user: User, user2: User) -> None:
+        class StaticRedacter(UserRedacter):
+            # no time-dependent auto-redactions
+            auto_redact = False
+            custom_field_redactions = {
+                "location": "X",
+                "date_of_birth": None,
+                "email": TemplatedEmail(),
+            }
+
+        redacter = StaticRedacter()
+        queryset = User.objects.all()
+        assert redacter.redact_queryset(queryset, skip_unchanged=True) == 2
+        assert redacter.redact_queryset(queryset, skip_unchanged=True) == 0
+        User.objects.filter(pk=user.pk).update(location="London")
+        assert redacter.redact_queryset(queryset, skip_unchanged=True) == 1
+        # without the option, every row is written
+        assert redacter.redact_queryset(queryset) == 2
+
+    def test_redact_queryset__volatile(
+        self, user: User, user2: User, user_redacter: UserRedacter
+    ) -> None:
+        # date / datetime fields are auto-redacted to now(), and the
+        # uuid to GenerateUuid4(), so they are not compared
+        assert user_redacter.get_volatile_auto_redactions() >= {
+            "date_joined",
+            "date_of_birth",
+            "last_login",
+        }
+        queryset = User.objects.all()
+        assert user_redacter.redact_queryset(queryset, skip_unchanged=True) == 2
+        assert user_redacter.redact_queryset(queryset, skip_unchanged=True) == 0
+        assert (
+            user_redacter.redact_queryset(
+                queryset, skip_unchanged=True, uuid=GenerateUuid4()
+            )
+            == 0
+        )
+        User.objects.filter(pk=user.pk).update(location="London")
+        assert user_redacter.redact_queryset(queryset, skip_unchanged=True) == 1
+
+    def test_redact_queryset__volatile_only(self, user: User) -> None:
+        class VolatileRedacter(RedacterBase):
+            model = User
+            auto_redact = False
+            custom_field_redactions = {"uuid": GenerateUuid4()}
+
+        redacter = VolatileRedacter()
+        queryset = User.objects.all()
+        assert redacter.redact_queryset(queryset, skip_unchanged=True) == 1
+        # nothing to compare - every row is written
+        assert redacter.redact_queryset(queryset, skip_unchanged=True) == 1
+
+    def test_get_changed_filter(self) -> None:
+        queryset = User.objects.all()
+        assert get_changed_filter(queryset, {}) is None
+        assert get_changed_filter(queryset, {"uuid": GenerateUuid4()}) is None
+        assert get_changed_filter(queryset, {"location": "X"}) is not None
+        changed = get_changed_filter(
+            queryset, {"location": "X", "uuid": GenerateUuid4()}
+        )
+        assert changed is not None
+        assert len(changed.children) == 1
+
+
+@pytest.mark.django_db
+class TestAsync:
+    def test_aanonymise_queryset(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        anonymise = async_to_sync(user_anonymiser.aanonymise_queryset)
+        assert anonymise(User.objects.all(), batch_size=1) == [1, 1]
+        user.refresh_from_db()
+        assert user.first_name == "Anonymous"
+        # nothing has changed
+        assert anonymise(User.objects.all()) == [0]
+        assert anonymise(User.objects.all(), skip_unchanged=False) == [2]
+
+    def test_aanonymise_queryset__batch(self, user: User) -> None:
+        anonymise = async_to_sync(BatchUserAnonymiser().aanonymise_queryset)
+        assert anonymise(User.objects.all()) == [1]
+        user.refresh_from_db()
+        assert user.last_name == "FLINTSTONE"
+
+    def test_aredact_queryset(
+        self, user: User, user2: User, user_redacter: UserRedacter
+    ) -> None:
+        redact = async_to_sync(user_redacter.aredact_queryset)
+        assert redact(User.objects.all(), location="Area 51") == 2
+        user.refresh_from_db()
+        assert user.last_name == "LAST_NAME"
+        assert user.location == "Area 51"
+        assert redact(User.objects.none()) == 0
+
+    @mock.patch("anonymiser.models.asyncio.sleep")
+    def test_aredact_queryset__chunked(
+        self,
+        mock_sleep: mock.AsyncMock,
+        user: User,
+        user2: User,
+        user_redacter: UserRedacter,
+    ) -> None:
+        redact = async_to_sync(user_redacter.aredact_queryset)
+        assert redact(User.objects.all(), chunk_size=1, throttle=0.5) == 2
+        # two chunks - only sleep between them
+        assert mock_sleep.await_count == 1
+        user2.refresh_from_db()
+        assert user2.last_name == "LAST_NAME"
+
+    def test_aredact_queryset__skip_unchanged(self, user: User) -> None:
+        class StaticRedacter(UserRedacter):
+            auto_redact = False
+            custom_field_redactions = {"location": "X"}
+
+        redact = async_to_sync(StaticRedacter().aredact_queryset)
+        assert redact(User.objects.all(), skip_unchanged=True) == 1
+        assert redact(User.objects.all(), skip_unchanged=True) == 0
+
+
+@pytest.mark.django_db
+class TestRedactTable:
+    def test_get_redaction_select(self, user: User, user2: User) -> None:
+        columns, sql, params = get_redaction_select(
+            User.objects.all(),
+            {"location": "Area 51", "email": TemplatedEmail(), "date_of_birth": None},
+        )
+        assert columns == [f.column for f in User._meta.concrete_fields]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        rows.sort(key=lambda row: row["id"])
+        assert [row["location"] for row in rows] == ["Area 51", "Area 51"]
+        assert rows[0]["email"] == f"user_{user.pk}@example.com"
+        assert rows[1]["username"] == "testuser2"
+        assert rows[1]["date_of_birth"] is None
+
+    @pytest.mark.skipif(settings.IS_POSTGRES, reason="Not PostgreSQL")
+    def test_redact_table__not_postgres(self, user_redacter: UserRedacter) -> None:
+        with pytest.raises(NotImplementedError):
+            user_redacter.redact_table()
+
+    @pytest.mark.skipif(not settings.IS_POSTGRES, reason="PostgreSQL only")
+    def test_redact_table(
+        self, user: User, user2: User, user_redacter: UserRedacter
+    ) -> None:
+        assert user_redacter.redact_table(location="Area 51") == 2
+        user.refresh_from_db()
+        assert user.location == "Area 51"
+        assert user.last_name == "LAST_NAME"
+        assert user.username == "testuser1"
+        # the identity sequence carries on from where it was
+        assert User.objects.create(username="testuser3").pk > user2.pk
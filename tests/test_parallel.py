@@ -0,0 +1,92 @@
+from concurrent.futures import Future
+from typing import Any, Callable
+from unittest import mock
+
+import pytest
+
+from anonymiser.parallel import (
+    Shard,
+    anonymise_in_parallel,
+    anonymise_shard,
+    get_pk_shards,
+)
+
+from .models import User
+
+
+class InlineExecutor:
+    """Executor that runs tasks in-process (test db is not shared)."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs["initializer"]()
+
+    def __enter__(self) -> "InlineExecutor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.mark.django_db
+class TestGetPkShards:
+    def test_shards(self, user: User, user2: User) -> None:
+        shards = get_pk_shards(User.objects.all(), 2)
+        assert shards == [
+            Shard("tests.User", user.pk, user.pk),
+            Shard("tests.User", user2.pk, user2.pk),
+        ]
+
+    def test_shards__more_shards_than_rows(self, user: User, user2: User) -> None:
+        shards = get_pk_shards(User.objects.all(), 10)
+        assert len(shards) == 2
+
+    def test_shards__single(self, user: User, user2: User) -> None:
+        shards = get_pk_shards(User.objects.all(), 1)
+        assert shards == [Shard("tests.User", user.pk, user2.pk)]
+
+    def test_shards__empty(self) -> None:
+        assert get_pk_shards(User.objects.all(), 4) == []
+
+    def test_shards__invalid(self) -> None:
+        with pytest.raises(ValueError):
+            get_pk_shards(User.objects.all(), 0)
+
+
+@pytest.mark.django_db
+def test_anonymise_shard(user: User, user2: User) -> None:
+    result = anonymise_shard(Shard("tests.User", user2.pk, user2.pk))
+    assert result.rows == 1
+    user.refresh_from_db()
+    user2.refresh_from_db()
+    assert user.first_name == "fred"
+    assert user2.first_name == "Anonymous"
+
+
+# anonymise_in_parallel closes the connection, which cannot be done
+# inside the test transaction (except on in-memory SQLite)
+@pytest.mark.django_db(transaction=True)
+@mock.patch("anonymiser.parallel.ProcessPoolExecutor", InlineExecutor)
+def test_anonymise_in_parallel(user: User, user2: User) -> None:
+    assert anonymise_in_parallel(max_workers=2) == {"tests.User": 2}
+    user.refresh_from_db()
+    user2.refresh_from_db()
+    assert user.first_name == "Anonymous"
+    assert user2.first_name == "Anonymous"
+
+
+@pytest.mark.django_db(transaction=True)
+@mock.patch("anonymiser.parallel.ProcessPoolExecutor", InlineExecutor)
+@pytest.mark.usefixtures("filtered_default_manager")
+def test_anonymise_in_parallel__filtered_default_manager(
+    user: User, user2: User
+) -> None:
+    User.objects.filter(pk=user2.pk).update(is_active=False)
+    assert User._default_manager.count() == 1
+    assert anonymise_in_parallel(max_workers=2) == {"tests.User": 2}
+    user2.refresh_from_db()
+    assert user2.first_name == "Anonymous"
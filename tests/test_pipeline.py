@@ -0,0 +1,73 @@
+from typing import Any
+from unittest import mock
+
+import pytest
+from django.conf import settings
+
+from anonymiser import pipeline
+
+from .anonymisers import UserAnonymiser
+from .models import User
+
+
+def test_batch() -> None:
+    assert list(pipeline.batch(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_batch__empty() -> None:
+    assert list(pipeline.batch([], 2)) == []
+
+
+def test_batch__invalid() -> None:
+    with pytest.raises(ValueError):
+        list(pipeline.batch(range(5), 0))
+
+
+def test_batch__lazy() -> None:
+    # only the first batch should be pulled from the source
+    source = iter(range(10))
+    batches = pipeline.batch(source, 3)
+    assert next(batches) == [0, 1, 2]
+    assert next(source) == 3
+
+
+@pytest.mark.django_db
+class TestRunPipeline:
+    def test_run_pipeline(
+        self, user: User, user2: User, user_anonymiser: UserAnonymiser
+    ) -> None:
+        count = pipeline.run_pipeline(
+            user_anonymiser, User.objects.all(), chunk_size=1, batch_size=1
+        )
+        assert count == 2
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.first_name == "Anonymous"
+        assert user2.first_name == "Anonymous"
+        assert user.last_name == "flintstone"
+
+    def test_run_pipeline__num_queries(
+        self,
+        user: User,
+        user2: User,
+        user_anonymiser: UserAnonymiser,
+        django_assert_num_queries: Any,
+    ) -> None:
+        # one streamed SELECT, one write per batch
+        with django_assert_num_queries(1 + 2 * settings.WRITE_QUERIES):
+            pipeline.run_pipeline(user_anonymiser, User.objects.all(), batch_size=1)
+
+    @mock.patch.object(UserAnonymiser, "post_anonymise_object")
+    def test_run_pipeline__post_anonymise_object(
+        self,
+        mock_post_anonymise: mock.Mock,
+        user: User,
+        user_anonymiser: UserAnonymiser,
+    ) -> None:
+        pipeline.run_pipeline(user_anonymiser, User.objects.all())
+        mock_post_anonymise.assert_called_once_with(
+            user, first_name=("fred", "Anonymous")
+        )
+
+    def test_run_pipeline__empty(self, user_anonymiser: UserAnonymiser) -> None:
+        assert pipeline.run_pipeline(user_anonymiser, User.objects.none()) == 0
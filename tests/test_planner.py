@@ -0,0 +1,246 @@
+import json
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from anonymiser.models import AnonymisationCheckpoint
+from anonymiser.planner import (
+    ANONYMISE_MODE,
+    REDACT_CHUNKED_MODE,
+    REDACT_MODE,
+    ModelPlan,
+    estimate_rows,
+    format_plan,
+    load_throughput,
+    plan_model,
+    plan_models,
+    project_seconds,
+)
+
+from .anonymisers import UserRedacter
+from .models import User
+
+
+def analyse() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+@pytest.fixture
+def throughput_file(tmp_path: Path) -> Path:
+    path = tmp_path / "results.json"
+    results = [
+        {"mode": REDACT_MODE, "rows": 1000, "rows_per_sec": 1000.0},
+        {"mode": REDACT_MODE, "rows": 10000, "rows_per_sec": 3000.0},
+        {"mode": ANONYMISE_MODE, "rows": 1000, "rows_per_sec": 100.0},
+        {"mode": "pipeline", "rows": 1000, "rows_per_sec": 0.0},
+    ]
+    path.write_text(json.dumps({"results": results}))
+    return path
+
+
+def test_load_throughput(throughput_file: Path) -> None:
+    assert load_throughput(throughput_file) == {
+        REDACT_MODE: 2000.0,
+        ANONYMISE_MODE: 100.0,
+    }
+
+
+@pytest.mark.parametrize(
+    "rows,mode,expected",
+    [
+        (1000, REDACT_MODE, 0.5),
+        (None, REDACT_MODE, None),
+        (1000, REDACT_CHUNKED_MODE, None),
+    ],
+)
+def test_project_seconds(rows: int | None, mode: str, expected: float | None) -> None:
+    assert project_seconds(rows, {REDACT_MODE: 2000.0}, mode) == expected
+
+
+@pytest.mark.parametrize(
+    "plan,expected",
+    [
+        (ModelPlan("tests.User", 10), 0.0),
+        (ModelPlan("tests.User", 10, "UPDATE", redact_seconds=1.5), 1.5),
+        (ModelPlan("tests.User", 10, "UPDATE"), None),
+        (
+            ModelPlan(
+                "tests.User",
+                10,
+                "UPDATE",
+                anonymised_fields=["first_name"],
+                redact_seconds=1.5,
+                anonymise_seconds=2.0,
+            ),
+            3.5,
+        ),
+        (ModelPlan("tests.User", 10, anonymised_fields=["first_name"]), None),
+    ],
+)
+def test_model_plan_seconds(plan: ModelPlan, expected: float | None) -> None:
+    assert plan.seconds == expected
+
+
+def test_format_plan() -> None:
+    plans = [
+        ModelPlan(
+            "tests.User",
+            10,
+            'UPDATE "tests_user" SET "first_name" = %s',
+            ("FIRST_NAME",),
+            ["first_name"],
+            redact_seconds=1.5,
+            anonymise_seconds=2.0,
+        ),
+        ModelPlan("auth.Group", None),
+    ]
+    assert format_plan(plans).splitlines() == [
+        "tests.User",
+        "  estimated rows: 10",
+        '  redact: UPDATE "tests_user" SET "first_name" = %s',
+        "  anonymise: first_name",
+        "  projected duration: 3.5s",
+        "auth.Group",
+        "  estimated rows: unknown",
+        "  anonymise: -",
+        "  projected duration: 0.0s",
+        "Total projected duration: 3.5s",
+    ]
+    # the params can include secrets (e.g. Hmac keys)
+    assert "FIRST_NAME" not in format_plan(plans)
+
+
+def test_format_plan__unknown_total() -> None:
+    plans = [ModelPlan("tests.User", None, "UPDATE")]
+    assert format_plan(plans).splitlines()[-1] == "Total projected duration: unknown"
+
+
+@pytest.mark.django_db
+class TestEstimateRows:
+    @pytest.mark.skipif(not settings.IS_SQLITE, reason="SQLite only")
+    def test_not_analysed(self, user: User) -> None:
+        assert estimate_rows(User.objects.all()) is None
+
+    def test_analysed(self, user: User, user2: User) -> None:
+        analyse()
+        assert estimate_rows(User.objects.all()) == 2
+
+
+@pytest.mark.django_db
+class TestPlanModel:
+    def test_plan_redact_queryset(self, user: User) -> None:
+        sql, params = UserRedacter().plan_redact_queryset(User.objects.all())
+        assert sql.startswith('UPDATE "tests_user" SET ')
+        assert "FIRST_NAME" in params
+        user.refresh_from_db()
+        assert user.first_name == "fred"
+
+    def test_plan_model(self, user: User, throughput_file: Path) -> None:
+        analyse()
+        plan = plan_model(User, throughput=load_throughput(throughput_file))
+        assert plan.label == "tests.User"
+        assert plan.estimated_rows == 1
+        assert plan.redact_sql is not None
+        assert plan.redact_sql.startswith('UPDATE "tests_user" SET ')
+        assert plan.anonymised_fields == ["first_name"]
+        assert plan.redact_seconds == 1 / 2000
+        assert plan.anonymise_seconds == 1 / 100
+        user.refresh_from_db()
+        assert user.first_name == "fred"
+
+    def test_plan_model__no_redact(self) -> None:
+        plan = plan_model(User, redact=False, anonymise=False)
+        assert plan.redact_sql is None
+        assert plan.anonymised_fields == []
+        assert plan.seconds == 0.0
+
+    def test_plan_model__chunked(self, user: User, throughput_file: Path) -> None:
+        analyse()
+        plan = plan_model(
+            User, chunk_size=100, throughput=load_throughput(throughput_file)
+        )
+        assert plan.redact_sql is not None
+        assert plan.redact_seconds is None
+
+    def test_plan_model__unregistered(self) -> None:
+        plan = plan_model(Group)
+        assert plan.redact_sql is None
+        assert plan.anonymised_fields == []
+
+    @pytest.mark.usefixtures("filtered_default_manager")
+    def test_plan_model__filtered_default_manager(self) -> None:
+        plan = plan_model(User)
+        assert plan.redact_sql is not None
+        assert "is_active" not in plan.redact_sql
+
+    def test_plan_model__incremental(self, user: User) -> None:
+        # the first incremental run includes all rows
+        plan = plan_model(User, incremental=True)
+        assert plan.redact_sql is not None
+        assert "WHERE" not in plan.redact_sql
+        call_command("anonymise", "--noinput", "--incremental")
+        plan = plan_model(User, incremental=True)
+        assert plan.redact_sql is not None
+        assert plan.redact_sql.endswith(
+            'WHERE ("tests_user"."id" > %s AND "tests_user"."id" <= %s)'
+        )
+        assert plan.redact_params[-2:] == (user.pk, user.pk)
+
+    def test_plan_model__incremental_empty(self, user: User) -> None:
+        call_command("anonymise", "--noinput", "--incremental")
+        User.objects.all().delete()
+        assert plan_model(User, incremental=True) == ModelPlan("tests.User", 0)
+
+    def test_plan_model__resume(self, user: User) -> None:
+        AnonymisationCheckpoint.objects.create(
+            model_label="tests.User", last_pk=str(user.pk)
+        )
+        plan = plan_model(User, resume=True)
+        assert plan.redact_sql is None
+        assert plan.anonymised_fields == ["first_name"]
+        assert plan_model(User).redact_sql is not None
+
+    def test_plan_models(self) -> None:
+        assert [plan.label for plan in plan_models()] == ["tests.User"]
+
+    @mock.patch("anonymiser.scheduler.get_model_dependencies")
+    def test_plan_models__cycle(self, mock_dependencies: mock.Mock) -> None:
+        mock_dependencies.return_value = {User: {Group}, Group: {User}}
+        plans = plan_models([User, Group])
+        assert {plan.label for plan in plans} == {"tests.User", "auth.Group"}
+
+
+@pytest.mark.django_db
+class TestPlanCommand:
+    def test_command(self, user: User, throughput_file: Path) -> None:
+        out = StringIO()
+        call_command(
+            "anonymise",
+            "--noinput",
+            "--plan",
+            "--throughput",
+            str(throughput_file),
+            stdout=out,
+        )
+        output = out.getvalue()
+        assert "tests.User" in output
+        assert 'redact: UPDATE "tests_user" SET ' in output
+        assert "anonymise: first_name" in output
+        user.refresh_from_db()
+        assert user.first_name == "fred"
+
+    def test_command__missing_throughput(self, tmp_path: Path) -> None:
+        with pytest.raises(CommandError):
+            call_command(
+                "anonymise",
+                "--plan",
+                "--throughput",
+                str(tmp_path / "missing.json"),
+            )
@@ -0,0 +1,149 @@
+import random
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+import pytest
+
+from anonymiser import pseudonyms
+from anonymiser.pseudonyms import PseudonymCache
+
+
+def counter() -> mock.Mock:
+    # generator returning "fake_1", "fake_2", ...
+    return mock.Mock(side_effect=[f"fake_{i}" for i in range(1, 100)])
+
+
+@pytest.fixture(autouse=True)
+def reset_cache() -> Iterator[None]:
+    pseudonyms.reset_pseudonym_cache()
+    yield
+    pseudonyms.reset_pseudonym_cache()
+
+
+def test_invalid_maxsize() -> None:
+    with pytest.raises(ValueError):
+        PseudonymCache(maxsize=0)
+
+
+def test_get__consistent() -> None:
+    cache = PseudonymCache()
+    generator = counter()
+    assert cache.get("email", "fred@example.com", generator) == "fake_1"
+    assert cache.get("email", "ginger@example.com", generator) == "fake_2"
+    assert cache.get("email", "fred@example.com", generator) == "fake_1"
+    assert generator.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_get__namespaces() -> None:
+    cache = PseudonymCache()
+    generator = counter()
+    assert cache.get("email", "fred", generator) == "fake_1"
+    assert cache.get("name", "fred", generator) == "fake_2"
+
+
+def test_get__lru_eviction() -> None:
+    cache = PseudonymCache(maxsize=2)
+    generator = counter()
+    cache.get("x", "a", generator)
+    cache.get("x", "b", generator)
+    cache.get("x", "a", generator)  # "b" is now least recently used
+    cache.get("x", "c", generator)
+    assert len(cache) == 2
+    assert cache.get("x", "a", generator) == "fake_1"
+    # "b" was evicted (and discarded), so gets a new pseudonym
+    assert cache.get("x", "b", generator) == "fake_4"
+
+
+def test_get__spill(tmp_path: Path) -> None:
+    cache = PseudonymCache(maxsize=1, spill_path=tmp_path / "pseudonyms.db")
+    generator = counter()
+    assert cache.get("x", "a", generator) == "fake_1"
+    assert cache.get("x", "b", generator) == "fake_2"
+    assert len(cache) == 1
+    # "a" is read back from the spill file, not regenerated
+    assert cache.get("x", "a", generator) == "fake_1"
+    assert generator.call_count == 2
+    cache.clear()
+    assert cache.get("x", "a", generator) == "fake_3"
+    cache.close()
+
+
+def test_spill__no_real_values(tmp_path: Path) -> None:
+    path = tmp_path / "pseudonyms.db"
+    cache = PseudonymCache(maxsize=1, spill_path=path)
+    cache.get("email", "fred@example.com", pseudonyms.email)
+    cache.get("email", "ginger@example.com", pseudonyms.email)
+    cache.close()
+    assert b"fred@example.com" not in path.read_bytes()
+
+
+def test_spill__shared(tmp_path: Path) -> None:
+    path = tmp_path / "pseudonyms.db"
+    first = PseudonymCache(maxsize=1, spill_path=path, seed="s3cr3t")
+    second = PseudonymCache(maxsize=1, spill_path=path, seed="s3cr3t")
+    # the generators ignore the seeded random instance, so second only
+    # returns first's pseudonyms if it reads them from the spill file
+    generator = counter()
+    other = mock.Mock(return_value="other")
+    assert first.get("x", "a", generator) == "fake_1"
+    assert first.get("x", "b", generator) == "fake_2"
+    # "a" was evicted, and is visible before first is closed
+    assert second.get("x", "a", other) == "fake_1"
+    first.close()
+    # "b" was written when first was closed
+    assert second.get("x", "b", other) == "fake_2"
+    assert other.call_count == 0
+    second.close()
+
+
+def test_seed__reproducible() -> None:
+    values = ["fred", "ginger", "wilma"]
+    first = PseudonymCache(seed="s3cr3t")
+    second = PseudonymCache(seed="s3cr3t")
+    assert [first.get("n", v, pseudonyms.email) for v in values] == [
+        second.get("n", v, pseudonyms.email) for v in reversed(values)
+    ][::-1]
+    other = PseudonymCache(seed="other")
+    assert first.get("n", "fred", pseudonyms.email) != other.get(
+        "n", "fred", pseudonyms.email
+    )
+
+
+def test_get_random() -> None:
+    cache = PseudonymCache(seed="s3cr3t")
+    key = cache.get_key("n", "fred")
+    assert isinstance(cache.get_random(key), random.Random)
+    assert cache.get_random(key).random() == cache.get_random(key).random()
+
+
+@pytest.mark.parametrize("value", [None, ""])
+def test_pseudonymise__empty(value: str | None) -> None:
+    assert pseudonyms.pseudonymise("email", value, pseudonyms.email) == value
+
+
+def test_pseudonymise__shared_cache() -> None:
+    email = pseudonyms.pseudonymise("email", "fred@example.com", pseudonyms.email)
+    assert email.endswith("@example.com")
+    assert pseudonyms.pseudonymise("email", "fred@example.com", counter()) == email
+
+
+@mock.patch("anonymiser.settings.PSEUDONYM_CACHE_SIZE", 10)
+@mock.patch("anonymiser.settings.PSEUDONYM_SEED", "s3cr3t")
+def test_get_pseudonym_cache() -> None:
+    cache = pseudonyms.get_pseudonym_cache()
+    assert cache.maxsize == 10
+    assert cache.seed == b"s3cr3t"
+    assert pseudonyms.get_pseudonym_cache() is cache
+
+
+@pytest.mark.parametrize(
+    "generator,values",
+    [
+        (pseudonyms.first_name, pseudonyms.FIRST_NAMES),
+        (pseudonyms.last_name, pseudonyms.LAST_NAMES),
+    ],
+)
+def test_generators(generator: pseudonyms.Generator, values: tuple) -> None:
+    assert generator(random.Random(1)) in values  # noqa: S311
@@ -0,0 +1,84 @@
+from typing import Iterator
+from unittest import mock
+
+import pytest
+from django.db import models
+from django.test import override_settings
+
+from anonymiser import redacters
+from anonymiser.settings import AUTO_REDACT_FIELD_FUNCS
+
+
+class CustomCharField(models.CharField):
+    pass
+
+
+class CustomField(models.Field):
+    pass
+
+
+def redact_custom_field(field: models.Field) -> str:
+    return "CUSTOM"
+
+
+@pytest.fixture(autouse=True)
+def clear_field_redacter_cache() -> Iterator[None]:
+    redacters.clear_field_redacter_cache()
+    yield
+    redacters.clear_field_redacter_cache()
+
+
+@pytest.mark.parametrize(
+    "field,redacter",
+    [
+        (models.CharField(max_length=10), redacters.default_redact_charfield),
+        (models.EmailField(), redacters.default_redact_charfield),
+        (models.TextField(), redacters.default_redact_textfield),
+        # DateTimeField is a subclass of DateField
+        (models.DateTimeField(), redacters.default_redact_datetimefield),
+        (models.DateField(), redacters.default_redact_datefield),
+        (models.JSONField(), redacters.default_redact_jsonfield),
+        (models.UUIDField(), redacters.default_redact_uuidfield),
+        (models.IntegerField(), None),
+        # subclasses use the redacter of their nearest registered ancestor
+        (CustomCharField(max_length=10), redacters.default_redact_charfield),
+        (CustomField(), None),
+    ],
+)
+def test_get_default_field_redacter(field: models.Field, redacter: object) -> None:
+    assert redacters.get_default_field_redacter(field) == redacter
+
+
+@mock.patch.dict(AUTO_REDACT_FIELD_FUNCS, {CustomField: redact_custom_field})
+def test_get_default_field_redacter__settings() -> None:
+    assert redacters.get_default_field_redacter(CustomField()) == redact_custom_field
+
+
+@mock.patch.dict(AUTO_REDACT_FIELD_FUNCS, {models.EmailField: None})
+def test_get_default_field_redacter__excluded() -> None:
+    assert redacters.get_default_field_redacter(models.EmailField()) is None
+    assert redacters.get_default_field_redacter(models.CharField()) is not None
+
+
+def test_get_default_field_redacter__cached() -> None:
+    field = CustomCharField(max_length=10)
+    redacters.get_default_field_redacter(field)
+    with mock.patch.dict(AUTO_REDACT_FIELD_FUNCS, {CustomCharField: None}):
+        # cached per field class until the cache is cleared
+        assert redacters.get_default_field_redacter(field) is not None
+        redacters.clear_field_redacter_cache()
+        assert redacters.get_default_field_redacter(field) is None
+
+
+def test_get_default_field_redacter__setting_changed() -> None:
+    field = CustomCharField(max_length=10)
+    assert redacters.get_default_field_redacter(field) is not None
+    with override_settings(ANONYMISER_AUTO_REDACT_FIELD_FUNCS={CustomCharField: None}):
+        assert redacters.get_default_field_redacter(field) is None
+    assert redacters.get_default_field_redacter(field) is not None
+
+
+def test_volatile() -> None:
+    assert redacters.is_volatile(redacters.default_redact_datetimefield)
+    assert not redacters.is_volatile(redacters.default_redact_charfield)
+    assert redacters.is_volatile(redacters.volatile(lambda f: None))
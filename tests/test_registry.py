@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from unittest import mock
+
+from django.contrib.auth.models import Group
+
 from anonymiser.decorators import register_anonymiser
-from anonymiser.registry import _registry
+from anonymiser.registry import _registry, get_all_model_fields, get_model_anonymiser
 
 from .anonymisers import UserAnonymiser
 from .models import User
@@ -16,3 +20,47 @@ def test_register_anonymiser() -> None:
     assert _registry == {}
     register_anonymiser(UserAnonymiser)
     assert _registry == {User: UserAnonymiser}
+
+
+def test_register_anonymiser__clears_plan_cache() -> None:
+    anonymiser = UserAnonymiser()
+    plan = anonymiser.get_anonymisation_plan()
+    _registry.clear()
+    register_anonymiser(UserAnonymiser)
+    assert anonymiser.get_anonymisation_plan() is not plan
+
+
+def test_get_model_anonymiser__cached() -> None:
+    anonymiser = get_model_anonymiser(User)
+    assert isinstance(anonymiser, UserAnonymiser)
+    assert get_model_anonymiser(User) is anonymiser
+    assert get_model_anonymiser(Group) is None
+
+
+def test_register_anonymiser__clears_instances() -> None:
+    anonymiser = get_model_anonymiser(User)
+    summaries = _registry.get_field_summaries(User)
+    _registry.clear()
+    assert get_model_anonymiser(User) is None
+    register_anonymiser(UserAnonymiser)
+    assert get_model_anonymiser(User) is not anonymiser
+    assert _registry.get_field_summaries(User) is not summaries
+
+
+def test_get_field_summaries__cached() -> None:
+    summaries = _registry.get_field_summaries(User)
+    assert _registry.get_field_summaries(User) is summaries
+    assert {s.field for s in summaries} == set(User._meta.get_fields())
+    assert all(s.anonymiser is get_model_anonymiser(User) for s in summaries)
+
+
+def test_get_all_model_fields() -> None:
+    _registry._clear_caches()
+    with mock.patch.object(
+        User._meta, "get_fields", wraps=User._meta.get_fields
+    ) as mock_get_fields:
+        fields = get_all_model_fields()
+        get_all_model_fields()
+    assert mock_get_fields.call_count == 1
+    assert "auth.Group" in fields
+    assert list(get_all_model_fields(anonymised_only=True)) == ["tests.User"]
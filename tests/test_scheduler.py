@@ -0,0 +1,313 @@
+import asyncio
+import datetime
+import threading
+from io import StringIO
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import CommandError, call_command
+from django.db import models
+
+from anonymiser.models import AnonymisationCheckpoint, AnonymisationWatermark
+from anonymiser.scheduler import (
+    ModelResult,
+    aanonymise_model,
+    anonymise_model,
+    arun_models,
+    get_incremental_queryset,
+    get_model_dependencies,
+    remove_cycles,
+    run_models,
+)
+
+from .anonymisers import UserAnonymiser
+from .models import User
+
+
+def test_get_model_dependencies() -> None:
+    graph = get_model_dependencies([LogEntry, User, ContentType, Permission])
+    assert graph == {
+        LogEntry: {User, ContentType},
+        User: set(),
+        ContentType: set(),
+        Permission: {ContentType},
+    }
+
+
+def test_get_model_dependencies__unscheduled() -> None:
+    # ContentType is not in the graph, so is not a dependency
+    assert get_model_dependencies([LogEntry, User]) == {LogEntry: {User}, User: set()}
+
+
+def test_run_models__inline() -> None:
+    order = []
+    results = run_models(
+        lambda m: order.append(m) or m._meta.model_name,
+        [LogEntry, Permission, User, ContentType],
+    )
+    assert order.index(LogEntry) > order.index(User)
+    assert order.index(LogEntry) > order.index(ContentType)
+    assert order.index(Permission) > order.index(ContentType)
+    assert results["admin.LogEntry"] == "logentry"
+    assert len(results) == 4
+
+
+def test_run_models__concurrent() -> None:
+    finished: set[type[models.Model]] = set()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def job(model: type[models.Model]) -> int:
+        if model in (User, ContentType):
+            # both independent models must be running at the same time
+            barrier.wait()
+        if model is LogEntry:
+            assert finished == {User, ContentType}
+        finished.add(model)
+        return 1
+
+    results = run_models(job, [LogEntry, User, ContentType], max_workers=2)
+    assert results == {
+        "admin.LogEntry": 1,
+        "tests.User": 1,
+        "contenttypes.ContentType": 1,
+    }
+
+
+def test_arun_models__concurrent() -> None:
+    finished: set[type[models.Model]] = set()
+    barrier = asyncio.Barrier(2)
+
+    async def job(model: type[models.Model]) -> int:
+        if model in (User, ContentType):
+            # both independent models must be running at the same time
+            await asyncio.wait_for(barrier.wait(), timeout=5)
+        if model is LogEntry:
+            assert finished == {User, ContentType}
+        finished.add(model)
+        return 1
+
+    results = async_to_sync(arun_models)(
+        job, [LogEntry, User, ContentType], max_concurrency=2
+    )
+    assert results == {
+        "admin.LogEntry": 1,
+        "tests.User": 1,
+        "contenttypes.ContentType": 1,
+    }
+
+
+def test_arun_models__max_concurrency() -> None:
+    running: list[type[models.Model]] = []
+
+    async def job(model: type[models.Model]) -> None:
+        running.append(model)
+        assert len(running) == 1
+        await asyncio.sleep(0)
+        running.remove(model)
+
+    results = async_to_sync(arun_models)(job, [User, Group, ContentType])
+    assert len(results) == 3
+    with pytest.raises(ValueError):
+        async_to_sync(arun_models)(job, [User], max_concurrency=0)
+
+
+def test_get_model_dependencies__not_nullable() -> None:
+    # LogEntry.content_type is nullable, LogEntry.user is not
+    graph = get_model_dependencies([LogEntry, User, ContentType], nullable=False)
+    assert graph == {LogEntry: {User}, User: set(), ContentType: set()}
+
+
+def test_remove_cycles() -> None:
+    graph = {User: {Group}, Group: {User, ContentType}, ContentType: set()}
+    # User -> Group is required, so Group -> User is removed
+    required = {User: {Group}, Group: {ContentType}, ContentType: set()}
+    assert remove_cycles(graph, required) == {
+        User: {Group},
+        Group: {ContentType},
+        ContentType: set(),
+    }
+    # the graph passed in is not modified
+    assert graph[Group] == {User, ContentType}
+
+
+def test_remove_cycles__required() -> None:
+    graph = {User: {Group}, Group: {User}}
+    result = remove_cycles(graph, graph)
+    assert sum(len(dependencies) for dependencies in result.values()) == 1
+
+
+@mock.patch("anonymiser.scheduler.get_model_dependencies")
+def test_run_models__cycle(mock_dependencies: mock.Mock) -> None:
+    mock_dependencies.return_value = {User: {Group}, Group: {User}}
+    results = run_models(lambda m: m._meta.model_name, [User, Group])
+    assert results == {"tests.User": "user", "auth.Group": "group"}
+
+
+@pytest.mark.django_db
+class TestAnonymiseModel:
+    def test_anonymise_model(self, user: User) -> None:
+        assert anonymise_model(User) == ModelResult(redacted=1, anonymised=1)
+        user.refresh_from_db()
+        assert user.first_name == "Anonymous"
+        assert user.last_name == 150 * "X"
+
+    def test_anonymise_model__no_redact(self, user: User) -> None:
+        assert anonymise_model(User, redact=False) == ModelResult(anonymised=1)
+        user.refresh_from_db()
+        assert user.last_name == "flintstone"
+
+    def test_anonymise_model__resume(self, user: User, user2: User) -> None:
+        AnonymisationCheckpoint.objects.create(
+            model_label="tests.User", last_pk=str(user.pk)
+        )
+        # redaction is skipped, and anonymisation resumes after user
+        assert anonymise_model(User, resume=True) == ModelResult(anonymised=1)
+        user.refresh_from_db()
+        assert user.last_name == "flintstone"
+        assert not AnonymisationCheckpoint.objects.exists()
+
+    def test_anonymise_model__resume_no_checkpoint(self, user: User) -> None:
+        assert anonymise_model(User, resume=True) == ModelResult(1, 1)
+
+    def test_anonymise_model__incremental(self, user: User) -> None:
+        assert anonymise_model(User, incremental=True) == ModelResult(1, 1)
+        watermark = AnonymisationWatermark.objects.get()
+        assert (watermark.field_name, watermark.value) == ("id", str(user.pk))
+        user2 = User.objects.create(username="testuser2", first_name="ginger")
+        # only the new row is processed
+        assert anonymise_model(User, incremental=True) == ModelResult(1, 1)
+        assert AnonymisationWatermark.objects.get().value == str(user2.pk)
+        assert anonymise_model(User, incremental=True) == ModelResult()
+
+    @pytest.mark.parametrize("option", ["--no-redact", "--no-anonymise"])
+    def test_anonymise_model__incremental_partial(
+        self, user: User, option: str
+    ) -> None:
+        call_command("anonymise", "--noinput", "--incremental")
+        user2 = User.objects.create(username="testuser2", first_name="ginger")
+        call_command("anonymise", "--noinput", "--incremental", option)
+        # the watermark is not advanced, so user2 is picked up by the next run
+        assert AnonymisationWatermark.objects.get().value == str(user.pk)
+        assert anonymise_model(User, incremental=True) == ModelResult(1, 1)
+        user2.refresh_from_db()
+        assert user2.first_name == "Anonymous"
+        assert AnonymisationWatermark.objects.get().value == str(user2.pk)
+
+    @pytest.mark.usefixtures("filtered_default_manager")
+    def test_anonymise_model__filtered_default_manager(
+        self, user: User, user2: User
+    ) -> None:
+        User.objects.filter(pk=user2.pk).update(is_active=False)
+        assert anonymise_model(User) == ModelResult(redacted=2, anonymised=2)
+        user2.refresh_from_db()
+        assert user2.first_name == "Anonymous"
+
+    @pytest.mark.usefixtures("filtered_default_manager")
+    def test_aanonymise_model__filtered_default_manager(
+        self, user: User, user2: User
+    ) -> None:
+        User.objects.filter(pk=user2.pk).update(is_active=False)
+        result = async_to_sync(aanonymise_model)(User)
+        assert result == ModelResult(redacted=2, anonymised=2)
+
+    @mock.patch.object(UserAnonymiser, "incremental_field", "date_joined")
+    def test_anonymise_model__incremental_field(self, user: User, user2: User) -> None:
+        # date_joined would be auto-redacted to now(), moving every row
+        # above the watermark, so the incremental field is not redacted
+        assert anonymise_model(User, incremental=True) == ModelResult(2, 2)
+        assert anonymise_model(User, incremental=True) == ModelResult()
+        assert not UserAnonymiser().is_field_redactable(
+            User._meta.get_field("date_joined")
+        )
+
+    def test_anonymise_model__not_registered(self) -> None:
+        assert anonymise_model(Group) == ModelResult()
+
+    def test_aanonymise_model(self, user: User) -> None:
+        anonymise = async_to_sync(aanonymise_model)
+        assert anonymise(User) == ModelResult(redacted=1, anonymised=1)
+        user.refresh_from_db()
+        assert user.first_name == "Anonymous"
+        assert user.last_name == 150 * "X"
+        assert anonymise(User, redact=False) == ModelResult(anonymised=0)
+        assert anonymise(Group) == ModelResult()
+
+
+@pytest.mark.django_db
+class TestAnonymiseCommand:
+    def test_command(self, user: User) -> None:
+        call_command("anonymise", "--noinput")
+        user.refresh_from_db()
+        assert user.first_name == "Anonymous"
+
+    @mock.patch("builtins.input", return_value="no")
+    def test_command__cancelled(self, mock_input: mock.Mock, user: User) -> None:
+        call_command("anonymise")
+        user.refresh_from_db()
+        assert user.first_name == "fred"
+
+    def test_command__unregistered_model(self) -> None:
+        with pytest.raises(CommandError):
+            call_command("anonymise", "auth.Group", "--noinput")
+
+    def test_command__unknown_model(self) -> None:
+        with pytest.raises(CommandError):
+            call_command("anonymise", "tests.Unknown", "--noinput")
+
+    def test_command__report(self, user: User) -> None:
+        out = StringIO()
+        call_command("anonymise", "--noinput", "--report", stdout=out)
+        output = out.getvalue()
+        assert "tests.User: 1 redacted, 1 anonymised" in output
+        assert "redact_queryset" in output
+        assert "anonymise_batch" in output
+
+    def test_command__report_with_processes(self) -> None:
+        with pytest.raises(CommandError):
+            call_command("anonymise", "--noinput", "--report", "--processes")
+
+    def test_command__invalid_sample_rate(self) -> None:
+        with pytest.raises(CommandError):
+            call_command("anonymise", "--noinput", "--report", "--sample-rate", "0")
+
+
+@pytest.mark.django_db
+class TestGetIncrementalQueryset:
+    def test_first_run(self, user: User, user2: User) -> None:
+        queryset, high_water_mark = get_incremental_queryset(
+            User.objects.all(), UserAnonymiser()
+        )
+        assert queryset.count() == 2
+        assert high_water_mark == user2.pk
+
+    def test_empty(self, user: User) -> None:
+        AnonymisationWatermark.set_watermark(User._meta.pk, user.pk)
+        user.delete()
+        queryset, high_water_mark = get_incremental_queryset(
+            User.objects.all(), UserAnonymiser()
+        )
+        assert not queryset.exists()
+        assert high_water_mark is None
+
+    @mock.patch.object(UserAnonymiser, "incremental_field", "date_joined")
+    def test_incremental_field(self, user: User, user2: User) -> None:
+        field = User._meta.get_field("date_joined")
+        AnonymisationWatermark.set_watermark(field, user2.date_joined)
+        user.date_joined = user2.date_joined + datetime.timedelta(days=1)
+        user.save()
+        queryset, high_water_mark = get_incremental_queryset(
+            User.objects.all(), UserAnonymiser()
+        )
+        assert list(queryset) == [user]
+        assert high_water_mark == user.date_joined
+
+    @mock.patch.object(UserAnonymiser, "incremental_field", "date_joined")
+    def test_incremental_field__changed(self, user: User) -> None:
+        # watermarks for a different field are ignored
+        AnonymisationWatermark.set_watermark(User._meta.pk, user.pk)
+        queryset, _ = get_incremental_queryset(User.objects.all(), UserAnonymiser())
+        assert list(queryset) == [user]
@@ -0,0 +1,168 @@
+import datetime
+import io
+import uuid
+from typing import Any
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, QuerySet
+
+from anonymiser.db import writers
+
+from .models import User
+
+
+@pytest.mark.django_db
+class TestUpdateObjects:
+    def test_update_objects(self, user: User, user2: User) -> None:
+        user.location = "Area 51"
+        user.extra_info = {"foo": "bar"}
+        user.date_of_birth = datetime.date(2000, 1, 1)
+        user2.location = ""
+        user2.date_of_birth = None
+        fields = ["location", "extra_info", "date_of_birth"]
+        assert writers.update_objects([user, user2], fields) == 2
+        user.refresh_from_db()
+        user2.refresh_from_db()
+        assert user.location == "Area 51"
+        assert user.extra_info == {"foo": "bar"}
+        assert user.date_of_birth == datetime.date(2000, 1, 1)
+        assert (user2.location, user2.date_of_birth) == ("", None)
+
+    def test_update_objects__only_fields(self, user: User) -> None:
+        user.location = "Area 51"
+        user.first_name = "ignored"
+        assert writers.update_objects([user], ["location"]) == 1
+        user.refresh_from_db()
+        assert (user.location, user.first_name) == ("Area 51", "fred")
+
+    def test_update_objects__num_queries(
+        self, user: User, user2: User, django_assert_num_queries: Any
+    ) -> None:
+        with django_assert_num_queries(settings.WRITE_QUERIES):
+            writers.update_objects([user, user2], ["first_name", "last_name"])
+
+    def test_update_objects__empty(self, user: User) -> None:
+        assert writers.update_objects([], ["location"]) == 0
+        assert writers.update_objects([user], []) == 0
+
+    @mock.patch.object(QuerySet, "bulk_update", return_value=1)
+    def test_update_objects__expression(
+        self, mock_bulk_update: mock.Mock, user: User
+    ) -> None:
+        user.location = F("last_name")
+        assert writers.update_objects([user], ["location"]) == 1
+        mock_bulk_update.assert_called_once_with([user], ["location"])
+
+    @mock.patch.object(QuerySet, "bulk_update", return_value=1)
+    def test_update_objects__other_vendor(
+        self, mock_bulk_update: mock.Mock, user: User
+    ) -> None:
+        with mock.patch.object(connection, "vendor", "mysql"):
+            assert writers.update_objects([user], ["location"]) == 1
+        mock_bulk_update.assert_called_once()
+
+    @mock.patch.object(QuerySet, "bulk_update", return_value=1)
+    def test_update_objects__not_copyable(
+        self, mock_bulk_update: mock.Mock, user: User
+    ) -> None:
+        field = User._meta.get_field("location")
+        with (
+            mock.patch.object(connection, "vendor", "postgresql"),
+            mock.patch.object(field, "get_internal_type", return_value="ArrayField"),
+        ):
+            assert writers.update_objects([user], ["location"]) == 1
+        mock_bulk_update.assert_called_once_with([user], ["location"])
+
+    @pytest.mark.skipif(not settings.IS_POSTGRES, reason="PostgreSQL only")
+    def test_copy_update(self, user: User, user2: User) -> None:
+        user.uuid = uuid.uuid4()
+        user.extra_info = {"a": [1, 2]}
+        user2.biography = 'quotes " and, commas\nand newlines'
+        fields = ["uuid", "extra_info", "biography"]
+        assert writers.update_objects([user, user2], fields) == 2
+        assert User.objects.get(uuid=user.uuid).extra_info == {"a": [1, 2]}
+        user2.refresh_from_db()
+        assert user2.biography == 'quotes " and, commas\nand newlines'
+
+    @pytest.mark.skipif(not settings.IS_POSTGRES, reason="PostgreSQL only")
+    def test_copy_update__temp_table_reused(self, user: User, user2: User) -> None:
+        for obj in (user, user2):
+            obj.location = f"Area {obj.pk}"
+            assert writers.update_objects([obj], ["location"]) == 1
+        writers.update_objects([user], ["location", "biography"])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname FROM pg_class "
+                "WHERE relpersistence = 't' AND relname LIKE 'anonymiser_%%'"
+            )
+            temp_tables = [row[0] for row in cursor.fetchall()]
+            # one table per set of columns, emptied after each batch
+            assert len(temp_tables) == 2
+            for temp_table in temp_tables:
+                cursor.execute(f'SELECT COUNT(*) FROM "{temp_table}"')  # noqa: S608
+                assert cursor.fetchone() == (0,)
+        assert User.objects.get(pk=user2.pk).location == f"Area {user2.pk}"
+
+
+def test_can_update_directly() -> None:
+    user = User(pk=1)
+    assert writers.can_update_directly([user], ["location", "extra_info"])
+    user.location = F("last_name")
+    assert not writers.can_update_directly([user], ["location"])
+    assert writers.can_update_directly([user], ["last_name"])
+
+
+def test_can_copy() -> None:
+    fields = [User._meta.get_field(name) for name in ("uuid", "extra_info", "location")]
+    assert writers.can_copy(User, fields)
+    with mock.patch.object(fields[2], "get_internal_type", return_value="HStoreField"):
+        assert not writers.can_copy(User, fields)
+    with mock.patch.object(User._meta.pk, "get_internal_type", return_value="Custom"):
+        assert not writers.can_copy(User, [])
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, ""),
+        ("", '""'),
+        ('say "hi", bye', '"say ""hi"", bye"'),
+        (b"\x00\xff", '"\\x00ff"'),
+        (datetime.date(2000, 1, 2), '"2000-01-02"'),
+        (True, '"True"'),
+    ],
+)
+def test_csv_value(value: Any, expected: str) -> None:
+    assert writers._csv_value(value) == expected
+
+
+def test_csv_value__json() -> None:
+    class Json:
+        # psycopg2.extras.Json
+        def __init__(self, adapted: Any) -> None:
+            self.adapted = adapted
+
+        def dumps(self, obj: Any) -> str:
+            return '{"a": 1}'
+
+    assert writers._csv_value(Json({"a": 1})) == '"{""a"": 1}"'
+
+
+def test_copy__psycopg2() -> None:
+    raw_cursor = mock.Mock(spec=["copy_expert"])
+    writers._copy(mock.Mock(cursor=raw_cursor), "COPY t FROM STDIN", [[1, None]])
+    sql, data = raw_cursor.copy_expert.call_args.args
+    assert sql == "COPY t FROM STDIN WITH (FORMAT csv)"
+    assert isinstance(data, io.StringIO)
+    assert data.getvalue() == '"1",\n'
+
+
+def test_copy__psycopg3() -> None:
+    raw_cursor = mock.MagicMock(spec=["copy"])
+    writers._copy(mock.Mock(cursor=raw_cursor), "COPY t FROM STDIN", [[1, None]])
+    raw_cursor.copy.assert_called_once_with("COPY t FROM STDIN")
+    copy = raw_cursor.copy.return_value.__enter__.return_value
+    copy.write_row.assert_called_once_with([1, None])